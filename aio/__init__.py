@@ -0,0 +1 @@
+from .polarion_access import AsyncPolarionAccess
@@ -0,0 +1,212 @@
+import asyncio
+
+import httpx
+from zeep import exceptions as zeep_exceptions
+from zeep.transports import AsyncTransport
+
+from ..web_services.capture import EnvelopeCapture
+from ..web_services.liveness import SessionLiveness, is_session_fault
+from ..web_services.metadata_cache import MetadataCache
+from ..web_services.wsdl_cache import WsdlCache
+from .web_services import (AsyncSessionWebService, AsyncTrackerWebService, AsyncProjectWebService,
+                           AsyncTestManagementWebService)
+
+
+class AsyncPolarionAccess:
+    """
+        AsyncPolarionAccess
+        asyncio counterpart of PolarionAccess: the web service operations are coroutines sharing one httpx connection
+        pool, and the number of calls in flight is bounded by a semaphore.
+    """
+    def __init__(self, hostname, wsdl_cache: WsdlCache or None = None, session_idle_window: float = 300.0,
+                 max_concurrency: int = 50, max_connections: int = 100, operation_timeout: float or None = None,
+                 envelope_capture: EnvelopeCapture or None = None):
+        """
+        Class init (the WSDL documents are loaded synchronously, as done by zeep)
+        :param hostname: Hostname of the Polarion server
+        :param wsdl_cache: Cache used to store the WSDL and XSD documents (default: WsdlCache at its default location)
+        :param session_idle_window: Time (in seconds) without successful call after which the session is checked again
+        :param max_concurrency: Maximum number of web service calls in flight
+        :param max_connections: Maximum number of HTTP connections of the pool
+        :param operation_timeout: Timeout (in seconds) of the web service operations (None for no timeout)
+        :param envelope_capture: Recorder of the last SOAP envelopes of the tracker, project and test management
+                                 services, for debugging (disabled if None)
+        """
+        self._hostname = hostname
+        self._credentials = None
+        self._liveness = SessionLiveness(session_idle_window)
+        self._metadata = MetadataCache()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._relog_in_lock = asyncio.Lock()
+        self._transaction_open = False
+
+        temp_wsdl_prefix_address = 'http://%s/polarion/ws/services/' % hostname
+
+        self._wsdl_cache = wsdl_cache if wsdl_cache is not None else WsdlCache()
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._transport = AsyncTransport(client=httpx.AsyncClient(limits=limits, timeout=operation_timeout),
+                                         cache=self._wsdl_cache,
+                                         operation_timeout=operation_timeout)
+
+        self._session = AsyncSessionWebService(self, temp_wsdl_prefix_address, self._transport)
+        self._tracker = AsyncTrackerWebService(self, temp_wsdl_prefix_address, self._transport)
+        self._project = AsyncProjectWebService(self, temp_wsdl_prefix_address, self._transport)
+        self._test_management = AsyncTestManagementWebService(self, temp_wsdl_prefix_address, self._transport)
+
+        self._envelope_capture = envelope_capture
+        if envelope_capture is not None:
+            # Not on the session client: the logIn request holds the password
+            for client in (self._tracker.client, self._project.client, self._test_management.client):
+                client.plugins.append(envelope_capture)
+
+    async def log_in(self, login, password):
+        async with self._semaphore:
+            await self._session.log_in(login, password)
+        session_header_element = self._session.session_header_element
+
+        self._tracker.client.set_default_soapheaders([session_header_element])
+        self._project.client.set_default_soapheaders([session_header_element])
+        self._test_management.client.set_default_soapheaders([session_header_element])
+
+        self._credentials = (login, password)
+        self._liveness.renew()
+
+    async def connect(self):
+        """
+        Opens a new session using the credentials of the last log in
+        :return: -
+        """
+        if self._credentials is None:
+            raise RuntimeError("Polarion access has never been logged in")
+        await self.log_in(*self._credentials)
+
+    async def call_service(self, operation, *args, **kwargs):
+        """
+        Calls a web service operation once a slot of the semaphore is free. A call failing because the session is not
+        valid anymore is retried once after a new log in (except inside an explicit transaction, which is lost with
+        its session).
+        :param operation: async zeep operation to call
+        :return: Result of the operation
+        """
+        generation = self._liveness.generation
+        try:
+            async with self._semaphore:
+                result = await operation(*args, **kwargs)
+        except zeep_exceptions.Fault as fault:
+            # Inside an explicit transaction, a retry on a new session would be committed outside of it
+            if self._credentials is None or self._transaction_open or not is_session_fault(fault):
+                raise
+            async with self._relog_in_lock:
+                # Another task may already have opened a new session
+                if self._liveness.generation == generation:
+                    await self.connect()
+            async with self._semaphore:
+                result = await operation(*args, **kwargs)
+
+        self._liveness.touch()
+        return result
+
+    async def session_is_logged_in(self):
+        """
+        Checks if the session is still logged-in. The server is only asked (hasSubject) when no call succeeded during
+        the idle window.
+        :return: True if the session is logged-in, else False
+        """
+        if not self._liveness.is_stale:
+            return True
+
+        async with self._semaphore:
+            logged_in = await self._session.has_subject()
+        if logged_in:
+            self._liveness.touch()
+        return logged_in
+
+    @property
+    def is_connected(self):
+        return self._session.session_header_element is not None
+
+    @property
+    def hostname(self):
+        return self._hostname
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    def refresh_metadata(self, kind=None, key=None):
+        """
+        Drops cached projects, users, enum options and work item URIs so that they are loaded again on next access
+        :param kind: Kind of metadata to refresh (MetadataCache.PROJECT, USER, ENUM_CONTROL_KEY or WORKITEM_URI),
+                     everything if None
+        :param key: Key of the metadata to refresh within its kind (i.e. a project ID), all if None
+        :return: -
+        """
+        self._metadata.refresh(kind, key)
+
+    @property
+    def envelope_capture(self):
+        return self._envelope_capture
+
+    @property
+    def session(self):
+        return self._session
+
+    @property
+    def tracker(self):
+        return self._tracker
+
+    @property
+    def project(self):
+        return self._project
+
+    @property
+    def test_management(self):
+        return self._test_management
+
+    async def end_session(self):
+        """
+        Terminates the current session
+        :return: -
+        """
+        await self._session.end_session()
+        self._liveness.expire()
+
+    async def begin_transaction(self):
+        """
+        Starts a explicit transaction for the current session.
+        :return: -
+        """
+        await self.call_service(self._session.begin_transaction)
+        self._transaction_open = True
+
+    async def end_transaction(self, rollback):
+        """
+        Ends the explicit transaction of the current session by either commit or rollback.
+        :param rollback: if true the transaction is rolled back otherwise it is  committed (boolean)
+        :return: -
+        """
+        try:
+            await self._session.end_transaction(rollback)
+        finally:
+            self._transaction_open = False
+
+    @property
+    def in_transaction(self) -> bool:
+        """
+        Checks if an explicit transaction has been started and not ended
+        :return: True if a transaction is open, else False
+        """
+        return self._transaction_open
+
+    async def close(self):
+        """
+        Closes the pooled HTTP connections
+        :return: -
+        """
+        await self._transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,570 @@
+from zeep import AsyncClient, xsd
+
+from ..web_services.metadata_cache import MetadataCache
+from ..web_services.session import read_session_header
+from ..web_services.tracker import (STREAM_FIELDS, WORKITEM_FIELDS, is_resolved, resolved_workitem_uri,
+                                    workitem_changes, workitem_page_queries)
+
+
+class AsyncGuardedService:
+    """
+    Class AsyncGuardedService
+    Proxy of an async zeep service: every operation is awaited through AsyncPolarionAccess.call_service, which bounds
+    the number of concurrent calls and re-logs in once on session faults.
+    """
+
+    def __init__(self, service, polarion_access):
+        """
+        Class init
+        :param service: async zeep service proxy (client.service)
+        :param polarion_access: AsyncPolarionAccess instance owning the session
+        """
+        self._service = service
+        self._polarion_access = polarion_access
+
+    def __getattr__(self, operation_name):
+        operation = getattr(self._service, operation_name)
+
+        async def call(*args, **kwargs):
+            return await self._polarion_access.call_service(operation, *args, **kwargs)
+
+        return call
+
+
+class AsyncSessionWebService:
+    """
+    Class AsyncSessionWebService
+    This class gives async access to SessionWebService.wsdl description file
+    """
+
+    def __init__(self, polarion_access, server_prefix, transport=None):
+        self._polarion_access = polarion_access
+        self.client = AsyncClient(wsdl=server_prefix + 'SessionWebService?wsdl', transport=transport)
+        self._session_header_element = None
+
+    async def log_in(self, username: str, password: str) -> None:
+        """
+        Method used to log into Polarion using defined user account and password.
+        :param username: Username used to log in
+        :param password: Password used to log in
+        :return: None
+        """
+        # The session ID is sent in the response header, which zeep does not return
+        with self.client.settings(raw_response=True):
+            response = await self.client.service.logIn(username, password)
+
+        self._session_header_element = read_session_header(response)
+        self.client.set_default_soapheaders([self._session_header_element])
+
+    @property
+    def session_header_element(self):
+        """
+        Property used to get the current session header element
+        :return: Current session header element
+        """
+        return self._session_header_element
+
+    async def end_session(self) -> None:
+        """
+        Method used to terminates the current session
+        :return: None
+        """
+        await self.client.service.endSession()
+
+    async def has_subject(self) -> bool:
+        """
+        Checks if a user is logged-in for the current session.
+        :return: True if user is logged in, else False
+        """
+        return await self.client.service.hasSubject()
+
+    async def begin_transaction(self) -> None:
+        """
+        Method used to start an explicit transaction for the current session.
+        :return: None
+        """
+        await self.client.service.beginTransaction()
+
+    async def end_transaction(self, rollback: bool) -> None:
+        """
+        Method used to end the explicit transaction of the current session by either commit or rollback.
+        :param rollback: if true the transaction is rolled back otherwise it is  committed (boolean)
+        :return: None
+        """
+        await self.client.service.endTransaction(rollback)
+
+
+class AsyncProjectWebService:
+    """
+    Class AsyncProjectWebService
+    This class gives async access to ProjectWebService.wsdl description file
+    """
+
+    def __init__(self, polarion_access, server_prefix, transport=None):
+        self._polarion_access = polarion_access
+        self.client = AsyncClient(server_prefix + 'ProjectWebService?wsdl', transport=transport)
+        self.service = AsyncGuardedService(self.client.service, polarion_access)
+
+    async def get_project(self, project_id: str) -> object:
+        """
+        Method used to get project object using its ID
+        :param project_id: the ID of the project to get
+        :return: Project as an object (loaded once per session, see AsyncPolarionAccess.refresh_metadata)
+        """
+        return await self._polarion_access.metadata.get_async(MetadataCache.PROJECT, project_id,
+                                                              lambda: self.service.getProject(project_id))
+
+    async def get_user(self, user_id: str) -> object:
+        """
+        Method used to get user object using its ID
+        :param user_id: the ID of the user to get
+        :return: User as an object (loaded once per session, see AsyncPolarionAccess.refresh_metadata)
+        """
+        return await self._polarion_access.metadata.get_async(MetadataCache.USER, user_id,
+                                                              lambda: self.service.getUser(user_id))
+
+
+class AsyncTrackerWebService:
+    """
+    Class AsyncTrackerWebService
+    This class gives async access to TrackerWebService.wsdl description file
+    """
+
+    def __init__(self, polarion_access, server_prefix, transport=None):
+        self._polarion_access = polarion_access
+        self.client = AsyncClient(server_prefix + 'TrackerWebService?wsdl', transport=transport)
+        self.client.settings.strict = False
+        self.service = AsyncGuardedService(self.client.service, polarion_access)
+
+    async def create_workitem(self, project_id: str, type_id: str, title: str, description_content: str = ""):
+        """
+        Function used to create a new workitem
+        :param project_id: project id (string)
+        :param type_id: workitem type id(string)
+        :param title: workitem title (string)
+        :param description_content: workitem description (string)
+        :return: URI of created work item
+        """
+        project = await self._polarion_access.project.get_project(project_id)
+        wi_type = self.client.type_factory('ns2').EnumOptionId(id=type_id)
+        description = self.client.type_factory('ns1').Text(type='text/html',
+                                                           content=description_content.replace("\n", "<br>"),
+                                                           contentLossy=False)
+
+        workitem = self.client.type_factory('ns2').WorkItem(project=project,
+                                                            type=wi_type,
+                                                            title=title,
+                                                            description=description)
+
+        return await self.service.createWorkItem(workitem)
+
+    async def query_workitems(self, query: str, sort: str = 'id', fields: [str] = None) -> []:
+        """
+        Function used to get a list of workitems using Polarion query
+        :param query:  (string) the lucene query to be used
+        :param sort: (string) the field to be used for sorting
+        :param fields: (string[]) the keys of the fields that should be filled
+        :return: the list of workitems
+        """
+        if fields is None:
+            fields = STREAM_FIELDS
+        return await self.service.queryWorkItems(query, sort, fields)
+
+    async def iter_workitems(self, query: str, sort: str = 'id', fields: [str] = None, page_size: int = 500):
+        """
+        Async generator used to stream the workitems matching a Polarion query page by page (see
+        TrackerWebService.iter_workitems)
+        :param query: (string) the lucene query to be used
+        :param sort: (string) the field to be used for sorting
+        :param fields: (string[]) the keys of the fields that should be filled
+        :param page_size: (int) number of workitems fetched per page
+        :return: async generator of workitems, in the query order
+        """
+        if fields is None:
+            fields = STREAM_FIELDS
+        page_size = max(1, page_size)
+
+        uris = await self.service.queryWorkItemUris(query, sort) or []
+        for start in range(0, len(uris), page_size):
+            page_uris = uris[start:start + page_size]
+
+            # Keep the workitems of the page URIs only
+            found = {}
+            for page_query in workitem_page_queries(page_uris):
+                for workitem in await self.service.queryWorkItems(page_query, sort, fields) or []:
+                    found[workitem.uri] = workitem
+            for uri in page_uris:
+                if uri not in found:
+                    workitem = await self.service.getWorkItemByUriWithFields(uri, fields)
+                    if is_resolved(workitem):
+                        found[uri] = workitem
+
+            # Keep the order of the URIs query
+            for uri in page_uris:
+                if uri in found:
+                    yield found[uri]
+
+    async def query_workitems_by_ids(self, project_id: str, workitem_ids: [str], fields: [str] = None) -> []:
+        """
+        Function used to get several workitems of a project in a single query (id:(A OR B OR ...))
+        :param project_id: the id of the project that contains the workitems to get
+        :param workitem_ids: the ids of the workitems to get
+        :param fields: (string[]) the keys of the fields that should be filled (default: WORKITEM_FIELDS)
+        :return: the list of workitems found (workitems which do not exist are missing)
+        """
+        if not workitem_ids:
+            return []
+        query = "project.id:%s AND id:(%s)" % (project_id, " OR ".join(workitem_ids))
+        return await self.service.queryWorkItems(query, 'id', fields or WORKITEM_FIELDS) or []
+
+    async def get_workitem_by_id(self, project_id: str, workitem_id: str):
+        """
+        Function used to get a workitem using project and workitem IDs
+        :param project_id: the id of the project that contains the workitem to get
+        :param workitem_id: the id of the work item to get
+        :return: Workitem requested
+        """
+        return await self.service.getWorkItemById(project_id, workitem_id)
+
+    async def get_workitem_by_uri(self, workitem_uri: str):
+        """
+        Function used to get a workitem using its uri
+        :param workitem_uri: the uri of the work item to get
+        :return: Workitem requested
+        """
+        return await self.service.getWorkItemByUri(workitem_uri)
+
+    async def get_custom_field(self, workitem_uri, custom_field_key):
+        """
+        Function used to get a custom field of a work item
+        :param workitem_uri: the URI of the work item to get the custom field from
+        :param custom_field_key: the key of the custom field
+        :return: Custom field as an object
+        """
+        return await self.service.getCustomField(workitem_uri, custom_field_key)
+
+    async def get_enum_control_key(self, project_id, enum_id):
+        return await self._polarion_access.metadata.get_async(
+            MetadataCache.ENUM_CONTROL_KEY, (project_id, enum_id),
+            lambda: self.service.getEnumControlKeyForId(project_id, enum_id))
+
+    async def add_comment(self, workitem_uri: str, title: str, comment: str) -> None:
+        """
+        Function used to set a comment on dedicated workitem
+        :param workitem_uri: URI of workitem
+        :param title: Comment tile
+        :param comment: Comment description (can be HTML content)
+        :return: None
+        """
+        comment_text = self.client.type_factory('ns1').Text(type='text/html',
+                                                            content=comment,
+                                                            contentLossy=False)
+
+        await self.service.addComment(workitem_uri, title, comment_text)
+
+    async def get_workitem_uri(self, project_id: str, workitem_id: str) -> str:
+        """
+        Method used to get the URI of a workitem from its project and workitem IDs, read once (with the id field only)
+        :param project_id: the id of the project that contains the workitem
+        :param workitem_id: the id of the work item
+        :return: URI of the workitem (InvalidWorkItem raised, and nothing cached, if the workitem does not exist)
+        """
+        async def load():
+            workitem = await self.service.getWorkItemByIdWithFields(project_id, workitem_id, ['id'])
+            return resolved_workitem_uri(workitem, project_id, workitem_id)
+
+        return await self._polarion_access.metadata.get_async(MetadataCache.WORKITEM_URI, (project_id, workitem_id),
+                                                              load)
+
+    async def update_workitem_fields(self,
+                                     workitem_uri: str,
+                                     status: str = None,
+                                     severity: str = None,
+                                     title: str = None,
+                                     custom_fields: dict = None) -> None:
+        """
+        Method used to update some fields of a workitem in a single small request (see
+        TrackerWebService.update_workitem_fields)
+        :param workitem_uri: URI of the workitem
+        :param status: Status value (Polarion id of the status), not changed if None
+        :param severity: Severity value (Polarion id of the severity), not changed if None
+        :param title: Title of the workitem, not changed if None
+        :param custom_fields: Values of custom fields by key (enum values have to be EnumOptionId objects), not
+                              changed if None
+        :return: None
+        """
+        factory = self.client.type_factory('ns2')
+        changes = workitem_changes(factory, status, severity, title, custom_fields)
+        if changes:
+            await self.service.updateWorkItem(factory.WorkItem(uri=workitem_uri, **changes))
+
+    async def set_status(self, project_id: str, workitem_id: str, value: str) -> None:
+        """
+        Function used to set workitem status to specific value (workflow)
+        :param project_id: Workitem project id
+        :param workitem_id: Workitem id
+        :param value: Status value (Polarion id of the status)
+        :return:
+        """
+        await self.update_workitem_fields(await self.get_workitem_uri(project_id, workitem_id), status=value)
+
+    async def set_severity(self, project_id: str, workitem_id: str, value: str) -> None:
+        """
+        Method used to set severity of a workitem to a specific value
+        :param project_id: Project ID of the workitem
+        :param workitem_id: Workitem if
+        :param value: Value to set
+        :return: None
+        """
+        await self.update_workitem_fields(await self.get_workitem_uri(project_id, workitem_id), severity=value)
+
+    async def set_custom_field(self, workitem_uri, custom_field_key, value):
+        """
+        Function used to set a custom field of a work item
+        :param workitem_uri: the URI of the work item to set the custom field on
+        :param custom_field_key: the key of the custom field
+        :param value: Value to set
+        :return:
+        """
+        enum_option = self.client.type_factory('ns2').EnumOptionId(id=value)
+        custom_field = self.client.type_factory('ns2').CustomField(key=custom_field_key,
+                                                                   parentItemURI=workitem_uri,
+                                                                   value=enum_option)
+        return await self.service.setCustomField(custom_field)
+
+    async def add_linked_item(self, workitem_uri: str, linked_workitem_uri: str, role: str) -> bool:
+        """
+        Adds a linked work item
+        :param workitem_uri: the ID of the work item to add the link to
+        :param linked_workitem_uri: the ID of the target work item the link points to
+        :param role: the role of the link to add
+        :return: True if link has been added, else False
+        """
+        new_role = self.client.type_factory('ns2').EnumOptionId(id=role)
+        return await self.service.addLinkedItem(workitem_uri, linked_workitem_uri, new_role)
+
+    async def remove_linked_item(self, workitem_uri, linked_item_uri, role) -> bool:
+        """
+        Function used to remove an existing link between two workitems
+        :param workitem_uri: URI of workitems
+        :param linked_item_uri: URI of the link workitem
+        :param role: Link role to remove between the two workitems
+        :return: True if link has been removed, else False
+        """
+        new_role = self.client.type_factory('ns2').EnumOptionId(id=role)
+        return await self.service.removeLinkedItem(workitem_uri, linked_item_uri, new_role)
+
+    async def get_document(self, project_id: str, location: str):
+        """
+        Function used to retrieve the document on the given location.
+        :param project_id: Project ID of the document
+        :param location: Location of the document in the project. Format : SPACE/DOCUMENT_ID
+        :return: The requested document
+        """
+        return await self.service.getModuleByLocation(project_id, location)
+
+    async def get_documents(self, project_id: str, location: str) -> object or [object] or None:
+        """
+        Method used to get all documents on the given location relative to the "modules" folder of the given project.
+        :param project_id: Project ID of the documents
+        :param location: The serialized location relative to the "modules" folder
+        :return: Document(s) of the folder if any, else None
+        """
+        return await self.service.getModules(project_id, location)
+
+    async def get_document_by_uri(self, document_uri):
+        """
+        Method used to get a document using its URI
+        :param document_uri: URI of the document
+        :return: The requested document
+        """
+        return await self.service.getModuleByUri(document_uri)
+
+    async def get_documents_sub_folder(self, project_id: str, location: str) -> [str] or None:
+        """
+        Method used to get the sub-folders of a given location relative to the "documents" folder.
+        :param project_id: Project ID of the folder
+        :param location: Location relative to the "documents" folder.
+        :return: Array of serialized locations (if exist)
+                 None (if no location)
+        """
+        return await self.service.getModulesSubFolders(project_id, location)
+
+    async def set_document_custom_field(self,
+                                        document_uri: str,
+                                        custom_field_key: str,
+                                        custom_field_value: str or int) -> None:
+        """
+        Method used to update a specific custom field of a document
+        WARNING, this method can only be used to set or update str/int custom field, not enumerated or rich text custom
+                 fields
+        :param document_uri: URI of the document
+        :param custom_field_key: Custom field key identifier
+        :param custom_field_value: Custom field value to apply
+        :return: None
+        """
+        custom_field = self.client.type_factory('ns2').Custom(key=custom_field_key, value=custom_field_value)
+
+        document = await self.get_document_by_uri(document_uri)
+        document.customFields.Custom.append(custom_field)
+
+        await self.service.updateModule(document)
+
+    async def generate_workitem_history_by_id(self, project_id: str, workitem_id: str, ignored_fields: [str] = "",
+                                              field_order: [str] = ""):
+        """
+        Method used to generate a specific history for a workitem using its id
+        :param project_id: Project ID of the workitem
+        :param workitem_id: Workitem ID
+        :param ignored_fields: Fields to ignore
+        :param field_order: Field used to sort the history
+        :return: Change history
+        """
+        workitem_uri = await self.get_workitem_uri(project_id, workitem_id)
+        return await self.generate_workitem_history_by_uri(workitem_uri, ignored_fields, field_order)
+
+    async def generate_workitem_history_by_uri(self, workitem_uri: str, ignored_fields: [str] = "",
+                                               field_order: [str] = ""):
+        """
+        Method used to generate a specific history for a workitem using its uri
+        :param workitem_uri: Workitem URI
+        :param ignored_fields: Fields to ignore
+        :param field_order: Field used to sort the history
+        :return: Change history
+        """
+        return await self.service.generateHistory(workitem_uri, ignored_fields, field_order)
+
+
+class AsyncTestManagementWebService:
+    """
+    Class AsyncTestManagementWebService
+    This class gives async access to TestManagementWebService.wsdl description file
+    """
+
+    def __init__(self, polarion_access, server_prefix, transport=None):
+        self._polarion_access = polarion_access
+        self.client = AsyncClient(server_prefix + 'TestManagementWebService?wsdl', transport=transport)
+        self.service = AsyncGuardedService(self.client.service, polarion_access)
+
+    def factory_create(self, class_reference):
+        """
+        Create an object with which has a specific class reference
+        :param class_reference: class reference (can be found in wsdl)
+        :return: corresponding class
+        """
+        return self.client.type_factory(class_reference)
+
+    async def get_test_steps(self, workitem_uri):
+        """
+        Gets the TestSteps of WI with given URI
+        :param workitem_uri: the URI of the work item to get
+        :return: the test steps of WI with given URI
+        """
+        return await self.service.getTestSteps(workitem_uri)
+
+    async def set_test_steps(self, workitem_uri, test_steps):
+        """
+        Adds or replaces the Test Steps of WI with given URI
+        :param workitem_uri: the SubterraURI of the item to set the WI
+        :param test_steps: an array containing an entry for each step
+        :return: None
+        """
+        await self.service.setTestSteps(workitem_uri, test_steps)
+
+    async def create_test_run_with_title(self, project, test_run_id, title, template):
+        """
+        Create a new Test Run
+        :param project: The Project the Test Run will be created in
+        :param test_run_id: The Id of the Test Run to be created in
+        :param title: The title of the Test Run to be created. The template title is used when null
+        :param template: The template used to create the Test Run
+        :return: None
+        """
+        await self.service.createTestRunWithTitle(project, test_run_id, title, template)
+
+    async def get_test_run(self, project, test_run_id):
+        """
+        Get a Test Run
+        :param project: The Project the Test Run
+        :param test_run_id: The Id of the Test Run to find
+        :return: The Test Run
+        """
+        return await self.service.getTestRunById(project, test_run_id)
+
+    async def get_test_case_records(self, test_run_uri, test_case_uri):
+        """
+        Get the records of a test case in a Test Run
+        :param test_run_uri:
+        :param test_case_uri:
+        :return: The test records
+        """
+        return await self.service.getTestCaseRecords(test_run_uri, test_case_uri)
+
+    async def add_test_record(self,
+                              test_run_uri,
+                              test_case_uri,
+                              test_result_id: str,
+                              test_comment: str,
+                              executed_by_uri,
+                              executed,
+                              duration: float,
+                              defect_uri=xsd.SkipValue):
+        """
+        Create a new Test Record
+        :param test_run_uri:
+        :param test_case_uri:
+        :param test_result_id:
+        :param test_comment:
+        :param executed_by_uri:
+        :param executed:
+        :param duration:
+        :param defect_uri
+        :return: None
+        """
+        await self.service.addTestRecord(test_run_uri,
+                                         test_case_uri,
+                                         test_result_id,
+                                         test_comment,
+                                         executed_by_uri,
+                                         executed,
+                                         duration,
+                                         defect_uri)
+
+    async def update_test_record(self,
+                                 test_case_uri,
+                                 index: int,
+                                 test_result_id: str,
+                                 test_comment: str,
+                                 executed_by_uri,
+                                 executed,
+                                 duration: float,
+                                 defect_uri=xsd.SkipValue):
+        """
+
+        :param test_case_uri:
+        :param index:
+        :param test_result_id:
+        :param test_comment:
+        :param executed_by_uri:
+        :param executed:
+        :param duration:
+        :param defect_uri:
+        :return:
+        """
+        await self.service.updateTestRecord(test_case_uri,
+                                            index,
+                                            test_result_id,
+                                            test_comment,
+                                            executed_by_uri,
+                                            executed,
+                                            duration,
+                                            defect_uri)
+
+    async def execute_test(self, test_run_uri, records):
+        """
+
+        :param test_run_uri:
+        :param records:
+        :return:
+        """
+        await self.service.executeTest(test_run_uri, records)
@@ -0,0 +1,222 @@
+from .polarion import TransactionRolledBack
+
+
+class BatchOperation:
+    """
+    Class BatchOperation
+    Write operation queued in a WriteBatch, holding its result once the batch has been flushed
+    """
+
+    def __init__(self, name: str, function, args: tuple, kwargs: dict):
+        self.name = name
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+
+        self.executed = False
+        self.result = None
+        self.error = None
+
+    def __repr__(self):
+        return "BatchOperation(%s, executed=%s, error=%r)" % (self.name, self.executed, self.error)
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Property used to know if the operation has been committed
+        :return: True if the operation has been executed and committed, else False
+        """
+        return self.executed and self.error is None
+
+    def execute(self) -> None:
+        """
+        Method used to execute the operation (called by WriteBatch.flush)
+        :return: None
+        """
+        self.result = self._function(*self._args, **self._kwargs)
+        self.executed = True
+
+
+class WriteBatch:
+    """
+    Class WriteBatch
+    Unit of work queuing write operations and flushing them by chunks, each chunk inside an explicit transaction.
+    A failing operation rolls back its whole chunk. Use it as a context manager: pending operations are flushed when
+    leaving the block without exception, and discarded (with a TransactionRolledBack error) otherwise.
+    """
+
+    def __init__(self, polarion_access, max_ops: int = 500, stop_on_error: bool = False):
+        """
+        Class init
+        :param polarion_access: PolarionAccess used to execute the operations
+        :param max_ops: Maximum number of operations per transaction, the queue is flushed when it is reached
+        :param stop_on_error: If True, no other chunk is flushed after a rolled back one
+        """
+        self._polarion_access = polarion_access
+        self._max_ops = max_ops
+        self._stop_on_error = stop_on_error
+        self._pending = []
+        self._operations = []
+        self._failed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            for operation in self._pending:
+                operation.error = TransactionRolledBack("Not executed: the batch block raised %s" % exc_type.__name__)
+            self._pending = []
+
+    @property
+    def operations(self) -> [BatchOperation]:
+        """
+        Property used to get all the operations queued in the batch, in queue order
+        :return: List of operations
+        """
+        return self._operations
+
+    @property
+    def failed_operations(self) -> [BatchOperation]:
+        """
+        Property used to get the flushed operations which have not been committed
+        :return: List of failed operations
+        """
+        return [operation for operation in self._operations if operation.error is not None]
+
+    def queue(self, name: str, function, *args, **kwargs) -> BatchOperation:
+        """
+        Method used to queue any write operation
+        :param name: Name of the operation (used in reports)
+        :param function: Function executing the operation
+        :return: Queued operation
+        """
+        operation = BatchOperation(name, function, args, kwargs)
+        self._pending.append(operation)
+        self._operations.append(operation)
+
+        if len(self._pending) >= self._max_ops:
+            self.flush()
+        return operation
+
+    def add_comment(self, workitem_uri: str, title: str, comment: str) -> BatchOperation:
+        """
+        Queue a comment on a workitem (see TrackerWebService.add_comment)
+        """
+        return self.queue('add_comment', self._polarion_access.tracker.add_comment, workitem_uri, title, comment)
+
+    def add_linked_item(self, workitem_uri: str, linked_workitem_uri: str, role: str) -> BatchOperation:
+        """
+        Queue a link between two workitems (see TrackerWebService.add_linked_item)
+        """
+        return self.queue('add_linked_item', self._polarion_access.tracker.add_linked_item,
+                          workitem_uri, linked_workitem_uri, role)
+
+    def remove_linked_item(self, workitem_uri: str, linked_item_uri: str, role: str) -> BatchOperation:
+        """
+        Queue the removal of a link between two workitems (see TrackerWebService.remove_linked_item)
+        """
+        return self.queue('remove_linked_item', self._polarion_access.tracker.remove_linked_item,
+                          workitem_uri, linked_item_uri, role)
+
+    def set_custom_field(self, workitem_uri: str, custom_field_key: str, value) -> BatchOperation:
+        """
+        Queue a custom field change (see TrackerWebService.set_custom_field)
+        """
+        return self.queue('set_custom_field', self._polarion_access.tracker.set_custom_field,
+                          workitem_uri, custom_field_key, value)
+
+    def update_workitem_fields(self, workitem_uri: str, **fields) -> BatchOperation:
+        """
+        Queue a partial workitem update (see TrackerWebService.update_workitem_fields)
+        """
+        return self.queue('update_workitem_fields', self._polarion_access.tracker.update_workitem_fields,
+                          workitem_uri, **fields)
+
+    def add_test_record(self, *args, **kwargs) -> BatchOperation:
+        """
+        Queue a test record (see TestManagementWebService.add_test_record)
+        """
+        return self.queue('add_test_record', self._polarion_access.test_management.add_test_record, *args, **kwargs)
+
+    def flush(self) -> [BatchOperation]:
+        """
+        Method used to execute the pending operations, by chunks of max_ops operations per transaction
+        :return: List of the flushed operations
+        """
+        flushed = []
+        while self._pending:
+            chunk = self._pending[:self._max_ops]
+            self._pending = self._pending[self._max_ops:]
+            flushed.extend(chunk)
+
+            if self._failed and self._stop_on_error:
+                for operation in chunk:
+                    operation.error = TransactionRolledBack("Not executed: a previous transaction has been rolled back")
+                continue
+
+            try:
+                self._flush_chunk(chunk)
+            except BaseException as exception:
+                # Interrupted flush (i.e. KeyboardInterrupt): the next chunks are reported as not executed
+                for operation in self._pending:
+                    operation.error = TransactionRolledBack("Not executed: the flush has been interrupted by %s"
+                                                            % type(exception).__name__)
+                flushed.extend(self._pending)
+                self._pending = []
+                raise
+        return flushed
+
+    def _flush_chunk(self, chunk: [BatchOperation]) -> None:
+        """
+        Protected method used to execute a chunk of operations in one transaction, rolled back on first failure
+        (whatever the failure, the transaction is never left open and every operation of a failed chunk, including
+        a chunk whose transaction could not be started, gets an error)
+        :param chunk: Operations to execute
+        :return: None
+        """
+        try:
+            self._polarion_access.begin_transaction()
+        except BaseException as exception:
+            self._failed = True
+            for operation in chunk:
+                operation.error = exception
+            if not isinstance(exception, Exception):
+                raise
+            return
+
+        operation = None
+        try:
+            for operation in chunk:
+                operation.execute()
+        except BaseException as exception:
+            self._failed = True
+            failure = TransactionRolledBack("Transaction rolled back (%s failed: %s)" % (operation.name, exception))
+            for other_operation in chunk:
+                other_operation.error = exception if other_operation is operation else failure
+
+            try:
+                self._polarion_access.end_transaction(True)
+            except Exception:
+                # The failure of the operation is reported, the transaction ends with the session anyway
+                pass
+            finally:
+                # Cached workitems may have been patched by rolled back operations
+                if self._polarion_access.tracker.cache is not None:
+                    self._polarion_access.tracker.cache.clear()
+            if not isinstance(exception, Exception):
+                raise
+            return
+
+        try:
+            self._polarion_access.end_transaction(False)
+        except BaseException as exception:
+            self._failed = True
+            for operation in chunk:
+                operation.error = exception
+            if self._polarion_access.tracker.cache is not None:
+                self._polarion_access.tracker.cache.clear()
+            if not isinstance(exception, Exception):
+                raise
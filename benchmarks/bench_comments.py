@@ -0,0 +1,24 @@
+"""
+CommentsTree construction with large comment sets
+"""
+import pytest
+
+from polarion_py3.objects import WorkitemSnapshot
+from polarion_py3.objects.comment import CommentsTree
+
+
+@pytest.fixture(params=[100, 1000, 5000])
+def commented_workitem(request, polarion_access, fake_data):
+    fake_data.comments = request.param
+    workitem_id = fake_data.workitem_id(0)
+    return polarion_access.tracker.get_workitem_by_id(fake_data.project_id, workitem_id)
+
+
+def test_comments_tree_from_zeep(benchmark, fake_data, commented_workitem):
+    benchmark.group = "comments %d" % fake_data.comments
+    benchmark(CommentsTree, commented_workitem)
+
+
+def test_comments_tree_from_snapshot(benchmark, fake_data, commented_workitem):
+    benchmark.group = "comments %d" % fake_data.comments
+    benchmark(CommentsTree, WorkitemSnapshot.from_zeep(commented_workitem))
@@ -0,0 +1,17 @@
+"""
+query_workitems at increasing result sizes, with zeep objects and in raw mode
+"""
+import pytest
+
+from polarion_py3.web_services.tracker import WORKITEM_FIELDS
+
+
+@pytest.mark.parametrize("raw", [False, True], ids=["zeep", "raw"])
+@pytest.mark.parametrize("size", [100, 1000, 5000])
+def test_query_workitems(benchmark, polarion_access, fake_data, size, raw):
+    benchmark.group = "query_workitems %d" % size
+    fake_data.workitems = size
+    query = "project.id:%s" % fake_data.project_id
+    workitems = benchmark.pedantic(polarion_access.tracker.query_workitems, (query, "id", WORKITEM_FIELDS, raw),
+                                   rounds=3, warmup_rounds=1)
+    assert len(workitems) == size
@@ -0,0 +1,43 @@
+"""
+Client startup: WSDL loading (cold and cached) and first log in
+"""
+import pytest
+
+from conftest import PASSWORD, USERNAME
+from polarion_py3 import Polarion, PolarionAccess
+from polarion_py3.web_services.wsdl_cache import WsdlCache
+
+
+def _start(hostname, wsdl_cache):
+    access = PolarionAccess(hostname, wsdl_cache=wsdl_cache)
+    access.log_in(USERNAME, PASSWORD)
+    access.close()
+
+
+@pytest.mark.benchmark(group="startup")
+def test_access_startup_cached_wsdl(benchmark, fake_server, wsdl_cache):
+    benchmark(_start, fake_server.hostname, wsdl_cache)
+
+
+@pytest.mark.benchmark(group="startup")
+def test_access_startup_cold_wsdl(benchmark, fake_server, tmp_path):
+    paths = iter(range(1000))
+
+    def new_cache():
+        return (fake_server.hostname, WsdlCache(str(tmp_path / ("wsdl%d.sqlite" % next(paths))))), {}
+
+    benchmark.pedantic(_start, setup=new_cache, rounds=10)
+
+
+@pytest.mark.benchmark(group="startup")
+def test_polarion_startup(benchmark, fake_server, wsdl_cache):
+    project_id = fake_server.data.project_id
+
+    def start():
+        Polarion._Polarion__instance = None
+        polarion = Polarion(fake_server.hostname, project_id, project_id + "-", USERNAME, PASSWORD,
+                            wsdl_cache=wsdl_cache)
+        polarion.polarion_access.close()
+
+    benchmark(start)
+    Polarion._Polarion__instance = None
@@ -0,0 +1,56 @@
+"""
+Bulk test record upload: executeTest chunks and ingestion of a JUnit report
+"""
+from datetime import datetime
+
+import pytest
+
+# Imported through the module: pytest would try to collect Test* classes
+from polarion_py3 import test_results
+
+RECORDS = 2000
+CHUNK_SIZE = 200
+TEST_RUN_URI = "subterra:data-service:objects:/default/PRJ${TestRun}BENCH"
+EXECUTED_BY_URI = "subterra:data-service:objects:/default/${User}bench"
+
+
+@pytest.mark.benchmark(group="test_records")
+def test_execute_test_records(benchmark, polarion_access, fake_data):
+    fake_data.workitems = RECORDS
+    test_management = polarion_access.test_management
+    executed = datetime(2024, 1, 1, 12, 0)
+
+    def upload():
+        records = [test_management.create_test_record(fake_data.workitem_uri(fake_data.workitem_id(index)), "passed",
+                                                      None, EXECUTED_BY_URI, executed, 0.5)
+                   for index in range(RECORDS)]
+        for start in range(0, RECORDS, CHUNK_SIZE):
+            test_management.execute_test(TEST_RUN_URI, records[start:start + CHUNK_SIZE])
+
+    benchmark.pedantic(upload, rounds=5, warmup_rounds=1)
+
+
+@pytest.fixture
+def junit_report(tmp_path, fake_data):
+    fake_data.workitems = RECORDS
+    path = tmp_path / "junit.xml"
+    with open(path, "w", encoding="utf-8") as report:
+        report.write('<?xml version="1.0" encoding="UTF-8"?><testsuites><testsuite name="bench">')
+        for index in range(RECORDS):
+            report.write('<testcase classname="bench" name="test_%s" time="0.5">' % fake_data.workitem_id(index))
+            if index % 7 == 0:
+                report.write('<failure message="assertion failed">trace</failure>')
+            report.write('</testcase>')
+        report.write('</testsuite></testsuites>')
+    return str(path)
+
+
+@pytest.mark.benchmark(group="test_records")
+def test_ingest_junit_report(benchmark, polarion_access, fake_data, junit_report):
+    def ingest():
+        resolver = test_results.TestCaseResolver(polarion_access, fake_data.project_id)
+        ingestion = test_results.TestResultsIngestion(polarion_access, EXECUTED_BY_URI, resolver, CHUNK_SIZE)
+        return ingestion.ingest(junit_report, TEST_RUN_URI)
+
+    report = benchmark.pedantic(ingest, rounds=5, warmup_rounds=1)
+    assert report.succeeded
@@ -0,0 +1,38 @@
+"""
+PolarionWorkitem construction from zeep work items and from snapshots
+"""
+import pytest
+
+from polarion_py3.objects import WorkitemSnapshot
+from polarion_py3.objects.workitem import PolarionWorkitem
+from polarion_py3.web_services.tracker import WORKITEM_FIELDS
+
+
+class BenchWorkitem(PolarionWorkitem):
+    WORKITEM_TYPE = "testcase"
+
+
+@pytest.fixture
+def workitems(polarion, fake_data):
+    fake_data.workitems = 200
+    # Odd work items are test cases
+    query = "id:(%s)" % " OR ".join(fake_data.workitem_id(index) for index in range(0, 200, 2))
+    return polarion.polarion_access.tracker.query_workitems(query, "id", WORKITEM_FIELDS)
+
+
+@pytest.mark.benchmark(group="workitem")
+def test_workitem_from_zeep(benchmark, workitems):
+    benchmark(lambda: [BenchWorkitem(workitem, WORKITEM_FIELDS) for workitem in workitems])
+
+
+@pytest.mark.benchmark(group="workitem")
+def test_workitem_from_snapshot(benchmark, workitems):
+    snapshots = [WorkitemSnapshot.from_zeep(workitem) for workitem in workitems]
+    benchmark(lambda: [BenchWorkitem(snapshot) for snapshot in snapshots])
+
+
+@pytest.mark.benchmark(group="workitem")
+def test_workitem_custom_fields(benchmark, workitems):
+    wrapped = [BenchWorkitem(workitem, WORKITEM_FIELDS) for workitem in workitems]
+    keys = ["custom%d" % index for index in range(5)]
+    benchmark(lambda: [workitem.get_custom_field_values(*keys) for workitem in wrapped])
@@ -0,0 +1,81 @@
+"""
+Benchmarks of the library against the local fake Polarion server (see fake_server.py), run with pytest-benchmark:
+    python -m pytest benchmarks
+The latency injected in each SOAP response can be set with the POLARION_BENCH_LATENCY environment variable (seconds).
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "polarion_py3"
+
+
+def _load_package() -> None:
+    """
+    Function used to import the repository as the polarion_py3 package, whatever the name of its checkout folder
+    :return: None
+    """
+    if PACKAGE in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(PACKAGE, os.path.join(ROOT, "__init__.py"),
+                                                  submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
+
+
+_load_package()
+
+from fake_server import FakePolarionData, FakePolarionServer  # noqa: E402
+from polarion_py3 import Polarion, PolarionAccess  # noqa: E402
+from polarion_py3.web_services.wsdl_cache import WsdlCache  # noqa: E402
+
+USERNAME = "bench"
+PASSWORD = "bench"
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    latency = float(os.environ.get("POLARION_BENCH_LATENCY", "0"))
+    with FakePolarionServer(FakePolarionData(), latency=latency) as server:
+        yield server
+
+
+@pytest.fixture
+def fake_data(fake_server):
+    """
+    Data of the fake server, restored after the benchmark (benchmarks change the sizes they need)
+    """
+    saved = dict(vars(fake_server.data))
+    yield fake_server.data
+    vars(fake_server.data).update(saved)
+
+
+@pytest.fixture(scope="session")
+def wsdl_cache(tmp_path_factory, fake_server):
+    cache = WsdlCache(str(tmp_path_factory.mktemp("wsdl") / "wsdl.sqlite"))
+    # Warm the cache once, benchmarks measure the steady state
+    PolarionAccess(fake_server.hostname, wsdl_cache=cache).close()
+    return cache
+
+
+@pytest.fixture
+def polarion_access(fake_server, wsdl_cache):
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, coalesce_reads=False)
+    access.log_in(USERNAME, PASSWORD)
+    yield access
+    access.close()
+
+
+@pytest.fixture
+def polarion(fake_server, wsdl_cache):
+    Polarion._Polarion__instance = None
+    project_id = fake_server.data.project_id
+    instance = Polarion(fake_server.hostname, project_id, project_id + "-", USERNAME, PASSWORD,
+                        wsdl_cache=wsdl_cache)
+    yield instance
+    instance.polarion_access.close()
+    Polarion._Polarion__instance = None
@@ -0,0 +1,748 @@
+"""
+Local stand-in of a Polarion server
+Serves simplified versions of the Session, Tracker, Project and TestManagement WSDLs and answers their operations with
+synthetic data whose size is configurable, with an optional injected latency.
+"""
+import gzip
+import re
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+SOAP_ENV = "http://schemas.xmlsoap.org/soap/envelope/"
+XSI = "http://www.w3.org/2001/XMLSchema-instance"
+SESSION_NS = "http://ws.polarion.com/session"
+TYPES_NS = "http://ws.polarion.com/types"
+TRACKER_TYPES_NS = "http://ws.polarion.com/TrackerWebService-types"
+TEST_TYPES_NS = "http://ws.polarion.com/TestManagementWebService-types"
+
+# Operations changing data: they are committed at once, or when the explicit transaction of their session ends
+WRITE_OPERATIONS = {"createWorkItem", "updateWorkItem", "addComment", "setCustomField", "addLinkedItem",
+                    "removeLinkedItem", "updateModule", "setTestSteps", "createTestRunWithTitle", "addTestRecord",
+                    "updateTestRecord", "executeTest"}
+
+SERVICES = ("SessionWebService", "TrackerWebService", "ProjectWebService", "TestManagementWebService")
+
+TYPES_SCHEMA = """
+<xsd:schema targetNamespace="%(types)s" elementFormDefault="qualified">
+  <xsd:complexType name="Text"><xsd:sequence>
+    <xsd:element name="type" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="content" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="contentLossy" type="xsd:boolean" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="User"><xsd:sequence>
+    <xsd:element name="email" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="name" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence><xsd:attribute name="uri" type="xsd:string"/></xsd:complexType>
+  <xsd:complexType name="Project"><xsd:sequence>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="name" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence><xsd:attribute name="uri" type="xsd:string"/></xsd:complexType>
+</xsd:schema>
+<xsd:schema targetNamespace="%(tracker)s" elementFormDefault="qualified" xmlns:t="%(types)s">
+  <xsd:import namespace="%(types)s"/>
+  <xsd:complexType name="EnumOptionId"><xsd:sequence>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="ArrayOfEnumOptionId"><xsd:sequence>
+    <xsd:element name="EnumOptionId" type="tr:EnumOptionId" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="Custom"><xsd:sequence>
+    <xsd:element name="key" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="value" type="xsd:anyType" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="ArrayOfCustom"><xsd:sequence>
+    <xsd:element name="Custom" type="tr:Custom" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="CustomField"><xsd:sequence>
+    <xsd:element name="key" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="parentItemURI" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="value" type="xsd:anyType" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="Comment"><xsd:sequence>
+    <xsd:element name="author" type="t:User" minOccurs="0"/>
+    <xsd:element name="created" type="xsd:dateTime" minOccurs="0"/>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="parentCommentURI" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="text" type="t:Text" minOccurs="0"/>
+    <xsd:element name="title" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence><xsd:attribute name="uri" type="xsd:string"/></xsd:complexType>
+  <xsd:complexType name="ArrayOfComment"><xsd:sequence>
+    <xsd:element name="Comment" type="tr:Comment" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="LinkedWorkItem"><xsd:sequence>
+    <xsd:element name="role" type="tr:EnumOptionId" minOccurs="0"/>
+    <xsd:element name="suspect" type="xsd:boolean" minOccurs="0"/>
+    <xsd:element name="workItemURI" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="ArrayOfLinkedWorkItem"><xsd:sequence>
+    <xsd:element name="LinkedWorkItem" type="tr:LinkedWorkItem" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="WorkItem"><xsd:sequence>
+    <xsd:element name="author" type="t:User" minOccurs="0"/>
+    <xsd:element name="comments" type="tr:ArrayOfComment" minOccurs="0"/>
+    <xsd:element name="created" type="xsd:dateTime" minOccurs="0"/>
+    <xsd:element name="customFields" type="tr:ArrayOfCustom" minOccurs="0"/>
+    <xsd:element name="description" type="t:Text" minOccurs="0"/>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="linkedWorkItems" type="tr:ArrayOfLinkedWorkItem" minOccurs="0"/>
+    <xsd:element name="project" type="t:Project" minOccurs="0"/>
+    <xsd:element name="severity" type="tr:EnumOptionId" minOccurs="0"/>
+    <xsd:element name="status" type="tr:EnumOptionId" minOccurs="0"/>
+    <xsd:element name="title" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="type" type="tr:EnumOptionId" minOccurs="0"/>
+    <xsd:element name="updated" type="xsd:dateTime" minOccurs="0"/>
+  </xsd:sequence>
+  <xsd:attribute name="unresolvable" type="xsd:boolean"/>
+  <xsd:attribute name="uri" type="xsd:string"/></xsd:complexType>
+  <xsd:complexType name="Module"><xsd:sequence>
+    <xsd:element name="customFields" type="tr:ArrayOfCustom" minOccurs="0"/>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="moduleLocation" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="title" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence><xsd:attribute name="uri" type="xsd:string"/></xsd:complexType>
+  <xsd:complexType name="FieldDiff"><xsd:sequence>
+    <xsd:element name="after" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="before" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="fieldName" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="ArrayOfFieldDiff"><xsd:sequence>
+    <xsd:element name="FieldDiff" type="tr:FieldDiff" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="Change"><xsd:sequence>
+    <xsd:element name="creationDate" type="xsd:dateTime" minOccurs="0"/>
+    <xsd:element name="diffs" type="tr:ArrayOfFieldDiff" minOccurs="0"/>
+    <xsd:element name="revision" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="user" type="t:User" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+</xsd:schema>
+<xsd:schema targetNamespace="%(test)s" elementFormDefault="qualified" xmlns:t="%(types)s">
+  <xsd:import namespace="%(types)s"/>
+  <xsd:import namespace="%(tracker)s"/>
+  <xsd:complexType name="ArrayOfText"><xsd:sequence>
+    <xsd:element name="Text" type="t:Text" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="TestStep"><xsd:sequence>
+    <xsd:element name="values" type="tm:ArrayOfText" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="ArrayOfTestStep"><xsd:sequence>
+    <xsd:element name="TestStep" type="tm:TestStep" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="ArrayOfEnumOptionId"><xsd:sequence>
+    <xsd:element name="EnumOptionId" type="tr:EnumOptionId" minOccurs="0" maxOccurs="unbounded"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="TestSteps"><xsd:sequence>
+    <xsd:element name="keys" type="tm:ArrayOfEnumOptionId" minOccurs="0"/>
+    <xsd:element name="steps" type="tm:ArrayOfTestStep" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+  <xsd:complexType name="TestRun"><xsd:sequence>
+    <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="status" type="tr:EnumOptionId" minOccurs="0"/>
+    <xsd:element name="title" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence><xsd:attribute name="uri" type="xsd:string"/></xsd:complexType>
+  <xsd:complexType name="TestRecord"><xsd:sequence>
+    <xsd:element name="comment" type="t:Text" minOccurs="0"/>
+    <xsd:element name="defectURI" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="duration" type="xsd:double" minOccurs="0"/>
+    <xsd:element name="executed" type="xsd:dateTime" minOccurs="0"/>
+    <xsd:element name="executedByURI" type="xsd:string" minOccurs="0"/>
+    <xsd:element name="result" type="tr:EnumOptionId" minOccurs="0"/>
+    <xsd:element name="testCaseURI" type="xsd:string" minOccurs="0"/>
+  </xsd:sequence></xsd:complexType>
+</xsd:schema>
+"""
+
+S = "xsd:string"
+STRINGS = ("xsd:string", "unbounded")
+
+# Operation name: (input parameters as (name, type[, maxOccurs]), return type as (type[, maxOccurs]) or None)
+OPERATIONS = {
+    "SessionWebService": {
+        "logIn": ([("userName", S), ("password", S)], None),
+        "endSession": ([], None),
+        "hasSubject": ([], ("xsd:boolean",)),
+        "beginTransaction": ([], None),
+        "endTransaction": ([("rollback", "xsd:boolean")], None),
+    },
+    "TrackerWebService": {
+        "getWorkItemById": ([("projectId", S), ("workitemId", S)], ("tr:WorkItem",)),
+        "getWorkItemByUri": ([("uri", S)], ("tr:WorkItem",)),
+        "getWorkItemByIdWithFields": ([("projectId", S), ("workitemId", S), ("fields",) + STRINGS],
+                                      ("tr:WorkItem",)),
+        "getWorkItemByUriWithFields": ([("uri", S), ("fields",) + STRINGS], ("tr:WorkItem",)),
+        "queryWorkItems": ([("query", S), ("sort", S), ("fields",) + STRINGS], ("tr:WorkItem", "unbounded")),
+        "queryWorkItemsLimited": ([("query", S), ("sort", S), ("fields",) + STRINGS, ("limit", "xsd:int")],
+                                  ("tr:WorkItem", "unbounded")),
+        "queryWorkItemsBySQL": ([("sqlQuery", S), ("fields",) + STRINGS], ("tr:WorkItem", "unbounded")),
+        "queryWorkItemUris": ([("query", S), ("sort", S)], STRINGS),
+        "getCustomField": ([("workitemURI", S), ("key", S)], ("tr:CustomField",)),
+        "getEnumControlKeyForId": ([("projectId", S), ("enumId", S)], (S,)),
+        "createWorkItem": ([("content", "tr:WorkItem")], (S,)),
+        "updateWorkItem": ([("content", "tr:WorkItem")], None),
+        "addComment": ([("parentUri", S), ("title", S), ("content", "t:Text")], (S,)),
+        "setCustomField": ([("customField", "tr:CustomField")], None),
+        "addLinkedItem": ([("workitemURI", S), ("linkedItemURI", S), ("role", "tr:EnumOptionId")],
+                          ("xsd:boolean",)),
+        "removeLinkedItem": ([("workitemURI", S), ("linkedItemURI", S), ("role", "tr:EnumOptionId")],
+                             ("xsd:boolean",)),
+        "getModuleByLocation": ([("projectId", S), ("location", S)], ("tr:Module",)),
+        "getModuleByUri": ([("uri", S)], ("tr:Module",)),
+        "getModules": ([("projectId", S), ("location", S)], ("tr:Module", "unbounded")),
+        "getModulesSubFolders": ([("projectId", S), ("location", S)], STRINGS),
+        "updateModule": ([("module", "tr:Module")], None),
+        "generateHistory": ([("uri", S), ("ignoredFields",) + STRINGS, ("fieldOrder",) + STRINGS],
+                            ("tr:Change", "unbounded")),
+    },
+    "ProjectWebService": {
+        "getProject": ([("projectId", S)], ("t:Project",)),
+        "getUser": ([("userId", S)], ("t:User",)),
+    },
+    "TestManagementWebService": {
+        "getTestSteps": ([("workitemURI", S)], ("tm:TestSteps",)),
+        "setTestSteps": ([("workitemURI", S), ("testSteps", "tm:TestStep", "unbounded")], None),
+        "createTestRunWithTitle": ([("projectId", S), ("id", S), ("title", S), ("template", S)], (S,)),
+        "getTestRunById": ([("projectId", S), ("id", S)], ("tm:TestRun",)),
+        "getTestCaseRecords": ([("testRunURI", S), ("testCaseURI", S)], ("tm:TestRecord", "unbounded")),
+        "addTestRecord": ([("testRunURI", S), ("testCaseURI", S), ("testResultId", S), ("testComment", "t:Text"),
+                           ("executedByURI", S), ("executed", "xsd:dateTime"), ("duration", "xsd:double"),
+                           ("defectURI", S)], None),
+        "updateTestRecord": ([("testCaseURI", S), ("index", "xsd:int"), ("testResultId", S),
+                              ("testComment", "t:Text"), ("executedByURI", S), ("executed", "xsd:dateTime"),
+                              ("duration", "xsd:double"), ("defectURI", S)], None),
+        "executeTest": ([("testRunURI", S), ("records", "tm:TestRecord", "unbounded")], None),
+    },
+}
+
+
+def service_namespace(service: str) -> str:
+    return "http://ws.polarion.com/%s-impl" % service
+
+
+def _element(name, xsd_type, max_occurs="1"):
+    return '<xsd:element name="%s" type="%s" minOccurs="0" maxOccurs="%s"/>' % (name, xsd_type, max_occurs)
+
+
+def build_wsdl(service: str, address: str) -> bytes:
+    """
+    Function used to build the WSDL of a fake web service
+    :param service: Name of the web service
+    :param address: Address of the SOAP endpoint
+    :return: WSDL document
+    """
+    namespace = service_namespace(service)
+    elements, messages, port_operations, binding_operations = [], [], [], []
+
+    for name, (parameters, result) in OPERATIONS[service].items():
+        inputs = "".join(_element(*parameter) for parameter in parameters)
+        outputs = _element(name + "Return", *result) if result else ""
+        elements.append('<xsd:element name="%s"><xsd:complexType><xsd:sequence>%s</xsd:sequence>'
+                        '</xsd:complexType></xsd:element>' % (name, inputs))
+        elements.append('<xsd:element name="%sResponse"><xsd:complexType><xsd:sequence>%s</xsd:sequence>'
+                        '</xsd:complexType></xsd:element>' % (name, outputs))
+        messages.append('<wsdl:message name="%(n)sRequest"><wsdl:part name="parameters" element="impl:%(n)s"/>'
+                        '</wsdl:message><wsdl:message name="%(n)sResponse">'
+                        '<wsdl:part name="parameters" element="impl:%(n)sResponse"/></wsdl:message>' % {"n": name})
+        port_operations.append('<wsdl:operation name="%(n)s"><wsdl:input message="impl:%(n)sRequest"/>'
+                               '<wsdl:output message="impl:%(n)sResponse"/></wsdl:operation>' % {"n": name})
+        binding_operations.append('<wsdl:operation name="%s"><soap:operation soapAction=""/>'
+                                  '<wsdl:input><soap:body use="literal"/></wsdl:input>'
+                                  '<wsdl:output><soap:body use="literal"/></wsdl:output>'
+                                  '</wsdl:operation>' % name)
+
+    namespaces = {"types": TYPES_NS, "tracker": TRACKER_TYPES_NS, "test": TEST_TYPES_NS}
+    return ("""<?xml version="1.0" encoding="UTF-8"?>
+<wsdl:definitions targetNamespace="%(ns)s" xmlns:impl="%(ns)s" xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:t="%(types)s" xmlns:tr="%(tracker)s" xmlns:tm="%(test)s">
+<wsdl:types>
+<xsd:schema targetNamespace="%(ns)s" elementFormDefault="qualified">
+  <xsd:import namespace="%(types)s"/><xsd:import namespace="%(tracker)s"/><xsd:import namespace="%(test)s"/>
+  %(elements)s
+</xsd:schema>
+%(schemas)s
+</wsdl:types>
+%(messages)s
+<wsdl:portType name="%(service)s">%(port)s</wsdl:portType>
+<wsdl:binding name="%(service)sSoapBinding" type="impl:%(service)s">
+  <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+  %(binding)s
+</wsdl:binding>
+<wsdl:service name="%(service)sService">
+  <wsdl:port name="%(service)s" binding="impl:%(service)sSoapBinding"><soap:address location="%(address)s"/></wsdl:port>
+</wsdl:service>
+</wsdl:definitions>
+""" % dict(namespaces, ns=namespace, service=service, address=address, elements="\n  ".join(elements),
+           schemas=TYPES_SCHEMA % namespaces, messages="\n".join(messages), port="".join(port_operations),
+           binding="".join(binding_operations))).encode("utf-8")
+
+
+class FakePolarionData:
+    """
+    Class FakePolarionData
+    Synthetic content served by the fake server. Sizes can be changed at any time between requests.
+    """
+
+    def __init__(self, project_id: str = "PRJ", workitems: int = 100, comments: int = 5, custom_fields: int = 5,
+                 links: int = 2, test_steps: int = 10, step_columns: int = 3, history: int = 10,
+                 description_size: int = 200, enum_custom_fields: dict = None):
+        self.project_id = project_id
+        self.workitems = workitems
+        self.comments = comments
+        self.custom_fields = custom_fields
+        self.links = links
+        self.test_steps = test_steps
+        self.step_columns = step_columns
+        self.history = history
+        self.description_size = description_size
+        # Enumeration custom fields served after the string ones: key -> option id, or list of ids (multi-enum)
+        self.enum_custom_fields = enum_custom_fields or {}
+
+    def workitem_id(self, index: int) -> str:
+        return "%s-%d" % (self.project_id, index + 1)
+
+    def workitem_uri(self, workitem_id: str) -> str:
+        project_id = workitem_id.rsplit("-", 1)[0]
+        return "subterra:data-service:objects:/default/%s${WorkItem}%s" % (project_id, workitem_id)
+
+    def workitem_index(self, workitem_id: str) -> int or None:
+        match = re.match(r"^%s-(\d+)$" % re.escape(self.project_id), workitem_id)
+        if match and 0 < int(match.group(1)) <= self.workitems:
+            return int(match.group(1)) - 1
+        return None
+
+
+class FakePolarionServer:
+    """
+    Class FakePolarionServer
+    Local HTTP server answering the Polarion SOAP web services with synthetic data
+    """
+
+    def __init__(self, data: FakePolarionData = None, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Class init
+        :param data: Synthetic data to serve
+        :param latency: Latency (in seconds) injected before each SOAP response
+        :param host: Interface to listen on
+        :param port: Port to listen on (0 to pick a free one)
+        """
+        self.data = data or FakePolarionData()
+        self.latency = latency
+        self.calls = {}
+        # Committed write operations: (operation name, session ID)
+        self.committed = []
+        self._transactions = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        self._sessions = 0
+        self._valid_sessions = set()
+
+    @property
+    def hostname(self) -> str:
+        host, port = self._server.server_address[:2]
+        return "%s:%d" % (host, port)
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def expire_sessions(self) -> None:
+        """
+        Method used to invalidate every opened session (following calls fail with a "Not authorized" fault)
+        :return: None
+        """
+        with self._lock:
+            self._valid_sessions.clear()
+            # The open transactions are lost with their sessions
+            self._transactions.clear()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately: without TCP_NODELAY each response waits for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="text/xml; charset=utf-8"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                service = self.path.rsplit("/", 1)[-1].split("?", 1)[0]
+                if service not in SERVICES:
+                    self._send(404, b"")
+                    return
+                address = "http://%s/polarion/ws/services/%s" % (server.hostname, service)
+                self._send(200, build_wsdl(service, address))
+
+            def do_POST(self):
+                service = self.path.rsplit("/", 1)[-1].split("?", 1)[0]
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                status, response = server.dispatch(service, body)
+                if server.latency:
+                    sleep(server.latency)
+                self._send(status, response)
+
+        return Handler
+
+    def dispatch(self, service: str, body: bytes) -> (int, bytes):
+        envelope = etree.fromstring(body)
+        request = envelope.find("{%s}Body" % SOAP_ENV)[0]
+        operation = etree.QName(request).localname
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        arguments = {etree.QName(child).localname: child for child in request}
+        fields = [child.text for child in request if etree.QName(child).localname == "fields"]
+        arguments["fields"] = set(fields) if fields else None
+
+        handler = getattr(self, "_" + operation, None)
+        if handler is None:
+            return 500, self._fault("Operation %s is not supported by the fake server" % operation)
+        session_id = envelope.findtext(".//{%s}sessionID" % SESSION_NS)
+        if service != "SessionWebService" and session_id not in self._valid_sessions:
+            return 500, self._fault("Not authorized.")
+        arguments["session"] = session_id
+        try:
+            content, header = handler(arguments), ""
+            if isinstance(content, tuple):
+                content, header = content
+        except LookupError as exception:
+            return 500, self._fault(str(exception))
+
+        if operation in WRITE_OPERATIONS:
+            with self._lock:
+                self._transactions.get(session_id, self.committed).append((operation, session_id))
+
+        namespace = service_namespace(service)
+        return 200, ('<?xml version="1.0" encoding="UTF-8"?><soapenv:Envelope xmlns:soapenv="%s" '
+                     'xmlns:xsi="%s" xmlns:xsd="http://www.w3.org/2001/XMLSchema"><soapenv:Header>%s'
+                     '</soapenv:Header><soapenv:Body><r:%sResponse xmlns:r="%s" xmlns:t="%s" xmlns:tr="%s" '
+                     'xmlns:tm="%s">%s</r:%sResponse></soapenv:Body></soapenv:Envelope>'
+                     % (SOAP_ENV, XSI, header, operation, namespace, TYPES_NS, TRACKER_TYPES_NS, TEST_TYPES_NS,
+                        content, operation)).encode("utf-8")
+
+    @staticmethod
+    def _fault(message: str) -> bytes:
+        return ('<?xml version="1.0" encoding="UTF-8"?><soapenv:Envelope xmlns:soapenv="%s"><soapenv:Body>'
+                '<soapenv:Fault><faultcode>soapenv:Server</faultcode><faultstring>%s</faultstring></soapenv:Fault>'
+                '</soapenv:Body></soapenv:Envelope>' % (SOAP_ENV, escape(message))).encode("utf-8")
+
+    # XML builders
+
+    @staticmethod
+    def _text(tag, content):
+        return ("<%s><t:type>text/html</t:type><t:content>%s</t:content><t:contentLossy>false</t:contentLossy></%s>"
+                % (tag, escape(content), tag))
+
+    @staticmethod
+    def _user(tag, user_id):
+        return ('<%s uri="subterra:data-service:objects:/default/${User}%s"><t:id>%s</t:id><t:name>User %s</t:name>'
+                '</%s>' % (tag, user_id, user_id, user_id, tag))
+
+    @staticmethod
+    def _enum(tag, value):
+        return "<%s><tr:id>%s</tr:id></%s>" % (tag, value, tag)
+
+    def _workitem(self, tag, workitem_id, fields=None):
+        data = self.data
+        index = data.workitem_index(workitem_id)
+        uri = data.workitem_uri(workitem_id)
+        if index is None:
+            return '<%s uri="%s" unresolvable="true"/>' % (tag, uri)
+
+        def wanted(field):
+            return fields is None or field in fields
+
+        parts = []
+        stamp = datetime(2024, 1, 1 + index % 28, 12, 0, index % 60).isoformat()
+        if wanted("author"):
+            parts.append(self._user("tr:author", "author%d" % (index % 7)))
+        if wanted("comments") and data.comments:
+            comments = []
+            for number in range(data.comments):
+                comment_uri = "%s%%23%d" % (uri, number)
+                parent = ("<tr:parentCommentURI>%s%%23%d</tr:parentCommentURI>" % (uri, (number - 1) // 2)
+                          if number else "")
+                comments.append('<tr:Comment uri="%s">%s<tr:created>%s</tr:created><tr:id>%d</tr:id>%s%s'
+                                '<tr:title>Comment %d</tr:title></tr:Comment>'
+                                % (comment_uri, self._user("tr:author", "user%d" % (number % 5)), stamp, number,
+                                   parent, self._text("tr:text", "Comment text %d" % number), number))
+            parts.append("<tr:comments>%s</tr:comments>" % "".join(comments))
+        if wanted("created"):
+            parts.append("<tr:created>%s</tr:created>" % stamp)
+        if wanted("customFields") and (data.custom_fields or data.enum_custom_fields):
+            customs = ['<tr:Custom><tr:key>field%d</tr:key><tr:value xsi:type="xsd:string">value %d</tr:value>'
+                       '</tr:Custom>' % (number, number) for number in range(data.custom_fields)]
+            for key, value in data.enum_custom_fields.items():
+                if isinstance(value, str):
+                    value = '<tr:value xsi:type="tr:EnumOptionId"><tr:id>%s</tr:id></tr:value>' % value
+                else:
+                    value = ('<tr:value xsi:type="tr:ArrayOfEnumOptionId">%s</tr:value>'
+                             % "".join("<tr:EnumOptionId><tr:id>%s</tr:id></tr:EnumOptionId>" % option
+                                       for option in value))
+                customs.append("<tr:Custom><tr:key>%s</tr:key>%s</tr:Custom>" % (key, value))
+            parts.append("<tr:customFields>%s</tr:customFields>" % "".join(customs))
+        if wanted("description"):
+            parts.append(self._text("tr:description", ("Description of %s " % workitem_id) * 4
+                                    + "x" * data.description_size))
+        parts.append("<tr:id>%s</tr:id>" % workitem_id)
+        if wanted("linkedWorkItems") and data.links:
+            links = ["<tr:LinkedWorkItem>%s<tr:suspect>false</tr:suspect><tr:workItemURI>%s</tr:workItemURI>"
+                     "</tr:LinkedWorkItem>" % (self._enum("tr:role", "relates_to"),
+                                               data.workitem_uri(data.workitem_id((index + n + 1) % data.workitems)))
+                     for n in range(data.links)]
+            parts.append("<tr:linkedWorkItems>%s</tr:linkedWorkItems>" % "".join(links))
+        if wanted("project"):
+            parts.append('<tr:project uri="subterra:data-service:objects:/default/%s${Project}%s"><t:id>%s</t:id>'
+                         '</tr:project>' % (data.project_id, data.project_id, data.project_id))
+        if wanted("severity"):
+            parts.append(self._enum("tr:severity", ("minor", "major", "critical")[index % 3]))
+        if wanted("status"):
+            parts.append(self._enum("tr:status", ("open", "in_progress", "closed")[index % 3]))
+        if wanted("title"):
+            parts.append("<tr:title>Work item %d</tr:title>" % (index + 1))
+        if wanted("type"):
+            parts.append(self._enum("tr:type", ("testcase", "defect")[index % 2]))
+        if wanted("updated"):
+            parts.append("<tr:updated>%s</tr:updated>" % stamp)
+        return '<%s uri="%s">%s</%s>' % (tag, uri, "".join(parts), tag)
+
+    def _query_ids(self, query):
+        match = re.search(r"(?<![\w.])id:\(([^)]*)\)", query) or re.search(r"(?<![\w.])id:(\S+)", query)
+        if match:
+            return [value for value in re.split(r"\s+(?:OR\s+)?|\s+", match.group(1).strip()) if value
+                    and value != "OR"]
+        return [self.data.workitem_id(index) for index in range(self.data.workitems)]
+
+    # Session web service
+
+    def _logIn(self, arguments):
+        with self._lock:
+            self._sessions += 1
+            session_id = "fake-session-%d" % self._sessions
+            self._valid_sessions.add(session_id)
+        return "", '<ns1:sessionID xmlns:ns1="%s">%s</ns1:sessionID>' % (SESSION_NS, session_id)
+
+    def _endSession(self, arguments):
+        return ""
+
+    def _hasSubject(self, arguments):
+        return "<r:hasSubjectReturn>%s</r:hasSubjectReturn>" % (
+            "true" if arguments["session"] in self._valid_sessions else "false")
+
+    def _beginTransaction(self, arguments):
+        with self._lock:
+            if arguments["session"] in self._transactions:
+                raise LookupError("A transaction is already started.")
+            self._transactions[arguments["session"]] = []
+        return ""
+
+    def _endTransaction(self, arguments):
+        with self._lock:
+            operations = self._transactions.pop(arguments["session"], None)
+            if operations is None:
+                raise LookupError("No transaction has been started.")
+            if arguments["rollback"].text != "true":
+                self.committed.extend(operations)
+        return ""
+
+    def in_transaction(self, session_id: str) -> bool:
+        """
+        Method used to know if a session has an open transaction
+        :param session_id: ID of the session
+        :return: True if a transaction has been started and not ended
+        """
+        with self._lock:
+            return session_id in self._transactions
+
+    # Tracker web service
+
+    def _getWorkItemById(self, arguments, fields=None):
+        return self._workitem("r:%sReturn" % ("getWorkItemByIdWithFields" if fields else "getWorkItemById"),
+                              arguments["workitemId"].text, fields)
+
+    def _getWorkItemByUri(self, arguments, fields=None):
+        workitem_id = arguments["uri"].text.rsplit("}", 1)[-1]
+        return self._workitem("r:%sReturn" % ("getWorkItemByUriWithFields" if fields else "getWorkItemByUri"),
+                              workitem_id, fields)
+
+    def _getWorkItemByIdWithFields(self, arguments):
+        return self._getWorkItemById(arguments, arguments["fields"] or set())
+
+    def _getWorkItemByUriWithFields(self, arguments):
+        return self._getWorkItemByUri(arguments, arguments["fields"] or set())
+
+    def _queryWorkItems(self, arguments, limit=None, tag="queryWorkItems"):
+        fields = arguments["fields"]
+        ids = self._query_ids(arguments["query"].text or "")
+        if limit is not None:
+            ids = ids[:limit]
+        return "".join(self._workitem("r:%sReturn" % tag, workitem_id, fields) for workitem_id in ids
+                       if self.data.workitem_index(workitem_id) is not None)
+
+    def _queryWorkItemsLimited(self, arguments):
+        return self._queryWorkItems(arguments, int(arguments["limit"].text), "queryWorkItemsLimited")
+
+    def _queryWorkItemsBySQL(self, arguments):
+        sql = arguments["sqlQuery"].text
+        limit = re.search(r"LIMIT\s+(\d+)", sql, re.IGNORECASE)
+        offset = re.search(r"OFFSET\s+(\d+)", sql, re.IGNORECASE)
+        start = int(offset.group(1)) if offset else 0
+        stop = start + int(limit.group(1)) if limit else self.data.workitems
+        return "".join(self._workitem("r:queryWorkItemsBySQLReturn", self.data.workitem_id(index), arguments["fields"])
+                       for index in range(start, min(stop, self.data.workitems)))
+
+    def _queryWorkItemUris(self, arguments):
+        return "".join("<r:queryWorkItemUrisReturn>%s</r:queryWorkItemUrisReturn>" % escape(self.data.workitem_uri(i))
+                       for i in self._query_ids(arguments["query"].text or "")
+                       if self.data.workitem_index(i) is not None)
+
+    def _getCustomField(self, arguments):
+        return ('<r:getCustomFieldReturn><tr:key>%s</tr:key><tr:parentItemURI>%s</tr:parentItemURI>'
+                '<tr:value xsi:type="xsd:string">value</tr:value></r:getCustomFieldReturn>'
+                % (arguments["key"].text, escape(arguments["workitemURI"].text)))
+
+    def _getEnumControlKeyForId(self, arguments):
+        return "<r:getEnumControlKeyForIdReturn>%s</r:getEnumControlKeyForIdReturn>" % arguments["enumId"].text
+
+    def _createWorkItem(self, arguments):
+        return "<r:createWorkItemReturn>%s</r:createWorkItemReturn>" % escape(
+            self.data.workitem_uri(self.data.workitem_id(self.data.workitems)))
+
+    def _updateWorkItem(self, arguments):
+        return ""
+
+    def _addComment(self, arguments):
+        return "<r:addCommentReturn>%s%%23new</r:addCommentReturn>" % escape(arguments["parentUri"].text)
+
+    def _setCustomField(self, arguments):
+        return ""
+
+    def _addLinkedItem(self, arguments):
+        return "<r:addLinkedItemReturn>true</r:addLinkedItemReturn>"
+
+    def _removeLinkedItem(self, arguments):
+        return "<r:removeLinkedItemReturn>true</r:removeLinkedItemReturn>"
+
+    def _module(self, tag, location):
+        return ('<%s uri="subterra:data-service:objects:/default/%s${Module}%s"><tr:id>%s</tr:id>'
+                '<tr:moduleLocation>%s</tr:moduleLocation><tr:title>%s</tr:title></%s>'
+                % (tag, self.data.project_id, escape(location), escape(location.rsplit("/", 1)[-1]), escape(location),
+                   escape(location), tag))
+
+    def _getModuleByLocation(self, arguments):
+        return self._module("r:getModuleByLocationReturn", arguments["location"].text)
+
+    def _getModuleByUri(self, arguments):
+        return self._module("r:getModuleByUriReturn", arguments["uri"].text.rsplit("}", 1)[-1])
+
+    def _getModules(self, arguments):
+        location = arguments["location"].text or ""
+        return "".join(self._module("r:getModulesReturn", "%s/Document%d" % (location, index))
+                       for index in range(self.data.workitems))
+
+    def _getModulesSubFolders(self, arguments):
+        return "<r:getModulesSubFoldersReturn>%s/Sub</r:getModulesSubFoldersReturn>" % (arguments["location"].text
+                                                                                       or "")
+
+    def _updateModule(self, arguments):
+        return ""
+
+    def _generateHistory(self, arguments):
+        return "".join('<r:generateHistoryReturn><tr:creationDate>2024-01-01T12:00:%02d</tr:creationDate><tr:diffs>'
+                       '<tr:FieldDiff><tr:after>%d</tr:after><tr:before>%d</tr:before><tr:fieldName>status'
+                       '</tr:fieldName></tr:FieldDiff></tr:diffs><tr:revision>%d</tr:revision>%s'
+                       '</r:generateHistoryReturn>' % (index % 60, index + 1, index, index,
+                                                       self._user("tr:user", "user%d" % index))
+                       for index in range(self.data.history))
+
+    # Project web service
+
+    def _getProject(self, arguments):
+        project_id = arguments["projectId"].text
+        return ('<r:getProjectReturn uri="subterra:data-service:objects:/default/%s${Project}%s"><t:id>%s</t:id>'
+                '<t:name>Project %s</t:name></r:getProjectReturn>' % (project_id, project_id, project_id, project_id))
+
+    def _getUser(self, arguments):
+        return self._user("r:getUserReturn", arguments["userId"].text)
+
+    # Test management web service
+
+    def _getTestSteps(self, arguments):
+        steps = "".join("<tm:TestStep><tm:values>%s</tm:values></tm:TestStep>"
+                        % "".join(self._text("tm:Text", "Step %d column %d" % (step, column))
+                                  for column in range(self.data.step_columns))
+                        for step in range(self.data.test_steps))
+        return "<r:getTestStepsReturn><tm:steps>%s</tm:steps></r:getTestStepsReturn>" % steps
+
+    def _setTestSteps(self, arguments):
+        return ""
+
+    def _createTestRunWithTitle(self, arguments):
+        return ("<r:createTestRunWithTitleReturn>subterra:data-service:objects:/default/%s${TestRun}%s"
+                "</r:createTestRunWithTitleReturn>" % (arguments["projectId"].text, arguments["id"].text))
+
+    def _getTestRunById(self, arguments):
+        return ('<r:getTestRunByIdReturn uri="subterra:data-service:objects:/default/%s${TestRun}%s"><tm:id>%s</tm:id>'
+                '</r:getTestRunByIdReturn>' % (arguments["projectId"].text, arguments["id"].text,
+                                               arguments["id"].text))
+
+    def _getTestCaseRecords(self, arguments):
+        return ""
+
+    def _addTestRecord(self, arguments):
+        return ""
+
+    def _updateTestRecord(self, arguments):
+        return ""
+
+    def _executeTest(self, arguments):
+        return ""
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="latency (in seconds) of each SOAP response")
+    parser.add_argument("--workitems", type=int, default=1000)
+    parser.add_argument("--comments", type=int, default=5)
+    parser.add_argument("--test-steps", type=int, default=10)
+    options = parser.parse_args()
+
+    fake_server = FakePolarionServer(FakePolarionData(workitems=options.workitems, comments=options.comments,
+                                                      test_steps=options.test_steps),
+                                     latency=options.latency, port=options.port)
+    print("Fake Polarion server listening on %s" % fake_server.hostname)
+    fake_server.serve_forever()
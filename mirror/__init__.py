@@ -0,0 +1,3 @@
+from .store import MirrorStore
+from .sync import DeltaSync, SyncReport
+from .query import OfflineQueryEngine, parse_query
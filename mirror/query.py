@@ -0,0 +1,443 @@
+import re
+from datetime import date, timedelta
+
+from ..objects.snapshot import WorkitemSnapshot
+from ..polarion import UnsupportedQuery
+from .store import MirrorStore
+from .sync import MIRRORED_FIELDS
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(?P<quoted>"(?:[^"\\]|\\.)*")|(?P<punct>[()\[\]{}])|(?P<word>[^\s()\[\]{}"]+))')
+
+# Fields stored as columns of the workitems table
+COLUMNS = {'id': 'id', 'type': 'type', 'status': 'status', 'severity': 'severity', 'project.id': 'project_id',
+           'project': 'project_id', 'title': 'title', 'description': 'description', 'created': 'created',
+           'updated': 'updated'}
+# Tokenized (full text) fields: a term matches when it is contained in the field
+TEXT_FIELDS = ('title', 'description')
+DATE_FIELDS = ('created', 'updated')
+LINKED_ID = "substr(linked_uri, instr(linked_uri, '}') + 1)"
+
+
+class _Parser:
+    """
+    Parser of the subset of the Lucene syntax used in Polarion queries:
+        field:value, field:"quoted value", field:prefix*, field:(a OR b), field:[low TO high], field:{low TO high},
+        AND, OR, NOT, +term, -term, parentheses (terms are combined with AND by default)
+    Queries are parsed into tuples: ('and', [nodes]), ('or', [nodes]), ('not', node) and ('term', field, value) where
+    value is a string or a ('range', low, high, include_low, include_high) tuple.
+    """
+    OPERATORS = ('AND', 'OR', 'NOT', '&&', '||', '!')
+
+    def __init__(self, query: str):
+        self._tokens = []
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = TOKEN_PATTERN.match(query, position)
+            if match is None or match.end() == position:
+                raise UnsupportedQuery(f"Cannot parse query at: {query[position:]}")
+            position = match.end()
+            if match.group('quoted') is not None:
+                self._tokens.append(('quoted', match.group('quoted')[1:-1].replace('\\"', '"')))
+            elif match.group('punct') is not None:
+                self._tokens.append(('punct', match.group('punct')))
+            elif match.group('word') is not None:
+                self._tokens.append(('word', match.group('word')))
+        self._position = 0
+
+    def parse(self):
+        if not self._tokens:
+            raise UnsupportedQuery("Empty query")
+        node = self._or(None)
+        if self._position < len(self._tokens):
+            raise UnsupportedQuery(f"Unexpected token: {self._tokens[self._position][1]}")
+        return node
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self._position += 1
+        return token
+
+    def _expect(self, value: str) -> None:
+        if self._next() != ('punct', value):
+            raise UnsupportedQuery(f"Expected '{value}'")
+
+    def _or(self, default_field):
+        nodes = [self._and(default_field)]
+        while self._peek()[1] in ('OR', '||'):
+            self._next()
+            nodes.append(self._and(default_field))
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def _and(self, default_field):
+        nodes = [self._unary(default_field)]
+        while True:
+            kind, value = self._peek()
+            if value in ('AND', '&&'):
+                self._next()
+            elif kind is None or value in ('OR', '||') or (kind, value) in (('punct', ')'), ('punct', ']')):
+                break
+            nodes.append(self._unary(default_field))
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def _unary(self, default_field):
+        kind, value = self._peek()
+        if value in ('NOT', '!'):
+            self._next()
+            return 'not', self._unary(default_field)
+        if kind == 'word' and value[0] in '-+' and len(value) > 1:
+            # -term / +term: split the sign from the term
+            self._tokens[self._position] = ('word', value[1:])
+            return ('not', self._unary(default_field)) if value[0] == '-' else self._unary(default_field)
+        if (kind, value) == ('punct', '('):
+            self._next()
+            node = self._or(default_field)
+            self._expect(')')
+            return node
+        return self._term(default_field)
+
+    def _term(self, default_field):
+        kind, value = self._next()
+        if kind is None:
+            raise UnsupportedQuery("Unexpected end of query")
+
+        field = default_field
+        if kind == 'word' and ':' in value and not value.startswith(':'):
+            field, value = value.split(':', 1)
+            if not value:
+                # field:(...), field:[...] or field:"..."
+                next_kind, next_value = self._peek()
+                if (next_kind, next_value) == ('punct', '('):
+                    self._next()
+                    node = self._or(field)
+                    self._expect(')')
+                    return node
+                if (next_kind, next_value) in (('punct', '['), ('punct', '{')):
+                    return 'term', field, self._range()
+                kind, value = self._next()
+        elif kind == 'punct':
+            raise UnsupportedQuery(f"Unexpected token: {value}")
+
+        if field is None:
+            raise UnsupportedQuery(f"Full text search is not supported: {value}")
+        if kind == 'word' and (value in self.OPERATORS or any(character in value for character in '~^\\')):
+            raise UnsupportedQuery(f"Unsupported term: {field}:{value}")
+        if kind not in ('word', 'quoted'):
+            raise UnsupportedQuery(f"Unexpected token: {value}")
+        return 'term', field, value if kind == 'word' else ('phrase', value)
+
+    def _range(self):
+        include_low = self._next()[1] == '['
+        low = self._next()[1]
+        if self._next()[1] != 'TO':
+            raise UnsupportedQuery("Expected TO in range")
+        high = self._next()[1]
+        unused_kind, closing = self._next()
+        if closing not in (']', '}'):
+            raise UnsupportedQuery("Range is not closed")
+        return 'range', low, high, include_low, closing == ']'
+
+
+def parse_query(query: str):
+    """
+    Function used to parse a Polarion (Lucene) query into a tree of tuples (see _Parser)
+    :param query: Query to parse
+    :return: Root node of the query
+    """
+    return _Parser(query).parse()
+
+
+def _query_date(value: str) -> date:
+    """
+    Function used to convert a date of a query (yyyyMMdd, yyyy-MM-dd or TODAY) into a date
+    """
+    if value.upper() == 'TODAY':
+        return date.today()
+    try:
+        return date.fromisoformat(value if '-' in value else "%s-%s-%s" % (value[:4], value[4:6], value[6:8]))
+    except ValueError:
+        raise UnsupportedQuery(f"Unsupported date: {value}") from None
+
+
+class QueryPlanner:
+    """
+    Class QueryPlanner
+    Translates a parsed query into a SQL query on the MirrorStore tables. Each term uses an index of the store: columns
+    of the workitems table, (key, value) of the custom fields, linked work item ID of the links.
+    Terms which cannot be translated raise UnsupportedQuery.
+    """
+
+    def __init__(self, custom_field_keys: set):
+        """
+        Class init
+        :param custom_field_keys: Keys of the custom fields stored in the mirror
+        """
+        self._custom_field_keys = custom_field_keys
+
+    def where(self, node) -> (str, list):
+        """
+        Method used to translate a query node into a SQL condition on the workitems table (alias w)
+        :param node: Node of the parsed query
+        :return: Tuple (SQL condition, parameters)
+        """
+        operator = node[0]
+        if operator in ('and', 'or'):
+            conditions, parameters = [], []
+            for child in node[1]:
+                condition, child_parameters = self.where(child)
+                conditions.append(condition)
+                parameters.extend(child_parameters)
+            return "(" + (" %s " % operator.upper()).join(conditions) + ")", parameters
+        if operator == 'not':
+            condition, parameters = self.where(node[1])
+            return "(NOT %s)" % condition, parameters
+        return self._term(node[1], node[2])
+
+    @staticmethod
+    def _value_condition(expression: str, value) -> (str, list):
+        """
+        Protected method used to compare an expression with a term value (exact value, wildcard or phrase)
+        """
+        if isinstance(value, tuple):
+            return "%s = ?" % expression, [value[1]]
+        if '*' in value or '?' in value:
+            pattern = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            return "%s LIKE ? ESCAPE '\\'" % expression, [pattern.replace('*', '%').replace('?', '_')]
+        return "%s = ?" % expression, [value]
+
+    def _term(self, field: str, value) -> (str, list):
+        """
+        Protected method used to translate a term into a SQL condition
+        """
+        if value == '*':
+            raise UnsupportedQuery(f"Unsupported term: {field}:*")
+
+        if field in TEXT_FIELDS:
+            if isinstance(value, tuple) and value[0] == 'range':
+                raise UnsupportedQuery(f"Unsupported range on {field}")
+            text = value[1] if isinstance(value, tuple) else value.strip('*')
+            text = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            if not isinstance(value, tuple):
+                text = text.replace('*', '%').replace('?', '_')
+            return "w.%s LIKE ? ESCAPE '\\'" % COLUMNS[field], ['%' + text + '%']
+
+        if field in DATE_FIELDS:
+            return self._date_term(COLUMNS[field], value)
+
+        if isinstance(value, tuple) and value[0] == 'range':
+            raise UnsupportedQuery(f"Unsupported range on {field}")
+
+        if field in COLUMNS:
+            return self._value_condition("w." + COLUMNS[field], value)
+
+        if field == 'linkedWorkItems':
+            linked_value = value[1] if isinstance(value, tuple) else value
+            role = None
+            if '=' in linked_value:
+                role, linked_value = linked_value.split('=', 1)
+            condition, parameters = self._value_condition(LINKED_ID, linked_value)
+            if role:
+                condition += " AND role = ?"
+                parameters.append(role)
+            return "w.uri IN (SELECT workitem_uri FROM links WHERE %s)" % condition, parameters
+
+        if field in self._custom_field_keys:
+            condition, parameters = self._value_condition("value", value)
+            return "w.uri IN (SELECT workitem_uri FROM custom_fields WHERE key = ? AND %s)" % condition, \
+                [field] + parameters
+
+        raise UnsupportedQuery(f"Unsupported field: {field}")
+
+    @staticmethod
+    def _date_term(column: str, value) -> (str, list):
+        """
+        Protected method used to translate a date term (a day or a range of days) into a SQL condition on ISO dates
+        """
+        if not (isinstance(value, tuple) and value[0] == 'range'):
+            day = _query_date(value[1] if isinstance(value, tuple) else value)
+            return "(w.%s >= ? AND w.%s < ?)" % (column, column), \
+                [day.isoformat(), (day + timedelta(days=1)).isoformat()]
+
+        unused_kind, low, high, include_low, include_high = value
+        conditions, parameters = [], []
+        if low != '*':
+            day = _query_date(low)
+            conditions.append("w.%s >= ?" % column)
+            parameters.append((day if include_low else day + timedelta(days=1)).isoformat())
+        if high != '*':
+            day = _query_date(high)
+            conditions.append("w.%s < ?" % column)
+            parameters.append((day + timedelta(days=1) if include_high else day).isoformat())
+        return "(" + " AND ".join(conditions or ["1"]) + ")", parameters
+
+    @staticmethod
+    def order_by(sort: str) -> str:
+        """
+        Method used to translate a sort field (optionally prefixed by - or ~ for a descending sort)
+        :param sort: Sort field
+        :return: SQL ORDER BY clause
+        """
+        descending = sort[:1] in ('-', '~')
+        column = COLUMNS.get(sort.lstrip('-~'), 'id')
+        return "ORDER BY w.%s%s, w.uri" % (column, " DESC" if descending else "")
+
+
+class OfflineQueryEngine:
+    """
+    Class OfflineQueryEngine
+    Runs Polarion queries on a MirrorStore, without network. The supported subset is: id, type, status, severity,
+    project.id, title, description, created, updated, linkedWorkItems ([role=]ID) and the mirrored custom fields, with
+    AND/OR/NOT, wildcards, lists and date ranges.
+    When a query combines supported terms (AND) with unsupported ones, only the unsupported terms are sent to the
+    server (URIs only), the other ones being evaluated locally. If the unsupported terms are only negations (i.e.
+    NOT foo:bar, which matches nothing on its own in Lucene), the whole query is sent instead. Other unsupported
+    queries are sent to the server as is.
+    """
+
+    def __init__(self, store: MirrorStore, polarion_access=None):
+        """
+        Class init
+        :param store: Mirror to query
+        :param polarion_access: PolarionAccess used for the unsupported queries (unsupported queries raise
+                                UnsupportedQuery if None)
+        """
+        self._store = store
+        self._polarion_access = polarion_access
+        self._custom_field_keys = None
+
+        self.local_queries = 0
+        self.partial_fallbacks = 0
+        self.fallbacks = 0
+
+    def refresh(self) -> None:
+        """
+        Method used to reload the keys of the custom fields stored in the mirror (i.e. after a synchronisation)
+        :return: None
+        """
+        self._custom_field_keys = {key for (key,) in self._store.execute("SELECT DISTINCT key FROM custom_fields")}
+
+    @property
+    def custom_field_keys(self) -> set:
+        if self._custom_field_keys is None:
+            self.refresh()
+        return self._custom_field_keys
+
+    def plan(self, query: str, sort: str = 'id') -> (str, list, [str]):
+        """
+        Method used to translate a query into SQL
+        :param query: Polarion query
+        :param sort: Sort field
+        :return: Tuple (SQL query returning the URIs, parameters, terms to be evaluated by the server (joined with AND),
+                 the whole query if these terms are only negations)
+        """
+        node = parse_query(query)
+        planner = QueryPlanner(self.custom_field_keys)
+
+        conjuncts = node[1] if node[0] == 'and' else [node]
+        conditions, parameters, remote_nodes = [], [], []
+        for conjunct in conjuncts:
+            try:
+                condition, conjunct_parameters = planner.where(conjunct)
+            except UnsupportedQuery:
+                if node[0] != 'and':
+                    raise
+                remote_nodes.append(conjunct)
+                continue
+            conditions.append(condition)
+            parameters.extend(conjunct_parameters)
+
+        if not conditions:
+            raise UnsupportedQuery(f"No term of the query can be run locally: {query}")
+        sql = "SELECT w.uri FROM workitems w WHERE %s %s" % (" AND ".join(conditions), planner.order_by(sort))
+        if remote_nodes and not any(_has_positive_term(remote_node) for remote_node in remote_nodes):
+            return sql, parameters, [query]
+        return sql, parameters, [_format_node(remote_node) for remote_node in remote_nodes]
+
+    def _local_uris(self, query: str, sort: str) -> [str] or None:
+        """
+        Protected method used to run a query on the mirror (unsupported AND terms being run by the server)
+        :param query: Polarion query
+        :param sort: Sort field
+        :return: List of URIs, or None if the whole query has to be run by the server
+        """
+        try:
+            sql, parameters, remote_terms = self.plan(query, sort)
+        except UnsupportedQuery:
+            if self._polarion_access is None:
+                raise
+            return None
+
+        uris = [uri for (uri,) in self._store.execute(sql, tuple(parameters))]
+        if not remote_terms:
+            self.local_queries += 1
+            return uris
+
+        if self._polarion_access is None:
+            raise UnsupportedQuery(f"Unsupported terms: {' AND '.join(remote_terms)}")
+        self.partial_fallbacks += 1
+        remote_uris = set(self._polarion_access.tracker.query_workitem_uris(" AND ".join(remote_terms)))
+        return [uri for uri in uris if uri in remote_uris]
+
+    def query_uris(self, query: str, sort: str = 'id') -> [str]:
+        """
+        Method used to get the URIs of the work items matching a query
+        :param query: Polarion query
+        :param sort: Sort field
+        :return: List of URIs
+        """
+        uris = self._local_uris(query, sort)
+        if uris is None:
+            self.fallbacks += 1
+            return self._polarion_access.tracker.query_workitem_uris(query, sort)
+        return uris
+
+    def query(self, query: str, sort: str = 'id') -> [WorkitemSnapshot]:
+        """
+        Method used to get the work items matching a query, as stored in the mirror (or as returned by the server when
+        the query is run by the server)
+        :param query: Polarion query
+        :param sort: Sort field
+        :return: List of work item snapshots
+        """
+        uris = self._local_uris(query, sort)
+        if uris is None:
+            self.fallbacks += 1
+            return [WorkitemSnapshot.from_zeep(workitem)
+                    for workitem in self._polarion_access.tracker.query_workitems(query, sort, MIRRORED_FIELDS) or []]
+        return [self._store.get_workitem(uri) for uri in uris]
+
+
+def _has_positive_term(node) -> bool:
+    """
+    Function used to know if a parsed query node can match on its own (Lucene does not match purely negative queries)
+    """
+    operator = node[0]
+    if operator == 'not':
+        return False
+    if operator == 'and':
+        return any(_has_positive_term(child) for child in node[1])
+    if operator == 'or':
+        return all(_has_positive_term(child) for child in node[1])
+    return True
+
+
+def _format_node(node) -> str:
+    """
+    Function used to write a parsed query node back as a Lucene query
+    """
+    operator = node[0]
+    if operator in ('and', 'or'):
+        return "(" + (" %s " % operator.upper()).join(_format_node(child) for child in node[1]) + ")"
+    if operator == 'not':
+        return "NOT " + _format_node(node[1])
+
+    field, value = node[1], node[2]
+    if isinstance(value, tuple) and value[0] == 'range':
+        unused_kind, low, high, include_low, include_high = value
+        return "%s:%s%s TO %s%s" % (field, '[' if include_low else '{', low, high, ']' if include_high else '}')
+    if isinstance(value, tuple):
+        return '%s:"%s"' % (field, value[1].replace('"', '\\"'))
+    return "%s:%s" % (field, value)
@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from ..objects.snapshot import WorkitemSnapshot, CommentSnapshot, array_items
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workitems (
+    uri TEXT PRIMARY KEY, project_id TEXT, id TEXT, type TEXT, status TEXT, severity TEXT, title TEXT, author TEXT,
+    description TEXT, created TEXT, updated TEXT);
+CREATE INDEX IF NOT EXISTS workitems_id ON workitems (id, project_id);
+CREATE INDEX IF NOT EXISTS workitems_type ON workitems (type, status);
+CREATE INDEX IF NOT EXISTS workitems_status ON workitems (status);
+CREATE INDEX IF NOT EXISTS workitems_updated ON workitems (updated);
+
+CREATE TABLE IF NOT EXISTS custom_fields (workitem_uri TEXT NOT NULL, key TEXT NOT NULL, value TEXT);
+CREATE INDEX IF NOT EXISTS custom_fields_workitem ON custom_fields (workitem_uri);
+CREATE INDEX IF NOT EXISTS custom_fields_value ON custom_fields (key, value);
+
+CREATE TABLE IF NOT EXISTS links (workitem_uri TEXT NOT NULL, role TEXT, linked_uri TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS links_workitem ON links (workitem_uri);
+CREATE INDEX IF NOT EXISTS links_linked ON links (linked_uri, role);
+CREATE INDEX IF NOT EXISTS links_linked_id ON links (substr(linked_uri, instr(linked_uri, '}') + 1), role);
+
+CREATE TABLE IF NOT EXISTS comments (
+    uri TEXT PRIMARY KEY, workitem_uri TEXT NOT NULL, id TEXT, parent_uri TEXT, title TEXT, text TEXT, author TEXT,
+    created TEXT);
+CREATE INDEX IF NOT EXISTS comments_workitem ON comments (workitem_uri);
+
+CREATE TABLE IF NOT EXISTS history (
+    workitem_uri TEXT NOT NULL, revision TEXT, created TEXT, author TEXT, field TEXT, before TEXT, after TEXT);
+CREATE INDEX IF NOT EXISTS history_workitem ON history (workitem_uri);
+
+CREATE TABLE IF NOT EXISTS sync_state (scope TEXT PRIMARY KEY, watermark TEXT, synced TEXT);
+"""
+
+
+def to_text(value) -> str or None:
+    """
+    Function used to convert a field value into the text stored in the mirror
+    :param value: Value (string, number, date, enum option, text object, or list or array object of them)
+    :return: Text of the value (comma separated texts of the items of a list), or None
+    """
+    if value is None or isinstance(value, str):
+        return value
+    items = array_items(value)
+    if items is not None:
+        value = items
+    if isinstance(value, (list, tuple)):
+        return ",".join(to_text(item) or "" for item in value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, date):
+        return value.isoformat()
+    if hasattr(value, 'content'):
+        return value.content
+    if hasattr(value, 'id'):
+        return value.id
+    return str(value)
+
+
+def to_datetime(text: str or None) -> datetime or None:
+    """
+    Function used to convert a date time stored in the mirror back into a datetime
+    :param text: ISO date time, or None
+    :return: datetime, or None
+    """
+    return datetime.fromisoformat(text) if text else None
+
+
+class MirrorStore:
+    """
+    Class MirrorStore
+    Local SQLite copy of work items with their custom fields, links, comments and history. Custom field values are
+    stored as text (one row per value for multi-valued fields), enum options as their ID.
+    The store can be shared between threads: writes are serialized and each write is one transaction.
+    """
+
+    def __init__(self, path: str):
+        """
+        Class init
+        :param path: Path of the SQLite file (':memory:' for a store which is not persisted)
+        """
+        self._path = path
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(path) if path != ':memory:' else ''
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if path != ':memory:':
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def path(self) -> str:
+        """
+        Property used to get the path of the SQLite file
+        :return: Path of the SQLite file
+        """
+        return self._path
+
+    def close(self) -> None:
+        """
+        Method used to close the SQLite connection
+        :return: None
+        """
+        with self._lock:
+            self._connection.close()
+
+    def execute(self, statement: str, parameters: tuple = ()) -> [tuple]:
+        """
+        Method used to run a read query on the mirror
+        :param statement: SQL statement
+        :param parameters: Parameters of the statement
+        :return: List of rows
+        """
+        with self._lock:
+            return self._connection.execute(statement, parameters).fetchall()
+
+    def get_watermark(self, scope: str) -> str or None:
+        """
+        Method used to get the watermark of a synchronisation scope
+        :param scope: Scope of the synchronisation (i.e. project ID and query)
+        :return: Watermark (ISO date time of the most recent update mirrored), or None if never synchronised
+        """
+        rows = self.execute("SELECT watermark FROM sync_state WHERE scope = ?", (scope,))
+        return rows[0][0] if rows else None
+
+    def set_watermark(self, scope: str, watermark: str, synced: str) -> None:
+        """
+        Method used to store the watermark of a synchronisation scope
+        :param scope: Scope of the synchronisation
+        :param watermark: ISO date time of the most recent update mirrored
+        :param synced: ISO date time of the synchronisation
+        :return: None
+        """
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO sync_state (scope, watermark, synced) VALUES (?, ?, ?)",
+                                     (scope, watermark, synced))
+
+    def upsert(self, snapshots: [WorkitemSnapshot]) -> None:
+        """
+        Method used to insert or replace work items, in a single transaction
+        :param snapshots: Snapshots of the work items (all fields loaded)
+        :return: None
+        """
+        if not snapshots:
+            return
+        uris = [(snapshot.uri,) for snapshot in snapshots]
+
+        with self._lock, self._connection:
+            for table in ('custom_fields', 'links', 'comments'):
+                self._connection.executemany("DELETE FROM %s WHERE workitem_uri = ?" % table, uris)
+
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO workitems (uri, project_id, id, type, status, severity, title, author, "
+                "description, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(snapshot.uri, snapshot.project_id, snapshot.id, snapshot.type, snapshot.status, snapshot.severity,
+                  snapshot.title, snapshot.author, snapshot.description, to_text(snapshot.created),
+                  to_text(snapshot.updated)) for snapshot in snapshots])
+            self._connection.executemany(
+                "INSERT INTO custom_fields (workitem_uri, key, value) VALUES (?, ?, ?)",
+                [(snapshot.uri, key, to_text(value))
+                 for snapshot in snapshots
+                 for key, values in snapshot.custom_fields
+                 for value in (values if isinstance(values, tuple) else (values,))])
+            self._connection.executemany(
+                "INSERT INTO links (workitem_uri, role, linked_uri) VALUES (?, ?, ?)",
+                [(snapshot.uri, role, linked_uri)
+                 for snapshot in snapshots for role, linked_uri in snapshot.linked_workitems])
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO comments (uri, workitem_uri, id, parent_uri, title, text, author, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(comment.uri, snapshot.uri, comment.id, comment.parent_uri, comment.title, comment.text,
+                  comment.author, to_text(comment.created))
+                 for snapshot in snapshots for comment in snapshot.comments])
+
+    def replace_history(self, workitem_uri: str, changes: [tuple]) -> None:
+        """
+        Method used to replace the history of a work item
+        :param workitem_uri: URI of the work item
+        :param changes: List of (revision, created, author, field, before, after) tuples
+        :return: None
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM history WHERE workitem_uri = ?", (workitem_uri,))
+            self._connection.executemany(
+                "INSERT INTO history (workitem_uri, revision, created, author, field, before, after) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(workitem_uri,) + tuple(change) for change in changes])
+
+    def prune(self, project_id: str, kept_uris: set) -> int:
+        """
+        Method used to delete the work items of a project which are not in a set of URIs (i.e. deleted on the server)
+        :param project_id: ID of the project
+        :param kept_uris: URIs of the work items to keep
+        :return: Number of deleted work items
+        """
+        with self._lock, self._connection:
+            deleted = [(uri,) for (uri,) in self._connection.execute(
+                "SELECT uri FROM workitems WHERE project_id = ?", (project_id,)) if uri not in kept_uris]
+            for table, column in (('workitems', 'uri'), ('custom_fields', 'workitem_uri'), ('links', 'workitem_uri'),
+                                  ('comments', 'workitem_uri'), ('history', 'workitem_uri')):
+                self._connection.executemany("DELETE FROM %s WHERE %s = ?" % (table, column), deleted)
+        return len(deleted)
+
+    def get_workitem(self, workitem_uri: str) -> WorkitemSnapshot or None:
+        """
+        Method used to get a mirrored work item (field values are the stored texts)
+        :param workitem_uri: URI of the work item
+        :return: Snapshot of the work item, or None if it is not mirrored
+        """
+        rows = self.execute("SELECT uri, id, type, status, severity, title, author, project_id, description, created, "
+                            "updated FROM workitems WHERE uri = ?", (workitem_uri,))
+        if not rows:
+            return None
+
+        custom_fields = {}
+        for key, value in self.execute("SELECT key, value FROM custom_fields WHERE workitem_uri = ? ORDER BY rowid",
+                                       (workitem_uri,)):
+            custom_fields[key] = custom_fields[key] + (value,) if key in custom_fields else (value,)
+        links = self.execute("SELECT role, linked_uri FROM links WHERE workitem_uri = ? ORDER BY rowid",
+                             (workitem_uri,))
+        comments = self.execute("SELECT uri, id, title, text, created, author, parent_uri FROM comments "
+                                "WHERE workitem_uri = ? ORDER BY rowid", (workitem_uri,))
+
+        (uri, workitem_id, workitem_type, status, severity, title, author, project_id, description, created,
+         updated) = rows[0]
+        return WorkitemSnapshot(uri, workitem_id, workitem_type, status, severity, title, author, project_id,
+                                description, to_datetime(created), to_datetime(updated),
+                                tuple((key, values[0] if len(values) == 1 else values)
+                                      for key, values in custom_fields.items()),
+                                tuple(links),
+                                tuple(CommentSnapshot(comment_uri, comment_id, comment_title, text, to_datetime(date_time),
+                                                      comment_author, parent_uri)
+                                      for comment_uri, comment_id, comment_title, text, date_time, comment_author,
+                                      parent_uri in comments))
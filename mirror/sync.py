@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from ..objects.snapshot import WorkitemSnapshot
+from .store import MirrorStore, to_text
+
+# Fields mirrored for each work item
+MIRRORED_FIELDS = ['id', 'type', 'status', 'severity', 'title', 'author', 'project', 'description', 'created',
+                   'updated', 'customFields', 'linkedWorkItems', 'comments']
+
+
+class SyncReport:
+    """
+    Class SyncReport
+    Outcome of a DeltaSync.sync call
+    """
+
+    def __init__(self, since: datetime or None):
+        self.since = since
+        self.watermark = since
+        self.pulled = 0
+        self.histories = 0
+        self.pruned = 0
+
+    def __repr__(self):
+        return "SyncReport(since=%s, watermark=%s, pulled=%d, histories=%d, pruned=%d)" % (
+            self.since, self.watermark, self.pulled, self.histories, self.pruned)
+
+
+class DeltaSync:
+    """
+    Class DeltaSync
+    Keeps a MirrorStore up to date with the work items of a project. Each synchronisation only pulls the work items
+    updated since the watermark of the previous one (updated:[date TO *] query), page by page, and upserts each page
+    in one transaction. The watermark is the most recent update date mirrored; it is stored once all the pages have
+    been applied, so an interrupted synchronisation is simply done again.
+    Lucene date ranges have a day granularity: the work items updated on the day before the watermark are pulled again
+    (upserts are idempotent), which also covers the time zone difference between client and server.
+    """
+    DATE_FORMAT = '%Y%m%d'
+
+    def __init__(self, polarion_access, store: MirrorStore, project_id: str, query: str = None, page_size: int = 500,
+                 with_history: bool = False, prefetch: bool = True, history_workers: int = 8):
+        """
+        Class init
+        :param polarion_access: PolarionAccess used to pull the work items
+        :param store: Mirror to update
+        :param project_id: ID of the project to mirror
+        :param query: Lucene query restricting the mirrored work items (all the work items of the project if None)
+        :param page_size: Number of work items pulled per request and upserted per transaction
+        :param with_history: If True, the history of each pulled work item is mirrored as well (generateHistory)
+        :param prefetch: Pull the next page while the current one is stored
+        :param history_workers: Maximum number of concurrent generateHistory requests
+        """
+        self._polarion_access = polarion_access
+        self._store = store
+        self._project_id = project_id
+        self._query = query
+        self._page_size = page_size
+        self._with_history = with_history
+        self._prefetch = prefetch
+        self._history_workers = history_workers
+
+    @property
+    def scope(self) -> str:
+        """
+        Property used to get the key of the watermark of this synchronisation in the store
+        :return: Scope of the synchronisation
+        """
+        return "%s:%s" % (self._project_id, self._query or '')
+
+    def _build_query(self, since: datetime or None) -> str:
+        """
+        Protected method used to build the query of the work items to pull
+        :param since: Watermark of the previous synchronisation, or None to pull every work item
+        :return: Lucene query
+        """
+        query = "project.id:%s" % self._project_id
+        if self._query:
+            query += " AND (%s)" % self._query
+        if since is not None:
+            query += " AND updated:[%s TO *]" % (since - timedelta(days=1)).strftime(self.DATE_FORMAT)
+        return query
+
+    def sync(self, full: bool = False) -> SyncReport:
+        """
+        Method used to pull the changes of the server into the mirror
+        :param full: If True, every work item is pulled again, and (when no query restricts the synchronisation) the
+                     mirrored work items which do not exist anymore on the server are deleted
+        :return: Synchronisation report
+        """
+        watermark = None if full else self._store.get_watermark(self.scope)
+        since = datetime.fromisoformat(watermark) if watermark else None
+        report = SyncReport(since)
+        started = datetime.now(timezone.utc)
+
+        tracker = self._polarion_access.tracker
+        page = []
+        pulled_uris = set()
+        for workitem in tracker.iter_workitems(self._build_query(since), 'updated', MIRRORED_FIELDS, self._page_size,
+                                               self._prefetch):
+            snapshot = WorkitemSnapshot.from_zeep(workitem)
+            page.append(snapshot)
+            if full:
+                pulled_uris.add(snapshot.uri)
+            if snapshot.updated is not None and (report.watermark is None or snapshot.updated > report.watermark):
+                report.watermark = snapshot.updated
+
+            if len(page) >= self._page_size:
+                self._apply(page, report)
+                page = []
+        self._apply(page, report)
+
+        if full and not self._query:
+            report.pruned = self._store.prune(self._project_id, pulled_uris)
+        if report.watermark is not None:
+            self._store.set_watermark(self.scope, report.watermark.isoformat(), started.isoformat())
+        return report
+
+    def _apply(self, snapshots: [WorkitemSnapshot], report: SyncReport) -> None:
+        """
+        Protected method used to store a page of pulled work items
+        :param snapshots: Snapshots of the work items
+        :param report: Synchronisation report
+        :return: None
+        """
+        self._store.upsert(snapshots)
+        report.pulled += len(snapshots)
+
+        if self._with_history:
+            tracker = self._polarion_access.tracker
+            with ThreadPoolExecutor(max_workers=self._history_workers, thread_name_prefix="polarion-sync") as executor:
+                histories = executor.map(tracker.generate_workitem_history_by_uri,
+                                         [snapshot.uri for snapshot in snapshots])
+            for snapshot, changes in zip(snapshots, histories):
+                changes = changes or []
+                self._store.replace_history(snapshot.uri, [
+                    (change.revision, to_text(change.creationDate), change.user.id if change.user else None,
+                     diff.fieldName, to_text(diff.before), to_text(diff.after))
+                    for change in changes for diff in (change.diffs.FieldDiff if change.diffs else [])])
+                report.histories += 1
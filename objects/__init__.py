@@ -2,3 +2,4 @@
 from .test_case import PolarionTestCase
 from .comment import Comment
 from .workitem import clean_html
+from .snapshot import WorkitemSnapshot, CommentSnapshot
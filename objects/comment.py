@@ -2,23 +2,31 @@
 
 from datetime import date, time
 
+from .snapshot import CommentSnapshot, WorkitemSnapshot
+
 
 class Comment:
     """
     Class comment
+    Built from a zeep Comment object or from a CommentSnapshot
     """
     def __init__(self, comment):
         self.parent = None
 
         self._answers = []
         self._index = comment.id
+        self._uri = comment.uri
         self._title = comment.title if comment.title else ""
-        self._text = comment.text.content if comment.text else ""
         self._date = date(comment.created.year, comment.created.month, comment.created.day)
         self._time = time(comment.created.hour, comment.created.minute, comment.created.second)
-        self._author = comment.author.name
-
-        self._parent_uri = comment.parentCommentURI
+        if isinstance(comment, CommentSnapshot):
+            self._text = comment.text if comment.text else ""
+            self._author = comment.author
+            self._parent_uri = comment.parent_uri
+        else:
+            self._text = comment.text.content if comment.text else ""
+            self._author = comment.author.name
+            self._parent_uri = comment.parentCommentURI
 
     def link(self, *answers) -> None:
         """
@@ -39,6 +47,14 @@ class Comment:
         """
         return self._index
 
+    @property
+    def uri(self) -> str:
+        """
+        Property used to get the uri of the comment
+        :return: uri of the comment
+        """
+        return self._uri
+
     @property
     def title(self) -> str:
         """
@@ -111,14 +127,25 @@ class CommentsTree:
     def __init__(self, workitem):
         """
         Class init
-        :param workitem: Workitem which contains the comments to be ordered
+        :param workitem: Workitem (zeep object or WorkitemSnapshot) which contains the comments to be ordered
         """
         self._comments = {}
 
-        # Create the comments tree
-        if workitem.comments:
-            for comment in workitem.comments.Comment:
-                self.__add(comment, workitem)
+        if isinstance(workitem, WorkitemSnapshot):
+            comments = workitem.comments
+        else:
+            comments = workitem.comments.Comment if workitem.comments else []
+
+        # Create the comments tree: index comments by URI, then link each answer to its parent
+        if comments:
+            comments_by_uri = {}
+            for comment in comments:
+                comments_by_uri[comment.uri] = self.__get_comment(comment)
+
+            for comment in comments_by_uri.values():
+                parent = comments_by_uri.get(comment.parent_uri) if comment.parent_uri else None
+                if parent is not None and parent is not comment:
+                    parent.link(comment)
 
     def __getitem__(self, comment):
         return self._comments[comment]
@@ -133,27 +160,6 @@ class CommentsTree:
             self._comments[comment.id] = Comment(comment)
         return self._comments[comment.id]
 
-    def __get_child(self, comment, answer) -> Comment or None:
-        """
-        Method used to get answers of comment
-        :param comment: Comment considered as parent
-        :param answer: Comment considered as potential answer
-        :return: Answer if answer, else None
-        """
-        answer = self.__get_comment(answer)
-        if comment.uri == answer.parent_uri:
-            return answer
-        return None
-
-    def __add(self, comment, workitem) -> None:
-        """
-        Method used to create links between comment and other comments of a workitem
-        :param comment: Comment considered as parent on wich answers will be added
-        :param workitem: Workitem which contains the comments to be linked
-        :return: None
-        """
-        self.__get_comment(comment).link(*(self.__get_child(comment, answer) for answer in workitem.comments.Comment))
-
     def get_master_comments(self) -> [Comment] or []:
         """
         Method used to get the list of master comments (sources of discussion)
@@ -167,15 +173,35 @@ class CommentsTree:
 
     def get_answers(self, index, level=0):
         """
-        (Recursive) Method used to get discussion fill with a level corresponding to each comment
+        Method used to get discussion fill with a level corresponding to each comment
         :param index: Index of the comment
         :param level: Current level of the comment
         :return: Comment list with corresponding level
         """
-        if not self._comments[index].answers:
-            comments_list = [(self._comments[index], level)]
-        else:
-            comments_list = [(self._comments[index], level)]
-            for answer in self._comments[index].answers:
-                comments_list = comments_list + self.get_answers(answer.index, level+1)
-        return comments_list
+        return list(self.iter_discussion(index, level))
+
+    def iter_discussion(self, index, level=0):
+        """
+        Generator used to walk through a discussion depth first (comment, then its answers recursively)
+        :param index: Index of the comment starting the discussion
+        :param level: Level of the starting comment
+        :return: Generator of (Comment, level) tuples
+        """
+        stack = [iter([self._comments[index]])]
+        while stack:
+            comment = next(stack[-1], None)
+            if comment is None:
+                stack.pop()
+                continue
+
+            yield comment, level + len(stack) - 1
+            if comment.answers:
+                stack.append(iter(comment.answers))
+
+    def walk(self):
+        """
+        Generator used to walk through all the discussions of the workitem depth first
+        :return: Generator of (Comment, level) tuples
+        """
+        for comment in self.get_master_comments():
+            yield from self.iter_discussion(comment.index)
@@ -0,0 +1,244 @@
+from datetime import datetime
+from sys import intern
+
+
+def _intern(value):
+    """
+    Function used to intern a string (None and other types are returned as is)
+    """
+    return intern(value) if isinstance(value, str) else value
+
+
+def _local_name(element) -> str:
+    """
+    Function used to get the tag of an lxml element without its namespace
+    """
+    return element.tag.rsplit('}', 1)[-1]
+
+
+def _child(element, name: str):
+    """
+    Function used to get the first child of an lxml element with a given local name
+    """
+    for child in element:
+        if _local_name(child) == name:
+            return child
+    return None
+
+
+def _child_text(element, name: str) -> str or None:
+    child = _child(element, name) if element is not None else None
+    return child.text if child is not None else None
+
+
+def array_items(value) -> list or None:
+    """
+    Function used to get the items of a zeep array object (i.e. ArrayOfEnumOptionId, whose items are in its
+    EnumOptionId field)
+    :param value: zeep value
+    :return: List of the items, or None if value is not an array object
+    """
+    values = getattr(value, '__values__', None)
+    if values is not None and len(values) == 1:
+        items = next(iter(values.values()))
+        if isinstance(items, list):
+            return items
+    return None
+
+
+def _parse_datetime(value: str or None) -> datetime or None:
+    """
+    Function used to parse a date time of a SOAP response (None if it is missing or not in ISO format)
+    """
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _plain_value(value):
+    """
+    Function used to convert a zeep value into a compact python value: enum options become their (interned) id,
+    texts their content, and lists and array objects (i.e. ArrayOfEnumOptionId) tuples
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_plain_value(item) for item in value)
+    if value is None or isinstance(value, (str, int, float, bool, datetime)):
+        return _intern(value)
+    items = array_items(value)
+    if items is not None:
+        return tuple(_plain_value(item) for item in items)
+    if hasattr(value, 'content'):
+        return value.content
+    if hasattr(value, 'id'):
+        return _intern(value.id)
+    return value
+
+
+def _plain_xml_value(element):
+    """
+    Function used to convert a value element of a SOAP response into a compact python value
+    """
+    if element is None:
+        return None
+    if len(element):
+        content = _child(element, 'content')
+        if content is not None:
+            return content.text
+        identifier = _child(element, 'id')
+        if identifier is not None:
+            return _intern(identifier.text)
+        return tuple(_plain_xml_value(child) for child in element)
+    return _intern(element.text)
+
+
+class _Snapshot:
+    """
+    Base class of immutable snapshots: attributes are set once by the constructor
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.__reduce__() == other.__reduce__()
+
+    def __hash__(self):
+        return hash(self.__reduce__()[1][:2])
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join("%s=%r" % (name, getattr(self, name))
+                                                          for name in self.__slots__[:2]))
+
+
+class CommentSnapshot(_Snapshot):
+    """
+    Class CommentSnapshot
+    Compact and immutable copy of a work item comment
+    """
+    __slots__ = ('uri', 'id', 'title', 'text', 'created', 'author', 'parent_uri')
+
+    @classmethod
+    def from_zeep(cls, comment) -> "CommentSnapshot":
+        """
+        Method used to build a snapshot from a zeep Comment object
+        :param comment: zeep Comment object
+        :return: Comment snapshot
+        """
+        return cls(comment.uri,
+                   _intern(comment.id),
+                   comment.title,
+                   comment.text.content if comment.text else None,
+                   comment.created,
+                   _intern(comment.author.name) if comment.author else None,
+                   comment.parentCommentURI)
+
+    @classmethod
+    def from_xml(cls, element) -> "CommentSnapshot":
+        """
+        Method used to build a snapshot from the Comment element of a SOAP response
+        :param element: lxml Comment element
+        :return: Comment snapshot
+        """
+        return cls(element.get('uri'),
+                   _intern(_child_text(element, 'id')),
+                   _child_text(element, 'title'),
+                   _child_text(_child(element, 'text'), 'content'),
+                   _parse_datetime(_child_text(element, 'created')),
+                   _intern(_child_text(_child(element, 'author'), 'name')),
+                   _child_text(element, 'parentCommentURI'))
+
+
+class WorkitemSnapshot(_Snapshot):
+    """
+    Class WorkitemSnapshot
+    Compact and immutable copy of a work item: enum options are kept as their (interned) id, texts as their content,
+    custom fields as (key, value) tuples, linked work items as (role, URI) tuples and comments as CommentSnapshot.
+    Snapshots are picklable and can be wrapped by PolarionWorkitem.
+    """
+    __slots__ = ('uri', 'id', 'type', 'status', 'severity', 'title', 'author', 'project_id', 'description', 'created',
+                 'updated', 'custom_fields', 'linked_workitems', 'comments')
+
+    @classmethod
+    def from_zeep(cls, workitem) -> "WorkitemSnapshot":
+        """
+        Method used to build a snapshot from a zeep WorkItem object (fields which have not been loaded are None)
+        :param workitem: zeep WorkItem object
+        :return: Workitem snapshot
+        """
+        custom_fields = workitem.customFields.Custom if workitem.customFields else []
+        links = workitem.linkedWorkItems.LinkedWorkItem if workitem.linkedWorkItems else []
+        comments = workitem.comments.Comment if workitem.comments else []
+
+        return cls(workitem.uri,
+                   _intern(workitem.id),
+                   _plain_value(workitem.type),
+                   _plain_value(workitem.status),
+                   _plain_value(workitem.severity),
+                   workitem.title,
+                   _intern(workitem.author.name) if workitem.author else None,
+                   _intern(workitem.project.id) if workitem.project else None,
+                   workitem.description.content if workitem.description else None,
+                   workitem.created,
+                   workitem.updated,
+                   tuple((_intern(custom.key), _plain_value(custom.value)) for custom in custom_fields),
+                   tuple((_plain_value(link.role), link.workItemURI) for link in links),
+                   tuple(CommentSnapshot.from_zeep(comment) for comment in comments))
+
+    @classmethod
+    def from_xml(cls, element) -> "WorkitemSnapshot":
+        """
+        Method used to build a snapshot from the WorkItem element of a SOAP response, without zeep
+        :param element: lxml WorkItem element (i.e. a queryWorkItemsReturn element)
+        :return: Workitem snapshot
+        """
+        fields = {_local_name(child): child for child in element}
+
+        def enum_id(name):
+            return _intern(_child_text(fields.get(name), 'id'))
+
+        custom_fields = fields.get('customFields')
+        links = fields.get('linkedWorkItems')
+        comments = fields.get('comments')
+        text = fields.get('title')
+
+        return cls(element.get('uri'),
+                   _intern(fields['id'].text) if 'id' in fields else None,
+                   enum_id('type'),
+                   enum_id('status'),
+                   enum_id('severity'),
+                   text.text if text is not None else None,
+                   _intern(_child_text(fields.get('author'), 'name')),
+                   _intern(_child_text(fields.get('project'), 'id')),
+                   _child_text(fields.get('description'), 'content'),
+                   _parse_datetime(fields['created'].text) if 'created' in fields else None,
+                   _parse_datetime(fields['updated'].text) if 'updated' in fields else None,
+                   tuple((_intern(_child_text(custom, 'key')), _plain_xml_value(_child(custom, 'value')))
+                         for custom in (custom_fields if custom_fields is not None else ())),
+                   tuple((_intern(_child_text(_child(link, 'role'), 'id')), _child_text(link, 'workItemURI'))
+                         for link in (links if links is not None else ())),
+                   tuple(CommentSnapshot.from_xml(comment) for comment in (comments if comments is not None else ())))
+
+    def get_custom_field_value(self, custom_field_id: str) -> object or None:
+        """
+        Method used to get a custom field value
+        :param custom_field_id: Key of the custom field
+        :return: Value or None if custom field doesn't exist
+        """
+        for key, value in self.custom_fields:
+            if key == custom_field_id:
+                return value
+        return None
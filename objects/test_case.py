@@ -4,21 +4,25 @@ from string import Template
 from requests import exceptions as requests_exceptions
 from zeep import exceptions as zeep_exceptions
 from .workitem import PolarionWorkitem
+from ..web_services.test_management import TestStepsTable
 from ..polarion import PolarionError
 
 
 class PolarionTestCase(PolarionWorkitem):
     """
     PolarionTestCase
+    Test steps are fetched once and kept until set_test_steps or invalidate_steps is called.
     """
 
-    def __init__(self, test_case_id, workitem_type: str = None):
+    def __init__(self, test_case_id, workitem_type: str = None, fields: [str] = None):
+
+        self._test_steps = None
 
         if workitem_type:
             self.WORKITEM_TYPE = workitem_type
 
         try:
-            PolarionWorkitem.__init__(self, test_case_id)
+            PolarionWorkitem.__init__(self, test_case_id, fields)
         except (requests_exceptions.ConnectionError, zeep_exceptions.Fault, PolarionError, AttributeError) as exception:
             raise PolarionError(f"Failed to create PolarionEcuTestCase object (error = {exception})") from exception
 
@@ -32,12 +36,39 @@ class PolarionTestCase(PolarionWorkitem):
         return "https://" + hostname + "/polarion/#/project/" + self.polarion_instance.project_id + \
                "/workitems/defect?query=linkedWorkItems:" + self.id
 
+    def _get_test_steps(self):
+        """
+        Protected method used to get the test steps, fetched on first access
+        :return: TestSteps object
+        """
+        if self._test_steps is None:
+            self._test_steps = self.polarion_instance.polarion_access.test_management.get_test_steps(self.uri)
+        return self._test_steps
+
+    def invalidate_steps(self) -> None:
+        """
+        Method used to drop the cached test steps, so that they are fetched again on next access
+        :return: None
+        """
+        self._test_steps = None
+
+    def set_test_steps(self, test_steps) -> None:
+        """
+        Method used to replace the test steps of the test case (see TestManagementWebService.set_test_steps)
+        :param test_steps: an array containing an entry for each step
+        :return: None
+        """
+        try:
+            self.polarion_instance.polarion_access.test_management.set_test_steps(self.uri, test_steps)
+        finally:
+            self.invalidate_steps()
+
     def nb_steps(self):
         """
         Returns all steps
         returns: list of steps
         """
-        steps_list = self.polarion_instance.polarion_access.test_management.get_test_steps(self.uri)
+        steps_list = self._get_test_steps()
         nb_step = len(steps_list.steps.TestStep)
         return nb_step
 
@@ -46,9 +77,16 @@ class PolarionTestCase(PolarionWorkitem):
         Returns all steps
         returns: list of steps
         """
-        steps_list = self.polarion_instance.polarion_access.test_management.get_test_steps(self.uri)
+        steps_list = self._get_test_steps()
         return steps_list.steps.TestStep
 
+    def get_steps_table(self) -> TestStepsTable:
+        """
+        Returns a compact copy of the steps (step index x column)
+        returns: Test steps table
+        """
+        return TestStepsTable.from_test_steps(self._get_test_steps())
+
     def get_step(self, index):
 
         steps_list = self.get_steps()
@@ -1,7 +1,9 @@
 
 
 import re
+from datetime import date, datetime
 from .comment import CommentsTree
+from .snapshot import WorkitemSnapshot, array_items
 from ..polarion import Polarion, InvalidWorkItem
 
 
@@ -17,26 +19,47 @@ def clean_html(string_to_clean):
 class PolarionWorkitem:
     """
     Class PolarionWorkitem
+    Fields which have not been loaded with the workitem (see fields parameter) are fetched on first access, and the
+    comments tree is only built when the comments are read.
+    A WorkitemSnapshot can be wrapped instead of a zeep workitem object, to keep large sets of workitems in memory.
     """
     WORKITEM_TYPE = ""
 
-    def __init__(self, arg):
+    # Fields always loaded, even when a projection is requested
+    REQUIRED_FIELDS = ('id', 'type')
+
+    def __init__(self, arg, fields: [str] = None):
+        """
+        Class init
+        :param arg: ID of the workitem to get, workitem object or WorkitemSnapshot
+        :param fields: Keys of the fields to load (all fields if None). When arg is a workitem object, keys of the
+                       fields it has been loaded with (i.e. the fields of the query which returned it).
+        """
         self.polarion_instance = Polarion.get_instance()
 
         self._workitem = None
         self._comments = None
+        self._custom_fields_index = None
+        self._comments_index = None
+        self._snapshot = isinstance(arg, WorkitemSnapshot)
+        self._loaded_fields = None if fields is None or self._snapshot else set(fields) | set(self.REQUIRED_FIELDS)
 
         if isinstance(arg, str):
             workitem_id = self.polarion_instance.project_prefix + arg if re.search("^\\d+$", arg) else arg
 
-            self._workitem = self.polarion_instance.polarion_access.tracker.get_workitem_by_id(
-                self.polarion_instance.project_id, workitem_id)
+            tracker = self.polarion_instance.polarion_access.tracker
+            if self._loaded_fields is None:
+                self._workitem = tracker.get_workitem_by_id(self.polarion_instance.project_id, workitem_id)
+            else:
+                self._workitem = tracker.get_workitem_by_id_with_fields(self.polarion_instance.project_id,
+                                                                        workitem_id, sorted(self._loaded_fields))
         else:
             self._workitem = arg
 
         if self._workitem.type:
-            if self._workitem.type.id != self.WORKITEM_TYPE:
-                raise InvalidWorkItem(f"Polarion workitem {self._workitem.type.id} is not an {self.WORKITEM_TYPE}.")
+            workitem_type = self._workitem.type if self._snapshot else self._workitem.type.id
+            if workitem_type != self.WORKITEM_TYPE:
+                raise InvalidWorkItem(f"Polarion workitem {workitem_type} is not an {self.WORKITEM_TYPE}.")
 
             self._initialization()
 
@@ -48,7 +71,50 @@ class PolarionWorkitem:
         Protected method used to finalize the object instantiation
         :return: None
         """
-        self._comments = CommentsTree(self.workitem)
+        self._comments = None
+
+    def load_fields(self, *fields: str) -> None:
+        """
+        Method used to load fields which have not been loaded yet, in a single request
+        :param fields: Keys of the fields to load
+        :return: None
+        """
+        # All the fields are loaded, or the workitem is a snapshot (immutable)
+        if self._loaded_fields is None:
+            return
+        missing_fields = [field for field in fields if field not in self._loaded_fields]
+        if not missing_fields:
+            return
+
+        loaded_workitem = self.polarion_instance.polarion_access.tracker.get_workitem_by_uri_with_fields(
+            self.uri, missing_fields)
+        for field in missing_fields:
+            setattr(self._workitem, field, getattr(loaded_workitem, field, None))
+        self._loaded_fields.update(missing_fields)
+
+        # Indexes built on previous values are not valid anymore
+        if 'customFields' in missing_fields:
+            self._custom_fields_index = None
+        if 'comments' in missing_fields:
+            self._comments_index = None
+
+    def _field(self, field: str):
+        """
+        Protected method used to get a field of the workitem, loading it on first access if needed
+        :param field: Key of the field
+        :return: Value of the field
+        """
+        self.load_fields(field)
+        return getattr(self._workitem, field)
+
+    def snapshot(self) -> WorkitemSnapshot:
+        """
+        Method used to get a compact and immutable copy of the workitem (fields not loaded yet are None)
+        :return: Workitem snapshot
+        """
+        if self._snapshot:
+            return self._workitem
+        return WorkitemSnapshot.from_zeep(self._workitem)
 
     @property
     def uri(self):
@@ -57,16 +123,19 @@ class PolarionWorkitem:
     @property
     def comments(self) -> object:
         """
-        Property used to get comments linked to the workitem
+        Property used to get comments linked to the workitem (built on first access)
         :return: Comments object
         """
+        if self._comments is None:
+            self.load_fields('comments')
+            self._comments = CommentsTree(self.workitem)
         return self._comments
 
     @property
     def workitem(self):
         """
         Property used to get workitem object
-        :return: Workitem object or raise exception if there is a polarion connexion issue
+        :return: Workitem object (or WorkitemSnapshot) or raise exception if there is a polarion connexion issue
         """
         return self._workitem
 
@@ -84,7 +153,9 @@ class PolarionWorkitem:
         Property used to get workitem author
         :return: workitem id
         """
-        return self.workitem.author.name
+        if self._snapshot:
+            return self._workitem.author
+        return self._field('author').name
 
     @property
     def status(self) -> str:
@@ -92,7 +163,9 @@ class PolarionWorkitem:
         Property used to get workitem workflow status
         :return: Workflow status of the workitem
         """
-        return self.workitem.status.id
+        if self._snapshot:
+            return self._workitem.status
+        return self._field('status').id
 
     @property
     def severity(self) -> str:
@@ -100,7 +173,9 @@ class PolarionWorkitem:
         Property used to get workitem severity
         :return: Severity of the workitem
         """
-        return self.workitem.severity.id
+        if self._snapshot:
+            return self._workitem.severity
+        return self._field('severity').id
 
     @property
     def title(self) -> str:
@@ -108,7 +183,7 @@ class PolarionWorkitem:
         Property used to get workitem title
         :return: workitem title
         """
-        return self.workitem.title
+        return self._field('title')
 
     @property
     def description(self) -> str:
@@ -116,7 +191,9 @@ class PolarionWorkitem:
         Property used to get workitem description
         :return: workitem description
         """
-        return self.workitem.description.content
+        if self._snapshot:
+            return self._workitem.description
+        return self._field('description').content
 
     @property
     def url(self) -> str:
@@ -125,20 +202,49 @@ class PolarionWorkitem:
         :return: Workitem url
         """
         hostname = Polarion.get_instance().polarion_access.hostname
-        return "https://" + hostname + "/polarion/#/project/" + self.workitem.project.id + "/workitem?id=" \
-               + self.workitem.id
+        project_id = self._workitem.project_id if self._snapshot else self._field('project').id
+        return "https://" + hostname + "/polarion/#/project/" + project_id + "/workitem?id=" + self.workitem.id
+
+    def _get_custom_fields_index(self) -> dict:
+        """
+        Protected method used to get the custom field key -> value index (built on first use)
+        :return: Dictionary of custom field values by key
+        """
+        if self._custom_fields_index is None:
+            if self._snapshot:
+                custom_fields = self._workitem.custom_fields
+            else:
+                custom_fields = self._field('customFields')
+                custom_fields = [(custom_field["key"], custom_field["value"])
+                                 for custom_field in custom_fields["Custom"]] if custom_fields else []
+            # The first value of a duplicated key wins, as with a search of the list
+            index = {}
+            for key, value in custom_fields:
+                index.setdefault(key, value)
+            self._custom_fields_index = index
+        return self._custom_fields_index
+
+    def _get_comments_index(self) -> dict:
+        """
+        Protected method used to get the comment URI -> comment index (built on first use)
+        :return: Dictionary of comments by URI
+        """
+        if self._comments_index is None:
+            if self._snapshot:
+                comments = self._workitem.comments
+            else:
+                comments = self._field('comments')
+                comments = comments.Comment if comments else []
+            self._comments_index = {comment.uri: comment for comment in comments}
+        return self._comments_index
 
     def get_comment_by_uri(self, uri: str) -> object or None:
         """
         Method used to get specific comment using its URI
         :param uri: URI of the comment
-        :return: Comment object if exist, else None
+        :return: Comment object (or CommentSnapshot) if exist, else None
         """
-        if self.workitem.comments:
-            for comment in self.workitem.comments.Comment:
-                if comment.uri == uri:
-                    return comment
-        return None
+        return self._get_comments_index().get(uri)
 
     def get_custom_field_value(self, custom_field_id: str) -> object or None:
         """
@@ -146,13 +252,52 @@ class PolarionWorkitem:
         :param custom_field_id: Custom field id corresponding value to return
         :return: Value or None if custom field doesn't exist
         """
-        if self.workitem.customFields is None:
-            return None
+        return self._get_custom_fields_index().get(custom_field_id)
 
-        custom_fields_list = self.workitem.customFields["Custom"]
+    def get_custom_field_values(self, *custom_field_ids: str) -> dict:
+        """
+        Method used to extract several custom field values at once
+        :param custom_field_ids: Custom field ids corresponding values to return
+        :return: Dictionary of values by custom field id (None if custom field doesn't exist)
+        """
+        index = self._get_custom_fields_index()
+        return {custom_field_id: index.get(custom_field_id) for custom_field_id in custom_field_ids}
 
-        for custom_field in custom_fields_list:
-            if custom_field["key"] == custom_field_id:
-                return custom_field["value"]
+    def get_custom_field_enum(self, custom_field_id: str) -> str or [str] or None:
+        """
+        Method used to get the value of an enumeration custom field
+        :param custom_field_id: Custom field id
+        :return: ID of the enumeration option (list of IDs for multi-valued fields), or None if custom field doesn't
+                 exist
+        """
+        value = self.get_custom_field_value(custom_field_id)
+        items = array_items(value)
+        if items is not None:
+            value = items
+        if isinstance(value, (list, tuple)):
+            return [option if isinstance(option, str) else option.id for option in value]
+        if value is None or isinstance(value, str):
+            return value
+        return value.id
 
-        return None
+    def get_custom_field_text(self, custom_field_id: str) -> str or None:
+        """
+        Method used to get the value of a text custom field
+        :param custom_field_id: Custom field id
+        :return: Content of the text, or None if custom field doesn't exist
+        """
+        value = self.get_custom_field_value(custom_field_id)
+        if value is None or isinstance(value, str):
+            return value
+        return value.content
+
+    def get_custom_field_date(self, custom_field_id: str) -> date or None:
+        """
+        Method used to get the value of a date (or date time) custom field
+        :param custom_field_id: Custom field id
+        :return: Date or datetime, or None if custom field doesn't exist
+        """
+        value = self.get_custom_field_value(custom_field_id)
+        if isinstance(value, str):
+            return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        return value
@@ -1,6 +1,9 @@
 
 from __future__ import annotations
 
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from time import time
 
 from requests import exceptions as requests_exceptions
@@ -25,6 +28,35 @@ class ComError(PolarionError):
     """The Polarion server is not reachable."""
 
 
+class TransactionRolledBack(PolarionError):
+    """The batched operation has been rolled back with its transaction."""
+
+
+class UnsupportedQuery(PolarionError):
+    """The query cannot be run on the local mirror."""
+
+
+class PoolTimeout(PolarionError):
+    """No session of the pool became available in time."""
+
+
+def _as_polarion_error(exception: Exception) -> PolarionError:
+    """
+    Protected function used to report any failure as a PolarionError: transport errors and SOAP faults become
+    ComError, other exceptions are wrapped in PolarionError (the original exception is kept as the cause)
+    :param exception: Exception raised while loading or wrapping a workitem
+    :return: PolarionError object
+    """
+    if isinstance(exception, PolarionError):
+        return exception
+    if isinstance(exception, (requests_exceptions.RequestException, zeep_exceptions.Error)):
+        error = ComError(exception)
+    else:
+        error = PolarionError(exception)
+    error.__cause__ = exception
+    return error
+
+
 class Polarion:
     """
         Polarion singleton
@@ -44,9 +76,11 @@ class Polarion:
             raise Exception("Polarion singleton class has to be initialize before it can be used")
         return Polarion.__instance
 
-    def __init__(self, server, project_id, project_prefix, username, password):
+    def __init__(self, server, project_id, project_prefix, username, password, **access_options):
         """
             Virtually private constructor
+            :param access_options: Options forwarded to PolarionAccess (i.e. wsdl_cache, session_idle_window, transport
+                                   options such as pool_maxsize or operation_timeouts)
         """
         if Polarion.__instance is not None:
             raise Exception("Polarion class is a singleton, it should be instanced only once.")
@@ -54,7 +88,9 @@ class Polarion:
         Polarion.__instance = self
 
         # Create polarion access instance
-        self._polarion_access = PolarionAccess(server)
+        self._server = server
+        self._access_options = access_options
+        self._polarion_access = PolarionAccess(server, **access_options)
         self.project_id = project_id
         self.project_prefix = project_prefix
 
@@ -67,6 +103,8 @@ class Polarion:
     def polarion_access(self) -> PolarionAccess:
         """
         Polarion connection status access property
+        The session is only checked on the server after an idle window (calls failing on an expired session are
+        retried after a new log in by PolarionAccess)
         Catch network exceptions and try to reopen a new session in case of failure
         :return: Polarion access object
         """
@@ -90,3 +128,114 @@ class Polarion:
                         raise ComError(exception)
 
         return self._polarion_access
+
+    def fetch_workitems(self, ids: [str], workitem_class, fields: [str] = None, chunk_size: int = 100,
+                        max_workers: int = 8) -> ([object], dict):
+        """
+        Method used to load many workitems at once. The IDs are grouped into id:(A OR B OR ...) queries, the workitems
+        not returned by these queries are then fetched one by one by a bounded pool of threads.
+        :param ids: IDs of the workitems to load (numeric IDs are prefixed with the project prefix)
+        :param workitem_class: Class (or callable) used to wrap each workitem, called with the workitem and the fields
+                               it has been loaded with, i.e. a PolarionWorkitem subclass or
+                               lambda workitem, fields: PolarionTestCase(workitem, "testcase", fields)
+        :param fields: Keys of the fields to fill (default: all the fields used by PolarionWorkitem)
+        :param chunk_size: Maximum number of IDs per query
+        :param max_workers: Maximum number of concurrent per-ID requests
+        :return: Tuple (list of wrapped workitems in input order, None for failed items;
+                        dictionary input ID -> PolarionError for each failed item, ComError for transport errors
+                        and SOAP faults, the original exception being its cause)
+        """
+        tracker = self.polarion_access.tracker
+        workitem_ids = [self.project_prefix + workitem_id if re.search("^\\d+$", workitem_id) else workitem_id
+                        for workitem_id in ids]
+        unique_ids = list(dict.fromkeys(workitem_ids))
+        # The workitems are matched by ID, and PolarionWorkitem checks their type
+        query_fields = None if fields is None else list(dict.fromkeys(['id', 'type'] + list(fields)))
+
+        found = {}
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            try:
+                for workitem in tracker.query_workitems_by_ids(self.project_id, chunk, query_fields):
+                    found[workitem.id] = workitem
+            except (requests_exceptions.RequestException, zeep_exceptions.Error):
+                # The workitems of this chunk are fetched one by one below
+                logging.getLogger(__name__).warning("Query of %d workitems failed, fetching them one by one",
+                                                    len(chunk), exc_info=True)
+
+        failures = {}
+        missing_ids = [workitem_id for workitem_id in unique_ids if workitem_id not in found]
+        if missing_ids:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polarion-fetch") as executor:
+                if fields is None:
+                    futures = {workitem_id: executor.submit(tracker.get_workitem_by_id, self.project_id, workitem_id)
+                               for workitem_id in missing_ids}
+                else:
+                    futures = {workitem_id: executor.submit(tracker.get_workitem_by_id_with_fields, self.project_id,
+                                                            workitem_id, query_fields)
+                               for workitem_id in missing_ids}
+                for workitem_id, future in futures.items():
+                    try:
+                        found[workitem_id] = future.result()
+                    except Exception as exception:
+                        failures[workitem_id] = exception
+
+        workitems = []
+        errors = {}
+        for input_id, workitem_id in zip(ids, workitem_ids):
+            try:
+                if workitem_id in failures:
+                    raise failures[workitem_id]
+                workitems.append(workitem_class(found[workitem_id], fields))
+            except Exception as exception:
+                workitems.append(None)
+                errors[input_id] = _as_polarion_error(exception)
+        return workitems, errors
+
+    def batch(self, max_ops: int = 500, stop_on_error: bool = False):
+        """
+        Method used to group write operations in explicit transactions:
+            with polarion.batch(max_ops=500) as batch:
+                batch.add_comment(workitem_uri, "title", "comment")
+            failed = batch.failed_operations
+        :param max_ops: Maximum number of operations per transaction
+        :param stop_on_error: If True, no other transaction is started after a rolled back one
+        :return: WriteBatch object
+        """
+        from .batch import WriteBatch
+        return WriteBatch(self.polarion_access, max_ops, stop_on_error)
+
+    def create_session_pool(self, username: str, password: str, size: int = 4):
+        """
+        Method used to create a pool of sessions on the server of the singleton, for multi-threaded workers (each
+        thread checks out its own session, see SessionPool). The singleton keeps its own session.
+        :param username: Login of the sessions
+        :param password: Password of the sessions
+        :param size: Maximum number of sessions
+        :return: SessionPool object
+        """
+        from .session_pool import SessionPool
+        access_options = dict(self._access_options)
+        # Each session of the pool is its own one
+        access_options.pop('session_store', None)
+        access_options.setdefault('wsdl_cache', self._polarion_access.wsdl_cache)
+        return SessionPool(self._server, username, password, size, **access_options)
+
+    def ingest_test_results(self, source: str, test_run_uri, executed_by_uri: str, checkpoint_path: str = None,
+                            chunk_size: int = 200, max_workers: int = 4):
+        """
+        Method used to publish the results of a JUnit/xUnit report as test records of the project test cases, the
+        test cases being found from the workitem IDs written in the testcase names (see TestResultsIngestion)
+        :param source: Path of the report
+        :param test_run_uri: URI of the test run, or function returning the test run URI of a TestResult
+        :param executed_by_uri: URI of the user set as executor of the records
+        :param checkpoint_path: Path of the checkpoint used to resume an interrupted ingestion (None for no checkpoint)
+        :param chunk_size: Maximum number of records per executeTest call
+        :param max_workers: Maximum number of concurrent executeTest calls
+        :return: IngestionReport object
+        """
+        from .test_results import TestCaseResolver, TestResultsIngestion
+        resolver = TestCaseResolver(self.polarion_access, self.project_id)
+        ingestion = TestResultsIngestion(self.polarion_access, executed_by_uri, resolver, chunk_size, max_workers,
+                                         checkpoint_path)
+        return ingestion.ingest(source, test_run_uri)
@@ -1,9 +1,17 @@
-from web_services.tracker import TrackerWebService
-from web_services.project import ProjectWebService
-from web_services.test_management import TestManagementWebService
+from zeep import exceptions as zeep_exceptions
 
-from zeep import Client
-from zeep.plugins import HistoryPlugin
+from .web_services.capture import EnvelopeCapture
+from .web_services.liveness import SessionLiveness, is_session_fault
+from .web_services.metadata_cache import MetadataCache
+from .web_services.session import SessionWebService
+from .web_services.session_store import SessionStore
+from .web_services.single_flight import SingleFlight
+from .web_services.tracker import TrackerWebService
+from .web_services.project import ProjectWebService
+from .web_services.test_management import TestManagementWebService
+from .web_services.transport import PolarionTransport
+from .web_services.workitem_cache import WorkItemCache
+from .web_services.wsdl_cache import WsdlCache
 
 
 class PolarionAccess:
@@ -11,28 +19,212 @@ class PolarionAccess:
         Polarion
         Class used to open web service factory instance on Polarion
     """
-    def __init__(self, hostname):
-
+    def __init__(self, hostname, wsdl_cache: WsdlCache or None = None, session_idle_window: float = 300.0,
+                 workitem_cache: WorkItemCache or None = None, coalesce_reads: bool = True,
+                 envelope_capture: EnvelopeCapture or None = None, session_store: SessionStore or None = None,
+                 **transport_options):
+        """
+        Class init
+        :param hostname: Hostname of the Polarion server
+        :param wsdl_cache: Cache used to store the WSDL and XSD documents (default: WsdlCache at its default location)
+        :param session_idle_window: Time (in seconds) without successful call after which the session is checked again
+        :param workitem_cache: Cache of the work items read through the tracker (disabled if None)
+        :param coalesce_reads: If True, concurrent identical reads (work item, document, custom field, test run) share
+                               one request (see SingleFlight)
+        :param envelope_capture: Recorder of the last SOAP envelopes of the tracker, project and test management
+                                 services, for debugging (disabled if None)
+        :param session_store: Store of the session IDs shared by the processes of the host: a valid stored session is
+                              reused instead of logging in (disabled if None, see FileSessionStore and
+                              BrokerSessionStore)
+        :param transport_options: Options of the HTTP transport (see PolarionTransport: pool_maxsize,
+                                  operation_timeout, operation_timeouts, compress_requests, instrumentation...)
+        """
         self._hostname = hostname
+        self._credentials = None
+        self._liveness = SessionLiveness(session_idle_window)
+        self._metadata = MetadataCache()
+        self._single_flight = SingleFlight() if coalesce_reads else None
+        self._session_store = session_store
+        # True if the current session comes from (or has been saved to) the session store
+        self._session_shared = False
+        self._transaction_open = False
 
         temp_wsdl_prefix_address = 'http://%s/polarion/ws/services/' % hostname
 
-        self._session_header_element = None
-        self._history = HistoryPlugin()
-        self._session = Client(wsdl=temp_wsdl_prefix_address + 'SessionWebService?wsdl', plugins=[self._history])
+        # One transport (and so one WSDL cache) is shared by all the web service clients
+        self._wsdl_cache = wsdl_cache if wsdl_cache is not None else WsdlCache()
+        self._transport = PolarionTransport(cache=self._wsdl_cache, **transport_options)
+
+        self._session = SessionWebService(self, temp_wsdl_prefix_address, self._transport)
+        self._tracker = TrackerWebService(self, temp_wsdl_prefix_address, self._transport, workitem_cache)
+        self._project = ProjectWebService(self, temp_wsdl_prefix_address, self._transport)
+        self._test_management = TestManagementWebService(self, temp_wsdl_prefix_address, self._transport)
 
-        self._tracker = TrackerWebService(self, temp_wsdl_prefix_address)
-        self._project = ProjectWebService(self, temp_wsdl_prefix_address)
-        self._test_management = TestManagementWebService(self, temp_wsdl_prefix_address)
+        self._envelope_capture = envelope_capture
+        if envelope_capture is not None:
+            # Not on the session client: the logIn request holds the password
+            for client in (self._tracker.client, self._project.client, self._test_management.client):
+                client.plugins.append(envelope_capture)
 
     def log_in(self, login, password):
-        self._session.service.logIn(login, password)
-        root_tree = self._history.last_received['envelope'].getroottree()
-        self._session_header_element = root_tree.find('.//{http://ws.polarion.com/session}sessionID')
+        if self._session_store is None:
+            self._session.log_in(login, password)
+        else:
+            key = self._session_key(login)
+            with self._session_store.lock(key):
+                session_id = self._session_store.load(key)
+                if session_id is None or session_id == self._session.session_id \
+                        or not self._session.use_session(session_id):
+                    self._session.log_in(login, password)
+                    self._session_store.save(key, self._session.session_id)
+            self._session_shared = True
+        self._use_current_session(login, password)
+
+    def _log_in_privately(self):
+        """
+        Protected method used to open a new session which is not shared through the session store
+        :return: -
+        """
+        if self._credentials is None:
+            raise RuntimeError("Polarion access has never been logged in")
+        self._session.log_in(*self._credentials)
+        self._session_shared = False
+        self._use_current_session(*self._credentials)
+
+    def _use_current_session(self, login, password):
+        """
+        Protected method used to send the calls of all the web services with the current session
+        :param login: Login of the session user
+        :param password: Password of the session user
+        :return: -
+        """
+        session_header_element = self._session.session_header_element
+
+        self._tracker.client.set_default_soapheaders([session_header_element])
+        self._project.client.set_default_soapheaders([session_header_element])
+        self._test_management.client.set_default_soapheaders([session_header_element])
+
+        # Keep credentials to be able to open a new session when the current one expires
+        self._credentials = (login, password)
+        self._liveness.renew()
+
+    def _session_key(self, login) -> str:
+        """
+        Protected method used to get the key of the sessions of a user in the session store
+        :param login: Login of the user
+        :return: Key of the sessions
+        """
+        return '%s@%s' % (login, self._hostname)
+
+    def connect(self):
+        """
+        Opens a new session using the credentials of the last log in
+        :return: -
+        """
+        if self._credentials is None:
+            raise RuntimeError("Polarion access has never been logged in")
+        self.log_in(*self._credentials)
+
+    def coalesce(self, key, function, *args):
+        """
+        Calls a read function, sharing the call with the concurrent calls of the same key when coalescing is enabled
+        :param key: Key identifying identical calls (i.e. tuple of the operation name and arguments)
+        :param function: Function to call
+        :return: Result of the function
+        """
+        if self._single_flight is None:
+            return function(*args)
+        return self._single_flight.do(key, function, *args)
+
+    def call_service(self, operation, *args, **kwargs):
+        """
+        Calls a web service operation. A successful call keeps the session alive, and a call failing because the
+        session is not valid anymore is retried once after a new log in (except inside an explicit transaction, which
+        is lost with its session).
+        :param operation: zeep operation to call
+        :return: Result of the operation
+        """
+        generation = self._liveness.generation
+        try:
+            result = operation(*args, **kwargs)
+        except zeep_exceptions.Fault as fault:
+            # Inside an explicit transaction, a retry on a new session would be committed outside of it
+            if self._credentials is None or self._transaction_open or not is_session_fault(fault):
+                raise
+            with self._liveness.lock:
+                # Another thread may already have opened a new session
+                if self._liveness.generation == generation:
+                    self.connect()
+            result = operation(*args, **kwargs)
+
+        self._liveness.touch()
+        return result
+
+    @property
+    def is_connected(self):
+        return self._session.session_header_element is not None
+
+    @property
+    def session_is_logged_in(self):
+        """
+        Checks if the session is still logged-in. The server is only asked (hasSubject) when no call succeeded during
+        the idle window.
+        :return: True if the session is logged-in, else False
+        """
+        if not self._liveness.is_stale:
+            return True
+
+        logged_in = self._session.has_subject()
+        if logged_in:
+            self._liveness.touch()
+        return logged_in
+
+    @property
+    def hostname(self):
+        return self._hostname
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    @property
+    def envelope_capture(self):
+        return self._envelope_capture
+
+    @property
+    def single_flight(self):
+        return self._single_flight
+
+    def refresh_metadata(self, kind=None, key=None):
+        """
+        Drops cached projects, users, enum options, type factories and work item URIs so that they are loaded again on
+        next access
+        :param kind: Kind of metadata to refresh (MetadataCache.PROJECT, USER, ENUM_CONTROL_KEY, TYPE_FACTORY or
+                     WORKITEM_URI), everything if None
+        :param key: Key of the metadata to refresh within its kind (i.e. a project ID), all if None
+        :return: -
+        """
+        self._metadata.refresh(kind, key)
+
+    @property
+    def liveness(self):
+        return self._liveness
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def instrumentation(self):
+        return self._transport.instrumentation
+
+    @property
+    def wsdl_cache(self):
+        return self._wsdl_cache
 
-        self._tracker.client.set_default_soapheaders([self._session_header_element])
-        self._project.client.set_default_soapheaders([self._session_header_element])
-        self._test_management.client.set_default_soapheaders([self._session_header_element])
+    @property
+    def session(self):
+        return self._session
 
     @property
     def tracker(self):
@@ -48,19 +240,37 @@ class PolarionAccess:
 
     def end_session(self):
         """
-        Terminates the current session
+        Terminates the current session. A session shared through the session store is terminated for all the processes
+        using it (they log in again on their next call) and removed from the store.
         :return: -
         """
-        self._session.service.endSession()
+        session_id = self._session.session_id
+        self._session.end_session()
+        self._liveness.expire()
+        if self._session_store is not None and self._credentials is not None:
+            self._session_store.discard(self._session_key(self._credentials[0]), session_id)
+
+    def close(self):
+        """
+        Closes the pooled HTTP connections
+        :return: -
+        """
+        self._transport.close()
 
     def begin_transaction(self):
         """
         Starts a explicit transaction for the current session. Usually transactions are started and committed for each
         call to the webservice, but if a transaction has been started explicitly it also has to be terminated using
         endTransaction.
+        A session shared through the session store is first replaced by a private session, otherwise the calls of the
+        other processes using it would be part of the transaction.
         :return: -
         """
-        self._session.service.beginTransaction()
+        if self._session_shared:
+            with self._liveness.lock:
+                self._log_in_privately()
+        self.call_service(self._session.begin_transaction)
+        self._transaction_open = True
 
     def end_transaction(self, rollback):
         """
@@ -68,4 +278,15 @@ class PolarionAccess:
         :param rollback: if true the transaction is rolled back otherwise it is  committed (boolean)
         :return: -
         """
-        self._session.service.endTransaction(rollback)
\ No newline at end of file
+        try:
+            self._session.end_transaction(rollback)
+        finally:
+            self._transaction_open = False
+
+    @property
+    def in_transaction(self) -> bool:
+        """
+        Checks if an explicit transaction has been started and not ended
+        :return: True if a transaction is open, else False
+        """
+        return self._transaction_open
@@ -0,0 +1,233 @@
+import logging
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+from requests import exceptions as requests_exceptions
+from zeep import exceptions as zeep_exceptions
+
+from .polarion import ComError, PoolTimeout
+from .polarion_access import PolarionAccess
+from .web_services.liveness import is_session_fault
+from .web_services.wsdl_cache import WsdlCache
+
+
+class SessionPool:
+    """
+    Class SessionPool
+    Pool of logged-in PolarionAccess instances, each one with its own session and web service clients. An access is
+    checked out by one thread at a time:
+        with pool.session() as polarion_access:
+            polarion_access.tracker.get_workitem_by_id(project_id, workitem_id)
+    Sessions are opened on demand up to the pool size, checked when they are checked out (and by check_health), and
+    logged in again when they have expired.
+    """
+
+    def __init__(self, hostname: str, username: str, password: str, size: int = 4, wsdl_cache: WsdlCache = None,
+                 **access_options):
+        """
+        Class init
+        :param hostname: Hostname of the Polarion server
+        :param username: Login of the sessions
+        :param password: Password of the sessions
+        :param size: Maximum number of sessions
+        :param wsdl_cache: Cache of the WSDL documents, shared by all the sessions (default: WsdlCache at its default
+                           location)
+        :param access_options: Options of the PolarionAccess instances (see PolarionAccess)
+        """
+        self._hostname = hostname
+        self._credentials = (username, password)
+        self._size = size
+        self._wsdl_cache = wsdl_cache if wsdl_cache is not None else WsdlCache()
+        self._access_options = access_options
+
+        self._idle = []
+        self._created = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._health_checks = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def stats(self) -> dict:
+        """
+        Property used to get the state of the pool
+        :return: Dictionary with size, created (open sessions), idle and in_use
+        """
+        with self._condition:
+            return {'size': self._size, 'created': self._created, 'idle': len(self._idle),
+                    'in_use': self._created - len(self._idle)}
+
+    def _open(self) -> PolarionAccess:
+        """
+        Protected method used to open a new session
+        :return: Logged-in Polarion access
+        """
+        polarion_access = PolarionAccess(self._hostname, wsdl_cache=self._wsdl_cache, **self._access_options)
+        polarion_access.log_in(*self._credentials)
+        return polarion_access
+
+    def acquire(self, timeout: float = None) -> PolarionAccess:
+        """
+        Method used to check out a session (to be given back with release)
+        :param timeout: Maximum time (in seconds) to wait for a free session, None to wait forever
+        :return: Logged-in Polarion access
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ComError("Session pool is closed")
+                if self._idle:
+                    polarion_access = self._idle.pop()
+                    break
+                if self._created < self._size:
+                    self._created += 1
+                    polarion_access = None
+                    break
+
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No Polarion session available after {timeout} s")
+                self._condition.wait(remaining)
+
+        try:
+            if polarion_access is None:
+                return self._open()
+            if not polarion_access.session_is_logged_in:
+                polarion_access.connect()
+            return polarion_access
+        except BaseException as exception:
+            # Whatever the failure, the slot reserved for the session is given back
+            self._discard(polarion_access)
+            if isinstance(exception, (requests_exceptions.ConnectionError, requests_exceptions.HTTPError,
+                                      zeep_exceptions.Fault)):
+                raise ComError(exception) from exception
+            raise
+
+    def release(self, polarion_access: PolarionAccess, discard: bool = False) -> None:
+        """
+        Method used to give back a checked out session
+        :param polarion_access: Polarion access returned by acquire
+        :param discard: If True, the session is closed instead of being reused (i.e. after a connection error)
+        :return: None
+        """
+        if discard or self._closed:
+            self._discard(polarion_access)
+            return
+        with self._condition:
+            self._idle.append(polarion_access)
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """
+        Context manager used to check out a session for the duration of a block. The session is discarded if the
+        block raises an HTTP error (connection error, timeout...) or a session fault, or leaves a transaction open.
+        :param timeout: Maximum time (in seconds) to wait for a free session, None to wait forever
+        :return: Logged-in Polarion access
+        """
+        polarion_access = self.acquire(timeout)
+        discard = False
+        try:
+            yield polarion_access
+        except (requests_exceptions.RequestException, zeep_exceptions.Fault) as exception:
+            discard = not isinstance(exception, zeep_exceptions.Fault) or is_session_fault(exception)
+            raise
+        finally:
+            self.release(polarion_access, discard or polarion_access.in_transaction)
+
+    def _discard(self, polarion_access: PolarionAccess or None) -> None:
+        """
+        Protected method used to close a session and free its slot in the pool
+        :param polarion_access: Polarion access to close (None if it could not be opened)
+        :return: None
+        """
+        if polarion_access is not None:
+            try:
+                polarion_access.close()
+            except requests_exceptions.RequestException:
+                pass
+        with self._condition:
+            self._created -= 1
+            self._condition.notify()
+
+    def check_health(self) -> int:
+        """
+        Method used to check the idle sessions on the server (hasSubject), logging in again the expired ones and
+        closing the ones which cannot be reopened
+        :return: Number of sessions logged in again or closed
+        """
+        with self._condition:
+            sessions = self._idle
+            self._idle = []
+
+        repaired = 0
+        try:
+            while sessions:
+                polarion_access = sessions.pop()
+                try:
+                    if not polarion_access.session.has_subject():
+                        repaired += 1
+                        polarion_access.connect()
+                    else:
+                        polarion_access.liveness.touch()
+                except Exception:
+                    repaired += 1
+                    self._discard(polarion_access)
+                    continue
+                except BaseException:
+                    self._discard(polarion_access)
+                    raise
+                self.release(polarion_access)
+        finally:
+            # Sessions not checked yet (i.e. interrupted check) are given back as they are
+            for polarion_access in sessions:
+                self.release(polarion_access)
+        return repaired
+
+    def start_health_checks(self, interval: float = 60.0) -> None:
+        """
+        Method used to check the idle sessions periodically from a background thread (stopped by close)
+        :param interval: Time (in seconds) between two checks
+        :return: None
+        """
+        if self._health_checks is not None:
+            return
+        stopped = threading.Event()
+
+        def run():
+            while not stopped.wait(interval):
+                try:
+                    self.check_health()
+                except Exception:
+                    logging.getLogger(__name__).exception("Polarion session pool health check failed")
+
+        self._health_checks = stopped
+        threading.Thread(target=run, name="polarion-pool-health", daemon=True).start()
+
+    def close(self) -> None:
+        """
+        Method used to end the idle sessions and close their connections. Sessions checked out are closed when they
+        are given back.
+        :return: None
+        """
+        if self._health_checks is not None:
+            self._health_checks.set()
+        with self._condition:
+            self._closed = True
+            sessions = self._idle
+            self._idle = []
+            self._condition.notify_all()
+
+        for polarion_access in sessions:
+            try:
+                polarion_access.end_session()
+            except (requests_exceptions.ConnectionError, zeep_exceptions.Fault):
+                pass
+            self._discard(polarion_access)
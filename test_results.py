@@ -0,0 +1,382 @@
+import html
+import itertools
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from lxml import etree
+
+# Default pattern of the workitem IDs found in test names, i.e. test_PRJ-123_login or PRJ-123: login
+DEFAULT_ID_PATTERN = r'(?<![A-Za-z0-9])[A-Z][A-Z0-9]*-\d+(?!\d)'
+
+
+class TestResult:
+    """
+    Class TestResult
+    Result of one testcase of a JUnit/xUnit report
+    """
+    __slots__ = ('name', 'classname', 'suite', 'outcome', 'duration', 'message', 'executed')
+
+    def __init__(self, name: str, classname: str, suite: str, outcome: str, duration: float, message: str or None,
+                 executed: datetime or None):
+        """
+        Class init
+        :param name: Name of the testcase
+        :param classname: Class name of the testcase
+        :param suite: Name of the test suite containing the testcase
+        :param outcome: passed, failure, error or skipped
+        :param duration: Duration of the testcase (in seconds)
+        :param message: Failure, error or skip message, or None
+        :param executed: Execution date time (timestamp of the test suite), or None
+        """
+        self.name = name
+        self.classname = classname
+        self.suite = suite
+        self.outcome = outcome
+        self.duration = duration
+        self.message = message
+        self.executed = executed
+
+    def __repr__(self):
+        return "TestResult(%s, %s)" % (self.name, self.outcome)
+
+
+def _parse_timestamp(timestamp: str or None) -> datetime or None:
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+
+
+def iter_junit_results(source):
+    """
+    Generator used to stream the testcases of a JUnit/xUnit XML report. The report is parsed incrementally and the
+    parsed elements are freed as it goes, so that the memory used does not depend on the size of the report.
+    :param source: Path or file object of the report
+    :return: Generator of TestResult objects, in report order
+    """
+    suites = []
+    for event, element in etree.iterparse(source, events=('start', 'end'), tag=('testsuite', 'testcase')):
+        if element.tag == 'testsuite':
+            if event == 'start':
+                suites.append((element.get('name', ''), _parse_timestamp(element.get('timestamp'))))
+            else:
+                suites.pop()
+                element.clear()
+            continue
+        if event == 'start':
+            continue
+
+        outcome = 'passed'
+        message = None
+        for child in element:
+            if child.tag in ('failure', 'error', 'skipped'):
+                outcome = 'failure' if child.tag == 'failure' else child.tag
+                message = "\n".join(part for part in (child.get('message'), child.text) if part) or None
+                break
+
+        suite, executed = suites[-1] if suites else ('', None)
+        try:
+            duration = float(element.get('time') or 0)
+        except ValueError:
+            duration = 0.0
+
+        yield TestResult(element.get('name', ''), element.get('classname', ''), suite, outcome, duration, message,
+                         executed)
+
+        # Free the testcase and the already processed siblings
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+class TestCaseResolver:
+    """
+    Class TestCaseResolver
+    Maps the testcases of a report to the URIs of Polarion test cases. The workitem ID is taken from an explicit
+    mapping or found in the testcase name (or class name); IDs are checked by chunks of id:(A OR B ...) queries and the
+    resulting URIs are cached.
+    """
+
+    def __init__(self, polarion_access, project_id: str, id_pattern: str = DEFAULT_ID_PATTERN,
+                 mapping: dict = None, chunk_size: int = 100):
+        """
+        Class init
+        :param polarion_access: PolarionAccess used to check the workitem IDs
+        :param project_id: ID of the project of the test cases
+        :param id_pattern: Regular expression of the workitem IDs found in the testcase names
+        :param mapping: Dictionary testcase name -> workitem ID, looked up before the pattern
+        :param chunk_size: Maximum number of IDs per query
+        """
+        self._polarion_access = polarion_access
+        self._project_id = project_id
+        self._id_pattern = re.compile(id_pattern)
+        self._mapping = mapping or {}
+        self._chunk_size = chunk_size
+        self._uris = {}
+
+    def workitem_id(self, result: TestResult) -> str or None:
+        """
+        Method used to get the workitem ID of a testcase
+        :param result: Testcase result
+        :return: Workitem ID, or None if it cannot be found
+        """
+        workitem_id = self._mapping.get(result.name)
+        if workitem_id is None:
+            match = self._id_pattern.search(result.name) or self._id_pattern.search(result.classname)
+            workitem_id = match.group(0) if match else None
+        return workitem_id
+
+    def resolve(self, results: [TestResult]) -> [str or None]:
+        """
+        Method used to get the URIs of the test cases of several testcases
+        :param results: Testcase results
+        :return: List of URIs (None for testcases which cannot be resolved), in input order
+        """
+        workitem_ids = [self.workitem_id(result) for result in results]
+        unknown_ids = list(dict.fromkeys(workitem_id for workitem_id in workitem_ids
+                                         if workitem_id is not None and workitem_id not in self._uris))
+
+        for start in range(0, len(unknown_ids), self._chunk_size):
+            chunk = unknown_ids[start:start + self._chunk_size]
+            found = self._polarion_access.tracker.query_workitems_by_ids(self._project_id, chunk, ['id'])
+            uris = {workitem.id: workitem.uri for workitem in found}
+            for workitem_id in chunk:
+                self._uris[workitem_id] = uris.get(workitem_id)
+
+        return [self._uris.get(workitem_id) if workitem_id is not None else None for workitem_id in workitem_ids]
+
+
+class IngestionReport:
+    """
+    Class IngestionReport
+    Outcome of a TestResultsIngestion
+    """
+
+    def __init__(self):
+        self.submitted = 0
+        self.skipped = 0
+        self.ignored = 0
+        self.unresolved = []
+        # Exception raised by the resolver, by testcase name
+        self.resolver_errors = {}
+        self.failed = {}
+
+    def __repr__(self):
+        return ("IngestionReport(submitted=%d, skipped=%d, ignored=%d, unresolved=%d, resolver errors=%d, "
+                "failed chunks=%d)" % (self.submitted, self.skipped, self.ignored, len(self.unresolved),
+                                       len(self.resolver_errors), len(self.failed)))
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Property used to know if all the testcases have been processed
+        :return: True if no chunk failed and every testcase could be resolved (or not) by the resolver, else False
+        """
+        return not self.failed and not self.resolver_errors
+
+
+class TestResultsIngestion:
+    """
+    Class TestResultsIngestion
+    Publishes the results of a JUnit/xUnit report as test records. The report is streamed, the records are grouped per
+    test run and sent by chunks (one executeTest call per chunk) by a bounded pool of threads.
+    With a checkpoint file, each processed testcase is saved with its test run (test run URI, class name, name and
+    occurrence of the name), so that running the same ingestion again after a failure only sends the testcases which
+    have not been submitted, even if they are grouped differently. The checkpoint is removed once every testcase has
+    been processed.
+    """
+    RESULT_IDS = {'passed': 'passed', 'failure': 'failed', 'error': 'failed', 'skipped': 'blocked'}
+
+    def __init__(self, polarion_access, executed_by_uri: str, resolver: TestCaseResolver, chunk_size: int = 200,
+                 max_workers: int = 4, checkpoint_path: str = None, result_ids: dict = None):
+        """
+        Class init
+        :param polarion_access: PolarionAccess used to send the records
+        :param executed_by_uri: URI of the user set as executor of the records
+        :param resolver: Resolver of the test case URIs
+        :param chunk_size: Maximum number of records per executeTest call
+        :param max_workers: Maximum number of concurrent executeTest calls
+        :param checkpoint_path: Path of the JSON checkpoint file (no checkpoint if None)
+        :param result_ids: Dictionary outcome (passed, failure, error, skipped) -> Polarion result ID, outcomes mapped
+                           to None are not published (default: RESULT_IDS)
+        """
+        self._polarion_access = polarion_access
+        self._executed_by_uri = executed_by_uri
+        self._resolver = resolver
+        self._chunk_size = chunk_size
+        self._max_workers = max_workers
+        self._checkpoint_path = checkpoint_path
+        self._result_ids = self.RESULT_IDS if result_ids is None else result_ids
+
+        self._lock = threading.Lock()
+        self._completed = set()
+        self._source = None
+
+    def ingest(self, source: str, test_run_uri) -> IngestionReport:
+        """
+        Method used to publish a report
+        :param source: Path of the JUnit/xUnit report
+        :param test_run_uri: URI of the test run, or function returning the test run URI of a TestResult (i.e. one
+                             test run per test suite)
+        :return: Ingestion report
+        """
+        report = IngestionReport()
+        self._source = os.path.abspath(source)
+        self._completed = self._load_checkpoint()
+        test_run_of = test_run_uri if callable(test_run_uri) else (lambda result: test_run_uri)
+
+        buffers = {}
+        occurrences = {}
+        chunk_indexes = itertools.count()
+        in_flight = threading.BoundedSemaphore(self._max_workers * 2)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="polarion-ingest") as executor:
+
+            def submit(run_uri, cases):
+                index = next(chunk_indexes)
+                records, keys = self._create_records(cases, report)
+                if not records:
+                    self._complete(keys)
+                    return
+
+                # Bound the number of chunks waiting for a worker, the report is read as fast as records are sent
+                in_flight.acquire()
+                future = executor.submit(self._execute_chunk, index, run_uri, records, keys, report)
+                future.add_done_callback(lambda unused_future: in_flight.release())
+
+            for result in iter_junit_results(source):
+                run_uri = test_run_of(result)
+                case = (run_uri, result.classname, result.name)
+                occurrences[case] = occurrences.get(case, -1) + 1
+                key = case + (occurrences[case],)
+                if key in self._completed:
+                    report.skipped += 1
+                    continue
+
+                buffer = buffers.setdefault(run_uri, [])
+                buffer.append((key, result))
+                if len(buffer) >= self._chunk_size:
+                    submit(run_uri, buffers.pop(run_uri))
+
+            for run_uri, buffer in buffers.items():
+                submit(run_uri, buffer)
+
+        if self._checkpoint_path and report.succeeded and os.path.exists(self._checkpoint_path):
+            os.remove(self._checkpoint_path)
+        return report
+
+    def _create_records(self, cases: [(tuple, TestResult)], report: IngestionReport) -> (list, [tuple]):
+        """
+        Protected method used to create the test records of a chunk of results
+        :param cases: Tuples (checkpoint key, testcase result)
+        :param report: Ingestion report updated with the ignored and unresolved testcases and the resolver errors
+        :return: Tuple (list of test records, checkpoint keys of the testcases processed once the records are sent)
+        """
+        test_management = self._polarion_access.test_management
+        keys = []
+        published = []
+        for key, result in cases:
+            if self._result_ids.get(result.outcome) is None:
+                report.ignored += 1
+                keys.append(key)
+            else:
+                published.append((key, result))
+
+        records = []
+        now = datetime.now(timezone.utc)
+        for (key, result), test_case_uri in zip(published, self._resolve(published, report)):
+            if test_case_uri is False:
+                # Resolver error: the testcase is processed again by the next run with the same checkpoint
+                continue
+            keys.append(key)
+            if test_case_uri is None:
+                report.unresolved.append(result.name)
+                continue
+            records.append(test_management.create_test_record(
+                test_case_uri, self._result_ids[result.outcome],
+                html.escape(result.message) if result.message else None,
+                self._executed_by_uri, result.executed or now, result.duration))
+        return records, keys
+
+    def _resolve(self, cases: [(tuple, TestResult)], report: IngestionReport) -> list:
+        """
+        Protected method used to resolve the test case URIs of a chunk of results. If the chunk cannot be resolved at
+        once, the testcases are resolved one by one and the error of each failed testcase is reported.
+        :param cases: Tuples (checkpoint key, testcase result)
+        :param report: Ingestion report updated with the resolver errors
+        :return: List of URIs (None for testcases which cannot be resolved, False for resolver errors), in input order
+        """
+        results = [result for key, result in cases]
+        try:
+            return self._resolver.resolve(results)
+        except Exception:
+            pass
+
+        test_case_uris = []
+        for result in results:
+            try:
+                test_case_uris.extend(self._resolver.resolve([result]))
+            except Exception as exception:
+                report.resolver_errors[result.name] = exception
+                test_case_uris.append(False)
+        return test_case_uris
+
+    def _execute_chunk(self, index: int, test_run_uri: str, records: list, keys: [tuple],
+                       report: IngestionReport) -> None:
+        """
+        Protected method used to send a chunk of records (called by the workers)
+        :param index: Index of the chunk
+        :param test_run_uri: URI of the test run
+        :param records: Test records
+        :param keys: Checkpoint keys of the testcases of the chunk
+        :param report: Ingestion report
+        :return: None
+        """
+        try:
+            self._polarion_access.test_management.execute_test(test_run_uri, records)
+        except Exception as exception:
+            # Any failure is reported: the chunk is sent again by the next run with the same checkpoint
+            with self._lock:
+                report.failed[index] = exception
+            return
+
+        with self._lock:
+            report.submitted += len(records)
+        self._complete(keys)
+
+    def _load_checkpoint(self) -> set:
+        """
+        Protected method used to read the testcases processed by a previous run
+        :return: Set of checkpoint keys (test run URI, class name, name, occurrence)
+        """
+        if not self._checkpoint_path or not os.path.exists(self._checkpoint_path):
+            return set()
+
+        with open(self._checkpoint_path, encoding='utf-8') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        if checkpoint.get('source') != self._source:
+            raise ValueError(f"Checkpoint {self._checkpoint_path} has been written for another ingestion "
+                             f"({checkpoint.get('source')})")
+        return set(tuple(key) for key in checkpoint.get('completed', []))
+
+    def _complete(self, keys: [tuple]) -> None:
+        """
+        Protected method used to record processed testcases in the checkpoint (written atomically)
+        :param keys: Checkpoint keys of the testcases
+        :return: None
+        """
+        with self._lock:
+            self._completed.update(keys)
+            if not self._checkpoint_path:
+                return
+
+            temporary_path = self._checkpoint_path + '.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as checkpoint_file:
+                json.dump({'source': self._source, 'completed': sorted(self._completed)}, checkpoint_file)
+            os.replace(temporary_path, self._checkpoint_path)
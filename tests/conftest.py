@@ -0,0 +1,68 @@
+"""
+Tests of the library against the local fake Polarion server (benchmarks/fake_server.py):
+    python -m pytest tests
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "polarion_py3"
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+def _load_package() -> None:
+    """
+    Function used to import the repository as the polarion_py3 package, whatever the name of its checkout folder
+    :return: None
+    """
+    if PACKAGE in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(PACKAGE, os.path.join(ROOT, "__init__.py"),
+                                                  submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
+
+
+_load_package()
+
+from fake_server import FakePolarionData, FakePolarionServer  # noqa: E402
+from polarion_py3 import Polarion, PolarionAccess  # noqa: E402
+from polarion_py3.web_services.wsdl_cache import WsdlCache  # noqa: E402
+
+USERNAME = "test"
+PASSWORD = "test"
+
+
+@pytest.fixture(scope="session")
+def wsdl_cache(tmp_path_factory):
+    return WsdlCache(str(tmp_path_factory.mktemp("wsdl") / "wsdl.sqlite"))
+
+
+@pytest.fixture
+def fake_server():
+    with FakePolarionServer(FakePolarionData(workitems=20)) as server:
+        yield server
+
+
+@pytest.fixture
+def polarion_access(fake_server, wsdl_cache):
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache)
+    access.log_in(USERNAME, PASSWORD)
+    yield access
+    access.close()
+
+
+@pytest.fixture
+def polarion(fake_server, wsdl_cache):
+    Polarion._Polarion__instance = None
+    project_id = fake_server.data.project_id
+    instance = Polarion(fake_server.hostname, project_id, project_id + "-", USERNAME, PASSWORD,
+                        wsdl_cache=wsdl_cache)
+    yield instance
+    instance.polarion_access.close()
+    Polarion._Polarion__instance = None
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from polarion_py3.aio import AsyncPolarionAccess
+from polarion_py3.polarion import InvalidWorkItem
+from polarion_py3.web_services.capture import EnvelopeCapture
+
+from conftest import PASSWORD, USERNAME
+
+
+def _run(fake_server, wsdl_cache, scenario, envelope_capture=None):
+    async def run():
+        async with AsyncPolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache,
+                                       envelope_capture=envelope_capture) as access:
+            await access.log_in(USERNAME, PASSWORD)
+            return await scenario(access.tracker)
+
+    return asyncio.run(run())
+
+
+def test_set_status_and_severity_send_partial_updates(fake_server, wsdl_cache):
+    capture = EnvelopeCapture()
+
+    async def scenario(tracker):
+        await tracker.set_status("PRJ", "PRJ-1", "done")
+        await tracker.set_severity("PRJ", "PRJ-1", "major")
+
+    _run(fake_server, wsdl_cache, scenario, capture)
+
+    # The URI is resolved once, the workitem is never read as a whole
+    assert fake_server.calls["getWorkItemByIdWithFields"] == 1
+    assert "getWorkItemById" not in fake_server.calls
+    assert fake_server.calls["updateWorkItem"] == 2
+    sent = capture.last_sent.content
+    assert b"major" in sent and b"description" not in sent and b"done" not in sent
+
+
+def test_generate_workitem_history_by_id(fake_server, wsdl_cache):
+    async def scenario(tracker):
+        return await tracker.generate_workitem_history_by_id("PRJ", "PRJ-1")
+
+    assert len(_run(fake_server, wsdl_cache, scenario)) == fake_server.data.history
+    assert fake_server.calls["generateHistory"] == 1
+
+
+def test_metadata_is_cached_per_session(fake_server, wsdl_cache):
+    async def scenario(tracker):
+        access = tracker._polarion_access
+        projects = [await access.project.get_project("PRJ") for _ in range(2)]
+        keys = [await tracker.get_enum_control_key("PRJ", "status") for _ in range(2)]
+        access.refresh_metadata()
+        await access.project.get_project("PRJ")
+        return projects, keys
+
+    projects, keys = _run(fake_server, wsdl_cache, scenario)
+
+    assert projects[0] is projects[1]
+    assert keys == ["status", "status"]
+    assert fake_server.calls["getProject"] == 2
+    assert fake_server.calls["getEnumControlKeyForId"] == 1
+
+
+def test_unknown_workitem_uri_is_not_cached(fake_server, wsdl_cache):
+    async def scenario(tracker):
+        for _ in range(2):
+            with pytest.raises(InvalidWorkItem):
+                await tracker.set_status("PRJ", "PRJ-999", "done")
+
+    _run(fake_server, wsdl_cache, scenario)
+
+    assert fake_server.calls["getWorkItemByIdWithFields"] == 2
+    assert "updateWorkItem" not in fake_server.calls
+
+
+def test_iter_workitems_matches_sync_pages(fake_server, wsdl_cache, polarion_access):
+    async def scenario(tracker):
+        return [workitem.uri async for workitem in tracker.iter_workitems("type:testcase", page_size=6)]
+
+    uris = _run(fake_server, wsdl_cache, scenario)
+
+    assert uris == [workitem.uri for workitem in polarion_access.tracker.iter_workitems("type:testcase", page_size=6)]
+    assert len(uris) == fake_server.data.workitems
@@ -0,0 +1,83 @@
+import pytest
+from zeep import exceptions as zeep_exceptions
+
+from polarion_py3.batch import WriteBatch
+from polarion_py3.polarion import TransactionRolledBack
+
+WORKITEM_URI = "subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1"
+
+
+def _fail():
+    raise TypeError("invalid operation")
+
+
+def test_batch_commits_chunks(fake_server, polarion_access):
+    with WriteBatch(polarion_access, max_ops=2) as batch:
+        for index in range(3):
+            batch.add_comment(WORKITEM_URI, "title", "comment %d" % index)
+
+    assert all(operation.succeeded for operation in batch.operations)
+    assert [operation for operation, session in fake_server.committed] == ["addComment"] * 3
+
+
+def test_batch_rolls_back_on_non_zeep_error(fake_server, polarion_access):
+    batch = WriteBatch(polarion_access)
+    first = batch.add_comment(WORKITEM_URI, "title", "comment")
+    failing = batch.queue("fail", _fail)
+    last = batch.add_comment(WORKITEM_URI, "title", "comment")
+    batch.flush()
+
+    assert isinstance(failing.error, TypeError)
+    assert isinstance(first.error, TransactionRolledBack)
+    assert isinstance(last.error, TransactionRolledBack)
+    assert batch.failed_operations == [first, failing, last]
+    assert not fake_server.in_transaction(polarion_access.session.session_id)
+    assert fake_server.committed == []
+
+
+def test_batch_reports_dropped_operations(fake_server, polarion_access):
+    with pytest.raises(ValueError):
+        with WriteBatch(polarion_access) as batch:
+            operation = batch.add_comment(WORKITEM_URI, "title", "comment")
+            raise ValueError("stop")
+
+    assert not operation.executed
+    assert isinstance(operation.error, TransactionRolledBack)
+    assert batch.failed_operations == [operation]
+    assert fake_server.committed == []
+
+
+def _fail_begin_once(monkeypatch, polarion_access):
+    begin_transaction = polarion_access.session.begin_transaction
+    calls = []
+
+    def fail_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise zeep_exceptions.Fault("Transaction could not be started")
+        return begin_transaction()
+
+    monkeypatch.setattr(polarion_access.session, "begin_transaction", fail_once)
+
+
+def test_batch_reports_chunk_when_transaction_cannot_start(fake_server, polarion_access, monkeypatch):
+    _fail_begin_once(monkeypatch, polarion_access)
+    batch = WriteBatch(polarion_access, max_ops=2)
+    operations = [batch.add_comment(WORKITEM_URI, "title", "comment %d" % index) for index in range(3)]
+    batch.flush()
+
+    assert all(isinstance(operation.error, zeep_exceptions.Fault) for operation in operations[:2])
+    assert operations[2].succeeded
+    assert batch.failed_operations == operations[:2]
+    assert [operation for operation, session in fake_server.committed] == ["addComment"]
+
+
+def test_batch_stops_after_transaction_cannot_start(fake_server, polarion_access, monkeypatch):
+    _fail_begin_once(monkeypatch, polarion_access)
+    batch = WriteBatch(polarion_access, max_ops=2, stop_on_error=True)
+    operations = [batch.add_comment(WORKITEM_URI, "title", "comment %d" % index) for index in range(3)]
+    batch.flush()
+
+    assert isinstance(operations[2].error, TransactionRolledBack)
+    assert batch.failed_operations == operations
+    assert fake_server.committed == []
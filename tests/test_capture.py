@@ -0,0 +1,45 @@
+from polarion_py3 import PolarionAccess
+from polarion_py3.web_services.capture import EnvelopeCapture
+
+from conftest import PASSWORD, USERNAME
+
+WORKITEM_URI = "subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1"
+
+
+def _open(fake_server, wsdl_cache, capture):
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, envelope_capture=capture)
+    access.log_in(USERNAME, PASSWORD)
+    return access
+
+
+def test_log_in_password_is_not_captured(fake_server, wsdl_cache):
+    capture = EnvelopeCapture()
+    access = _open(fake_server, wsdl_cache, capture)
+    try:
+        access.tracker.add_comment(WORKITEM_URI, "title", "comment")
+    finally:
+        access.close()
+
+    assert capture.entries
+    assert not any(b"logIn" in entry.content or entry.operation == "logIn" for entry in capture.entries)
+    assert capture.last_sent.operation == "addComment"
+
+
+def test_redacted_operation_is_not_serialized():
+    capture = EnvelopeCapture()
+    capture.egress(object(), {}, type("Operation", (), {"name": "logIn"})(), None)
+
+    assert capture.last_sent.content == b"<redacted/>"
+
+
+def test_envelope_is_truncated_to_max_bytes(fake_server, wsdl_cache):
+    capture = EnvelopeCapture(max_bytes=100)
+    access = _open(fake_server, wsdl_cache, capture)
+    try:
+        access.tracker.add_comment(WORKITEM_URI, "title", "x" * 1000)
+    finally:
+        access.close()
+
+    sent = capture.last_sent
+    assert len(sent.content) == 100
+    assert sent.truncated
@@ -0,0 +1,41 @@
+import sys
+from datetime import datetime
+
+from polarion_py3.objects.comment import CommentsTree
+from polarion_py3.objects.snapshot import CommentSnapshot, WorkitemSnapshot
+
+URI = "subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1"
+
+
+def _workitem(parents):
+    comments = tuple(CommentSnapshot(URI + "%%%d" % index, str(index), "title %d" % index, "text", datetime(2024, 1, 1),
+                                     "author", None if parent is None else URI + "%%%d" % parent)
+                     for index, parent in parents)
+    return WorkitemSnapshot(URI, "PRJ-1", "defect", "open", "major", "title", "author", "PRJ", None,
+                            datetime(2024, 1, 1), datetime(2024, 1, 1), (), (), comments)
+
+
+def test_discussions_are_walked_depth_first():
+    # 1 <- 2 <- 3, 1 <- 5 and 4 alone; answers may come before their parent
+    tree = CommentsTree(_workitem([(3, 2), (1, None), (2, 1), (4, None), (5, 1)]))
+
+    assert [comment.index for comment in tree.get_master_comments()] == ["1", "4"]
+    assert [(comment.index, level) for comment, level in tree.get_answers("1")] == [
+        ("1", 0), ("2", 1), ("3", 2), ("5", 1)]
+    assert [(comment.index, level) for comment, level in tree.walk()] == [
+        ("1", 0), ("2", 1), ("3", 2), ("5", 1), ("4", 0)]
+    assert tree["3"].parent is tree["2"]
+
+
+def test_deep_discussions_do_not_recurse():
+    depth = sys.getrecursionlimit() * 2
+    tree = CommentsTree(_workitem([(index, index - 1 if index else None) for index in range(depth)]))
+
+    levels = [level for comment, level in tree.iter_discussion("0")]
+    assert levels == list(range(depth))
+
+
+def test_self_referencing_comment_is_a_master_comment():
+    tree = CommentsTree(_workitem([(1, 1), (2, 1)]))
+
+    assert [(comment.index, level) for comment, level in tree.walk()] == [("1", 0), ("2", 1)]
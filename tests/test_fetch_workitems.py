@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+from requests import exceptions as requests_exceptions
+
+from polarion_py3.objects.workitem import PolarionWorkitem
+from polarion_py3.polarion import ComError, PolarionError
+
+
+class CaseWorkitem(PolarionWorkitem):
+    WORKITEM_TYPE = "testcase"
+
+
+def test_fetch_workitems_keeps_fields_projection(fake_server, polarion):
+    workitems, errors = polarion.fetch_workitems(["1", "3"], CaseWorkitem, fields=["title"])
+
+    assert errors == {}
+    assert [workitem.workitem.id for workitem in workitems] == ["PRJ-1", "PRJ-3"]
+    # The description has not been loaded with the projection: it is loaded on access
+    assert workitems[0].workitem.description is None
+    workitems[0].load_fields("description")
+    assert workitems[0].workitem.description is not None
+
+
+def test_fetch_workitems_reports_errors_per_item(fake_server, polarion, monkeypatch, caplog):
+    tracker = polarion.polarion_access.tracker
+
+    def timeout(*args):
+        raise requests_exceptions.ReadTimeout("read timed out")
+
+    monkeypatch.setattr(tracker, "query_workitems_by_ids", timeout)
+    monkeypatch.setattr(tracker, "get_workitem_by_id", lambda project_id, workitem_id: (
+        timeout() if workitem_id == "PRJ-3" else tracker.get_workitem_by_uri(
+            fake_server.data.workitem_uri(workitem_id))))
+
+    with caplog.at_level(logging.WARNING, logger="polarion_py3.polarion"):
+        workitems, errors = polarion.fetch_workitems(["PRJ-1", "PRJ-3"], CaseWorkitem)
+
+    assert workitems[0].workitem.id == "PRJ-1"
+    assert workitems[1] is None
+    assert isinstance(errors["PRJ-3"], ComError)
+    assert isinstance(errors["PRJ-3"].__cause__, requests_exceptions.ReadTimeout)
+    # The failed chunk query is logged before falling back to one request per workitem
+    assert [record.exc_info[0] for record in caplog.records] == [requests_exceptions.ReadTimeout]
+
+
+def test_fetch_workitems_reports_polarion_errors(fake_server, polarion):
+    workitems, errors = polarion.fetch_workitems(["1", "2", "PRJ-999"], CaseWorkitem)
+
+    # PRJ-2 is a defect, PRJ-999 does not exist
+    assert workitems[0].workitem.id == "PRJ-1" and workitems[1:] == [None, None]
+    assert set(errors) == {"2", "PRJ-999"}
+    assert all(isinstance(error, PolarionError) for error in errors.values())
+
+
+def test_fetch_workitems_does_not_hide_programming_errors(fake_server, polarion, monkeypatch):
+    def broken(*args):
+        raise TypeError("bad arguments")
+
+    monkeypatch.setattr(polarion.polarion_access.tracker, "query_workitems_by_ids", broken)
+    with pytest.raises(TypeError):
+        polarion.fetch_workitems(["1"], CaseWorkitem)
@@ -0,0 +1,101 @@
+import logging
+
+import pytest
+from zeep import exceptions as zeep_exceptions
+
+from polarion_py3 import PolarionAccess
+from polarion_py3.web_services.instrumentation import (CallRecord, InMemoryStats, Instrumentation, LoggingSink,
+                                                       OperationStats, SpanSink)
+
+from conftest import PASSWORD, USERNAME
+
+
+class _Span:
+    def __init__(self, spans, name, start_time, attributes):
+        self.spans = spans
+        self.name = name
+        self.start_time = start_time
+        self.attributes = attributes
+        self.end_time = None
+
+    def end(self, end_time):
+        self.end_time = end_time
+        self.spans.append(self)
+
+
+class _Tracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time, attributes):
+        return _Span(self.spans, name, start_time, attributes)
+
+
+@pytest.fixture
+def stats():
+    return InMemoryStats()
+
+
+@pytest.fixture
+def instrumented_access(fake_server, wsdl_cache, stats):
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, instrumentation=Instrumentation(stats))
+    access.log_in(USERNAME, PASSWORD)
+    yield access
+    access.close()
+
+
+def test_every_call_is_measured(fake_server, instrumented_access, stats):
+    tracker = instrumented_access.tracker
+    for index in range(3):
+        tracker.get_workitem_by_id("PRJ", fake_server.data.workitem_id(index))
+    tracker.query_workitems("type:testcase", raw=True)
+
+    measures = stats.to_dict()
+    assert measures["logIn"]["calls"] == 1
+    assert measures["getWorkItemById"]["calls"] == 3
+    assert measures["getWorkItemById"]["errors"] == 0
+    assert measures["getWorkItemById"]["request_bytes"] > 0 and measures["getWorkItemById"]["response_bytes"] > 0
+    # Raw calls go through the same transport
+    assert measures["queryWorkItems"]["calls"] == 1
+    assert sum(measures["getWorkItemById"]["histogram"].values()) == 3
+    assert stats.summary().splitlines()[0].split()[:2] == ["operation", "calls"]
+
+
+def test_faults_are_measured_as_errors(fake_server, instrumented_access, stats):
+    fake_server.expire_sessions()
+    instrumented_access.begin_transaction()
+    with pytest.raises(zeep_exceptions.Fault):
+        instrumented_access.tracker.add_comment(fake_server.data.workitem_uri("PRJ-1"), "title", "comment")
+
+    operation = stats.get("addComment")
+    assert operation.calls == 1 and operation.errors == 1
+
+
+def test_operation_stats_percentiles():
+    stats = OperationStats()
+    for duration in (0.001,) * 95 + (0.2,) * 4 + (100.0,):
+        stats.add(CallRecord("getWorkItemById", 0.0, duration, 10, 20, 200, None))
+
+    assert stats.percentile(0.5) == 0.005
+    assert stats.percentile(0.99) == 0.25
+    assert stats.percentile(1.0) == 100.0
+    assert stats.max_time == 100.0
+
+
+def test_sinks(caplog):
+    tracer = _Tracer()
+
+    def failing_sink(record):
+        raise RuntimeError("broken sink")
+
+    instrumentation = Instrumentation(failing_sink, LoggingSink(), SpanSink(tracer))
+    with caplog.at_level(logging.DEBUG, logger="polarion_py3.web_services.instrumentation"):
+        instrumentation.record(CallRecord("getProject", 1.0, 0.5, 10, None, 500, "HTTP 500: Not authorized."))
+
+    # The failing sink does not prevent the other ones from getting the record
+    assert [record.levelno for record in caplog.records] == [logging.ERROR, logging.WARNING]
+    assert "error: HTTP 500: Not authorized." in caplog.records[1].getMessage()
+    (span,) = tracer.spans
+    assert span.name == "polarion.getProject"
+    assert (span.start_time, span.end_time) == (1000000000, 1500000000)
+    assert span.attributes["error"] is True and "polarion.response_bytes" not in span.attributes
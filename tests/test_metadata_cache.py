@@ -0,0 +1,66 @@
+import pytest
+
+from polarion_py3.web_services.metadata_cache import MetadataCache
+
+
+def test_values_are_loaded_once():
+    cache = MetadataCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return object()
+
+    value = cache.get(MetadataCache.PROJECT, "PRJ", loader)
+
+    assert cache.get(MetadataCache.PROJECT, "PRJ", loader) is value
+    assert cache.get(MetadataCache.USER, "PRJ", loader) is not value
+    assert len(loads) == 2
+
+
+def test_failed_loads_are_not_cached():
+    cache = MetadataCache()
+
+    def failing_loader():
+        raise ValueError("not found")
+
+    with pytest.raises(ValueError):
+        cache.get(MetadataCache.PROJECT, "PRJ", failing_loader)
+    assert cache.get(MetadataCache.PROJECT, "PRJ", lambda: "project") == "project"
+
+
+def test_refresh():
+    cache = MetadataCache()
+    for kind, key in ((MetadataCache.PROJECT, "A"), (MetadataCache.PROJECT, "B"), (MetadataCache.USER, "A")):
+        cache.get(kind, key, lambda: 1)
+
+    cache.refresh(MetadataCache.PROJECT, "A")
+    assert cache.get(MetadataCache.PROJECT, "A", lambda: 2) == 2
+    assert cache.get(MetadataCache.PROJECT, "B", lambda: 2) == 1
+
+    cache.refresh(MetadataCache.PROJECT)
+    assert cache.get(MetadataCache.PROJECT, "B", lambda: 3) == 3
+    assert cache.get(MetadataCache.USER, "A", lambda: 3) == 1
+
+    cache.refresh()
+    assert cache.get(MetadataCache.USER, "A", lambda: 4) == 4
+
+
+def test_polarion_access_memoizes_metadata(fake_server, polarion_access):
+    for _ in range(3):
+        polarion_access.project.get_project("PRJ")
+        polarion_access.project.get_user("author1")
+        polarion_access.tracker.get_enum_control_key("PRJ", "status")
+        polarion_access.tracker.create_workitem("PRJ", "testcase", "title")
+
+    assert polarion_access.tracker.factory_create("ns2") is polarion_access.tracker.factory_create("ns2")
+    assert fake_server.calls["getProject"] == 1
+    assert fake_server.calls["getUser"] == 1
+    assert fake_server.calls["getEnumControlKeyForId"] == 1
+    assert fake_server.calls["createWorkItem"] == 3
+
+    polarion_access.refresh_metadata(MetadataCache.PROJECT)
+    polarion_access.project.get_project("PRJ")
+    polarion_access.project.get_user("author1")
+    assert fake_server.calls["getProject"] == 2
+    assert fake_server.calls["getUser"] == 1
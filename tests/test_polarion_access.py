@@ -0,0 +1,44 @@
+import pytest
+from zeep import exceptions as zeep_exceptions
+
+from polarion_py3.batch import WriteBatch
+from polarion_py3.polarion import TransactionRolledBack
+
+WORKITEM_URI = "subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1"
+
+
+def test_session_fault_is_retried_after_new_log_in(fake_server, polarion_access):
+    fake_server.expire_sessions()
+    polarion_access.tracker.add_comment(WORKITEM_URI, "title", "comment")
+
+    assert fake_server.calls["logIn"] == 2
+    assert [operation for operation, session in fake_server.committed] == ["addComment"]
+
+
+def test_session_fault_is_not_retried_in_transaction(fake_server, polarion_access):
+    polarion_access.begin_transaction()
+    fake_server.expire_sessions()
+    with pytest.raises(zeep_exceptions.Fault):
+        polarion_access.tracker.add_comment(WORKITEM_URI, "title", "comment")
+    with pytest.raises(zeep_exceptions.Fault):
+        polarion_access.end_transaction(True)
+
+    assert fake_server.calls["logIn"] == 1
+    assert fake_server.committed == []
+    assert not polarion_access.in_transaction
+
+    # Out of the transaction, the session is opened again
+    polarion_access.tracker.add_comment(WORKITEM_URI, "title", "comment")
+    assert fake_server.calls["logIn"] == 2
+
+
+def test_batch_chunk_is_not_partly_applied_on_session_fault(fake_server, polarion_access):
+    batch = WriteBatch(polarion_access)
+    first = batch.add_comment(WORKITEM_URI, "title", "comment")
+    batch.queue("expire", fake_server.expire_sessions)
+    last = batch.add_comment(WORKITEM_URI, "title", "comment")
+    batch.flush()
+
+    assert isinstance(first.error, TransactionRolledBack)
+    assert isinstance(last.error, zeep_exceptions.Fault)
+    assert fake_server.committed == []
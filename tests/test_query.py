@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pytest
+
+from polarion_py3.mirror.query import OfflineQueryEngine, QueryPlanner, parse_query
+from polarion_py3.mirror.store import MirrorStore
+from polarion_py3.objects.snapshot import WorkitemSnapshot
+from polarion_py3.polarion import UnsupportedQuery
+
+URI = "subterra:data-service:objects:/default/PRJ${WorkItem}%s"
+
+
+def _snapshot(workitem_id, workitem_type, status, title, updated, custom_fields=()):
+    return WorkitemSnapshot(URI % workitem_id, workitem_id, workitem_type, status, "major", title, "author", "PRJ",
+                            None, datetime(2024, 1, 1), updated, custom_fields, (), ())
+
+
+@pytest.fixture
+def store():
+    mirror = MirrorStore(":memory:")
+    mirror.upsert([
+        _snapshot("PRJ-1", "defect", "open", "100% done", datetime(2024, 1, 10), (("team", "core"),)),
+        _snapshot("PRJ-2", "defect", "closed", "1000 items", datetime(2024, 1, 20), (("team", "ui"),)),
+        _snapshot("PRJ-3", "testcase", "open", "foo_bar check", datetime(2024, 2, 1)),
+        _snapshot("PRJ-4", "testcase", "open", "fooXbar check", datetime(2024, 2, 5)),
+    ])
+    return mirror
+
+
+def _ids(engine, query, sort='id'):
+    return [uri.rsplit('}', 1)[-1] for uri in engine.query_uris(query, sort)]
+
+
+def test_parse_boolean_operators():
+    assert parse_query("type:defect AND NOT status:closed") == \
+        ('and', [('term', 'type', 'defect'), ('not', ('term', 'status', 'closed'))])
+    assert parse_query("type:(defect OR testcase) -status:open") == \
+        ('and', [('or', [('term', 'type', 'defect'), ('term', 'type', 'testcase')]),
+                 ('not', ('term', 'status', 'open'))])
+
+
+def test_parse_ranges_wildcards_and_phrases():
+    assert parse_query("updated:[20240101 TO 20240131}") == \
+        ('term', 'updated', ('range', '20240101', '20240131', True, False))
+    assert parse_query("id:PRJ-*") == ('term', 'id', 'PRJ-*')
+    assert parse_query('title:"foo bar"') == ('term', 'title', ('phrase', 'foo bar'))
+    with pytest.raises(UnsupportedQuery):
+        parse_query("title:foo~2")
+
+
+def test_planner_escapes_like_patterns():
+    planner = QueryPlanner(set())
+    assert planner.where(parse_query("title:100%")) == ("w.title LIKE ? ESCAPE '\\'", ['%100\\%%'])
+    assert planner.where(parse_query("title:foo*")) == ("w.title LIKE ? ESCAPE '\\'", ['%foo%'])
+    assert planner.where(parse_query("id:PRJ_*")) == ("w.id LIKE ? ESCAPE '\\'", ['PRJ\\_%'])
+
+
+def test_local_queries(store):
+    engine = OfflineQueryEngine(store)
+
+    assert _ids(engine, "type:defect AND NOT status:closed") == ["PRJ-1"]
+    assert _ids(engine, "status:closed OR type:testcase") == ["PRJ-2", "PRJ-3", "PRJ-4"]
+    assert _ids(engine, "updated:[20240101 TO 20240131]") == ["PRJ-1", "PRJ-2"]
+    assert _ids(engine, "title:100%") == ["PRJ-1"]
+    assert _ids(engine, "title:foo_bar") == ["PRJ-3"]
+    assert _ids(engine, 'title:"foo_bar check"') == ["PRJ-3"]
+    assert _ids(engine, "team:core") == ["PRJ-1"]
+    assert _ids(engine, "id:PRJ-*", "-id") == ["PRJ-4", "PRJ-3", "PRJ-2", "PRJ-1"]
+    assert engine.local_queries == 8
+    with pytest.raises(UnsupportedQuery):
+        engine.query_uris("type:defect AND unknown:value")
+
+
+class _Tracker:
+    def __init__(self, uris):
+        self.uris = uris
+        self.queries = []
+
+    def query_workitem_uris(self, query, sort='id'):
+        self.queries.append(query)
+        return self.uris
+
+
+class _Access:
+    def __init__(self, uris):
+        self.tracker = _Tracker(uris)
+
+
+def test_partial_fallback_sends_unsupported_terms(store):
+    access = _Access([URI % "PRJ-2", URI % "PRJ-3"])
+    engine = OfflineQueryEngine(store, access)
+
+    assert _ids(engine, "type:defect AND unknown:value") == ["PRJ-2"]
+    assert access.tracker.queries == ["unknown:value"]
+    assert engine.partial_fallbacks == 1
+
+
+def test_partial_fallback_never_sends_a_purely_negative_query(store):
+    access = _Access([URI % "PRJ-1"])
+    engine = OfflineQueryEngine(store, access)
+
+    assert _ids(engine, "type:defect AND NOT unknown:value") == ["PRJ-1"]
+    assert access.tracker.queries == ["type:defect AND NOT unknown:value"]
+
+
+def test_unsupported_query_is_run_by_the_server(store):
+    access = _Access([URI % "PRJ-4"])
+    engine = OfflineQueryEngine(store, access)
+
+    assert _ids(engine, "unknown:value OR type:defect") == ["PRJ-4"]
+    assert engine.fallbacks == 1
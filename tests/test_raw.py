@@ -0,0 +1,56 @@
+import pytest
+from lxml import etree
+from zeep import exceptions as zeep_exceptions
+
+from polarion_py3.objects.snapshot import WorkitemSnapshot
+from polarion_py3.web_services.raw import element_to_dict
+
+FIELDS = ['id', 'type', 'status', 'title', 'author', 'description', 'created', 'updated', 'customFields',
+          'linkedWorkItems', 'comments']
+
+
+def test_raw_query_matches_zeep_query(fake_server, polarion_access):
+    tracker = polarion_access.tracker
+    workitems = tracker.query_workitems("type:testcase", fields=FIELDS)
+    snapshots = tracker.query_workitems("type:testcase", fields=FIELDS, raw=True)
+
+    assert len(snapshots) == len(workitems) == 20
+    for workitem, snapshot in zip(workitems, snapshots):
+        expected = WorkitemSnapshot.from_zeep(workitem)
+        assert {slot: getattr(snapshot, slot) for slot in WorkitemSnapshot.__slots__} == {
+            slot: getattr(expected, slot) for slot in WorkitemSnapshot.__slots__}
+
+
+def test_raw_history_is_converted_to_plain_values(fake_server, polarion_access):
+    history = polarion_access.tracker.generate_workitem_history_by_id("PRJ", "PRJ-1", raw=True)
+
+    assert len(history) == fake_server.data.history
+    assert history[1]["revision"] == "1"
+    assert history[1]["diffs"] == [{"after": "2", "before": "1", "fieldName": "status"}]
+
+
+def test_raw_call_logs_in_again_after_session_fault(fake_server, polarion_access):
+    fake_server.expire_sessions()
+
+    assert len(polarion_access.tracker.query_workitems("type:testcase", raw=True)) == 20
+    assert fake_server.calls["logIn"] == 2
+
+
+def test_raw_call_raises_faults(fake_server, polarion_access, monkeypatch):
+    def failing_query(arguments):
+        raise LookupError("Invalid query")
+
+    monkeypatch.setattr(fake_server, "_queryWorkItems", failing_query)
+
+    with pytest.raises(zeep_exceptions.Fault, match="Invalid query"):
+        polarion_access.tracker.query_workitems("type:testcase", raw=True)
+
+
+def test_element_to_dict():
+    element = etree.fromstring(
+        '<Module xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" uri="m"><id>doc</id><title xsi:nil="true"/>'
+        '<status id="open"/><homePageContent><Text>a</Text><Text>b</Text></homePageContent></Module>')
+
+    assert element_to_dict(element) == {"uri": "m", "id": "doc", "title": None, "status": {"id": "open",
+                                                                                          "value": None},
+                                        "homePageContent": ["a", "b"]}
@@ -0,0 +1,120 @@
+import os
+
+from requests import exceptions as requests_exceptions
+
+from polarion_py3 import test_results
+
+TEST_RUN_URI = "subterra:data-service:objects:/default/PRJ${TestRun}RUN"
+EXECUTED_BY_URI = "subterra:data-service:objects:/default/${User}test"
+
+
+def _write_report(path, workitem_ids, suites=("suite",)):
+    with open(path, "w", encoding="utf-8") as report:
+        report.write('<?xml version="1.0" encoding="UTF-8"?><testsuites>')
+        for suite in suites:
+            report.write('<testsuite name="%s">' % suite)
+            for workitem_id in workitem_ids:
+                report.write('<testcase classname="suite" name="test_%s" time="0.1"/>' % workitem_id)
+            report.write('</testsuite>')
+        report.write('</testsuites>')
+
+
+def _ingestion(fake_server, polarion_access, checkpoint, chunk_size=4):
+    resolver = test_results.TestCaseResolver(polarion_access, fake_server.data.project_id)
+    return test_results.TestResultsIngestion(polarion_access, EXECUTED_BY_URI, resolver, chunk_size=chunk_size,
+                                             max_workers=1, checkpoint_path=checkpoint)
+
+
+def test_failed_chunk_is_reported_and_checkpointed(fake_server, polarion_access, tmp_path, monkeypatch):
+    source = str(tmp_path / "junit.xml")
+    checkpoint = str(tmp_path / "checkpoint.json")
+    _write_report(source, ["PRJ-%d" % number for number in range(1, 11)])
+
+    execute_test = polarion_access.test_management.execute_test
+    sent = []
+
+    def flaky_execute_test(test_run_uri, records):
+        sent.append(len(records))
+        if len(sent) == 2:
+            raise requests_exceptions.ReadTimeout("read timed out")
+        execute_test(test_run_uri, records)
+
+    monkeypatch.setattr(polarion_access.test_management, "execute_test", flaky_execute_test)
+
+    def ingest():
+        return _ingestion(fake_server, polarion_access, checkpoint).ingest(source, TEST_RUN_URI)
+
+    report = ingest()
+    assert not report.succeeded
+    assert list(report.failed) == [1]
+    assert isinstance(report.failed[1], requests_exceptions.ReadTimeout)
+    assert report.submitted == 6
+    assert os.path.exists(checkpoint)
+
+    # The next run only sends the failed chunk
+    report = ingest()
+    assert report.succeeded
+    assert report.submitted == 4
+    assert report.skipped == 6
+    assert not os.path.exists(checkpoint)
+
+
+def test_checkpoint_is_kept_per_test_run(fake_server, polarion_access, tmp_path, monkeypatch):
+    source = str(tmp_path / "junit.xml")
+    checkpoint = str(tmp_path / "checkpoint.json")
+    # The same testcases are run in two suites, published in two test runs
+    _write_report(source, ["PRJ-%d" % number for number in range(1, 6)], suites=("first", "second"))
+
+    def test_run_of(result):
+        return TEST_RUN_URI + result.suite
+
+    execute_test = polarion_access.test_management.execute_test
+    sent = []
+
+    def failing_execute_test(test_run_uri, records):
+        if test_run_uri.endswith("second"):
+            raise requests_exceptions.ReadTimeout("read timed out")
+        sent.append((test_run_uri, len(records)))
+        execute_test(test_run_uri, records)
+
+    monkeypatch.setattr(polarion_access.test_management, "execute_test", failing_execute_test)
+    report = _ingestion(fake_server, polarion_access, checkpoint).ingest(source, test_run_of)
+    assert report.submitted == 5 and len(report.failed) == 2
+
+    # The next run (with other chunks) only sends the testcases of the failed test run
+    monkeypatch.setattr(polarion_access.test_management, "execute_test",
+                        lambda test_run_uri, records: sent.append((test_run_uri, len(records))))
+    report = _ingestion(fake_server, polarion_access, checkpoint, chunk_size=10).ingest(source, test_run_of)
+    assert report.succeeded
+    assert report.skipped == 5 and report.submitted == 5
+    assert sent[-1] == (TEST_RUN_URI + "second", 5)
+    assert not os.path.exists(checkpoint)
+
+
+def test_resolver_errors_are_reported_per_testcase(fake_server, polarion_access, tmp_path, monkeypatch):
+    source = str(tmp_path / "junit.xml")
+    checkpoint = str(tmp_path / "checkpoint.json")
+    _write_report(source, ["PRJ-%d" % number for number in range(1, 6)])
+
+    tracker = polarion_access.tracker
+    query_workitems_by_ids = tracker.query_workitems_by_ids
+
+    def failing_query(project_id, workitem_ids, fields=None):
+        if "PRJ-3" in workitem_ids:
+            raise requests_exceptions.ReadTimeout("read timed out")
+        return query_workitems_by_ids(project_id, workitem_ids, fields)
+
+    monkeypatch.setattr(tracker, "query_workitems_by_ids", failing_query)
+    report = _ingestion(fake_server, polarion_access, checkpoint).ingest(source, TEST_RUN_URI)
+
+    assert not report.succeeded
+    assert list(report.resolver_errors) == ["test_PRJ-3"]
+    assert isinstance(report.resolver_errors["test_PRJ-3"], requests_exceptions.ReadTimeout)
+    assert report.submitted == 4 and not report.failed
+    assert os.path.exists(checkpoint)
+
+    # The next run only sends the testcase which could not be resolved
+    monkeypatch.setattr(tracker, "query_workitems_by_ids", query_workitems_by_ids)
+    report = _ingestion(fake_server, polarion_access, checkpoint).ingest(source, TEST_RUN_URI)
+    assert report.succeeded
+    assert report.submitted == 1 and report.skipped == 4
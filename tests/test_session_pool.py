@@ -0,0 +1,58 @@
+import pytest
+from requests import exceptions as requests_exceptions
+
+from polarion_py3.polarion import PoolTimeout
+from polarion_py3.session_pool import SessionPool
+
+from conftest import PASSWORD, USERNAME
+
+
+@pytest.fixture
+def pool(fake_server, wsdl_cache):
+    with SessionPool(fake_server.hostname, USERNAME, PASSWORD, size=1, wsdl_cache=wsdl_cache) as session_pool:
+        yield session_pool
+
+
+def test_failed_open_gives_back_its_slot(pool, monkeypatch):
+    open_session = pool._open
+
+    def timeout():
+        raise requests_exceptions.ReadTimeout("read timed out")
+
+    monkeypatch.setattr(pool, "_open", timeout)
+    with pytest.raises(requests_exceptions.ReadTimeout):
+        pool.acquire(timeout=1)
+    assert pool.stats["created"] == 0
+
+    monkeypatch.setattr(pool, "_open", open_session)
+    polarion_access = pool.acquire(timeout=1)
+    assert pool.stats == {"size": 1, "created": 1, "idle": 0, "in_use": 1}
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.1)
+    pool.release(polarion_access)
+
+
+def test_session_is_discarded_after_timeout(pool):
+    with pytest.raises(requests_exceptions.ReadTimeout):
+        with pool.session(timeout=1):
+            raise requests_exceptions.ReadTimeout("read timed out")
+    assert pool.stats["created"] == 0
+
+    with pool.session(timeout=1) as polarion_access:
+        polarion_access.begin_transaction()
+    # A session left in a transaction is not reused
+    assert pool.stats["created"] == 0
+
+
+def test_health_check_discards_failing_sessions(pool, monkeypatch):
+    with pool.session(timeout=1) as polarion_access:
+        pass
+
+    def broken():
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(polarion_access.session, "has_subject", broken)
+    assert pool.check_health() == 1
+    assert pool.stats == {"size": 1, "created": 0, "idle": 0, "in_use": 0}
+    with pool.session(timeout=1):
+        pass
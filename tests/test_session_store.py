@@ -0,0 +1,36 @@
+import pytest
+
+from polarion_py3 import PolarionAccess
+from polarion_py3.web_services.session_store import FileSessionStore, SessionStore
+
+from conftest import PASSWORD, USERNAME
+
+WORKITEM_URI = "subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1"
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_transaction_uses_a_private_session(fake_server, wsdl_cache, tmp_path):
+    store = FileSessionStore(str(tmp_path / "sessions.json"))
+    first = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, session_store=store)
+    second = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, session_store=store)
+    try:
+        first.log_in(USERNAME, PASSWORD)
+        second.log_in(USERNAME, PASSWORD)
+        assert fake_server.calls["logIn"] == 1
+
+        first.begin_transaction()
+        assert fake_server.calls["logIn"] == 2
+        second.tracker.add_comment(WORKITEM_URI, "title", "committed")
+        first.tracker.add_comment(WORKITEM_URI, "title", "rolled back")
+        first.end_transaction(True)
+
+        # The stored session is still the shared one
+        assert store.load(first._session_key(USERNAME)) == second.session.session_id
+        assert [session for operation, session in fake_server.committed] == [second.session.session_id]
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,37 @@
+import threading
+
+from fake_server import FakePolarionData, FakePolarionServer
+from polarion_py3 import PolarionAccess
+
+from conftest import PASSWORD, USERNAME
+
+CALLERS = 4
+
+
+def test_concurrent_reads_share_one_request(wsdl_cache):
+    with FakePolarionServer(FakePolarionData(workitems=5), latency=0.3) as server:
+        access = PolarionAccess(server.hostname, wsdl_cache=wsdl_cache)
+        access.log_in(USERNAME, PASSWORD)
+        barrier = threading.Barrier(CALLERS)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(access.tracker.get_workitem_by_id("PRJ", "PRJ-1"))
+
+        threads = [threading.Thread(target=read) for unused in range(CALLERS)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            access.close()
+
+        assert server.calls["getWorkItemById"] == 1
+        assert access.single_flight.stats == {'calls': CALLERS, 'coalesced': CALLERS - 1, 'in_flight': 0}
+
+        # Each caller gets its own object
+        results[0].title = "changed by one caller"
+        assert all(result.title != "changed by one caller" for result in results[1:])
+        assert len({id(result) for result in results}) == CALLERS
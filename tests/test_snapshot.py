@@ -0,0 +1,33 @@
+from polarion_py3.mirror.store import MirrorStore
+from polarion_py3.objects.snapshot import CommentSnapshot, WorkitemSnapshot
+from lxml import etree
+
+ENUM_CUSTOM_FIELDS = {"single": "a", "multi": ["a", "b"]}
+
+
+def test_snapshot_unwraps_multi_enum_custom_fields(fake_server, polarion_access):
+    fake_server.data.enum_custom_fields = ENUM_CUSTOM_FIELDS
+    tracker = polarion_access.tracker
+    workitem = tracker.get_workitem_by_uri(fake_server.data.workitem_uri("PRJ-1"))
+    (raw_snapshot,) = tracker.query_workitems("id:PRJ-1", fields=["customFields"], raw=True)
+
+    for snapshot in (WorkitemSnapshot.from_zeep(workitem), raw_snapshot):
+        assert snapshot.get_custom_field_value("single") == "a"
+        assert snapshot.get_custom_field_value("multi") == ("a", "b")
+
+
+def test_mirror_stores_multi_enum_values(fake_server, polarion_access):
+    fake_server.data.enum_custom_fields = ENUM_CUSTOM_FIELDS
+    workitem = polarion_access.tracker.get_workitem_by_uri(fake_server.data.workitem_uri("PRJ-1"))
+    store = MirrorStore(":memory:")
+    store.upsert([WorkitemSnapshot.from_zeep(workitem)])
+
+    mirrored = store.get_workitem(workitem.uri)
+    assert mirrored.get_custom_field_value("multi") == ("a", "b")
+    assert mirrored.get_custom_field_value("single") == "a"
+
+
+def test_invalid_date_time_is_none():
+    comment = etree.fromstring('<Comment uri="c"><id>1</id><created>yesterday</created></Comment>')
+
+    assert CommentSnapshot.from_xml(comment).created is None
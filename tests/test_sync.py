@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from polarion_py3.mirror.store import MirrorStore
+from polarion_py3.mirror.sync import DeltaSync
+
+
+def _record_queries(tracker, monkeypatch):
+    queries = []
+    query_workitem_uris = tracker.query_workitem_uris
+
+    def recording_query_workitem_uris(query, sort='id'):
+        queries.append(query)
+        return query_workitem_uris(query, sort)
+
+    monkeypatch.setattr(tracker, "query_workitem_uris", recording_query_workitem_uris)
+    return queries
+
+
+def _mirrored_ids(store):
+    return {workitem_id for (workitem_id,) in store.execute("SELECT id FROM workitems")}
+
+
+def test_incremental_sync_moves_the_watermark(fake_server, polarion_access, monkeypatch):
+    queries = _record_queries(polarion_access.tracker, monkeypatch)
+    store = MirrorStore(":memory:")
+    delta_sync = DeltaSync(polarion_access, store, "PRJ", page_size=8)
+
+    report = delta_sync.sync()
+    assert report.since is None and report.pulled == 20
+    assert report.watermark == datetime(2024, 1, 20, 12, 0, 19)
+    assert store.get_watermark(delta_sync.scope) == report.watermark.isoformat()
+    assert queries[-1] == "project.id:PRJ"
+    assert store.get_workitem(fake_server.data.workitem_uri("PRJ-20")).title == "Work item 20"
+
+    # The next sync starts the day before the watermark and upserts the new work items
+    fake_server.data.workitems = 25
+    report = delta_sync.sync()
+    assert queries[-1] == "project.id:PRJ AND updated:[20240119 TO *]"
+    assert report.since == datetime(2024, 1, 20, 12, 0, 19)
+    assert report.watermark == datetime(2024, 1, 25, 12, 0, 24)
+    assert store.get_watermark(delta_sync.scope) == report.watermark.isoformat()
+    assert _mirrored_ids(store) == {fake_server.data.workitem_id(index) for index in range(25)}
+
+
+def test_full_sync_prunes_deleted_workitems(fake_server, polarion_access):
+    store = MirrorStore(":memory:")
+    DeltaSync(polarion_access, store, "PRJ").sync()
+
+    fake_server.data.workitems = 15
+    # An incremental sync cannot see the deleted work items
+    assert DeltaSync(polarion_access, store, "PRJ").sync().pruned == 0
+    assert len(_mirrored_ids(store)) == 20
+
+    # A restricted full sync does not know every work item of the project
+    assert DeltaSync(polarion_access, store, "PRJ", query="type:testcase").sync(full=True).pruned == 0
+
+    report = DeltaSync(polarion_access, store, "PRJ").sync(full=True)
+    assert report.since is None and report.pruned == 5
+    assert _mirrored_ids(store) == {fake_server.data.workitem_id(index) for index in range(15)}
+    assert store.get_workitem(fake_server.data.workitem_uri("PRJ-16")) is None
+
+
+def test_sync_mirrors_histories(fake_server, polarion_access):
+    store = MirrorStore(":memory:")
+    report = DeltaSync(polarion_access, store, "PRJ", page_size=8, with_history=True, history_workers=4).sync()
+
+    assert report.histories == 20
+    assert fake_server.calls["generateHistory"] == 20
+    ((count,),) = store.execute("SELECT COUNT(DISTINCT workitem_uri) FROM history")
+    assert count == 20
@@ -0,0 +1,39 @@
+from polarion_py3.objects.test_case import PolarionTestCase
+
+
+def test_test_steps_are_fetched_once(fake_server, polarion):
+    test_case = PolarionTestCase("1", "testcase")
+
+    assert test_case.nb_steps() == fake_server.data.test_steps
+    assert test_case.get_step_column_content(2, 1) == "Step 2 column 1"
+    assert test_case.get_steps_table().cell(2, 1) == "Step 2 column 1"
+    assert fake_server.calls["getTestSteps"] == 1
+
+
+def test_set_test_steps_invalidates_the_cache(fake_server, polarion):
+    test_case = PolarionTestCase("1", "testcase")
+    test_case.nb_steps()
+    test_case.set_test_steps([])
+    test_case.nb_steps()
+
+    assert fake_server.calls["setTestSteps"] == 1
+    assert fake_server.calls["getTestSteps"] == 2
+
+
+def test_get_test_steps_tables_reports_each_failure(fake_server, polarion_access, monkeypatch):
+    test_management = polarion_access.test_management
+    uris = [fake_server.data.workitem_uri(fake_server.data.workitem_id(index)) for index in range(4)]
+    get_test_steps = test_management.get_test_steps
+
+    def failing_get_test_steps(workitem_uri):
+        if workitem_uri == uris[1]:
+            raise ValueError("broken steps")
+        return get_test_steps(workitem_uri)
+
+    monkeypatch.setattr(test_management, "get_test_steps", failing_get_test_steps)
+    tables, errors = test_management.get_test_steps_tables(uris + uris[:2], max_workers=2)
+
+    assert list(tables) == [uris[0], uris[2], uris[3]]
+    assert all(len(table) == fake_server.data.test_steps for table in tables.values())
+    assert list(errors) == [uris[1]] and isinstance(errors[uris[1]], ValueError)
+    assert fake_server.calls["getTestSteps"] == 3
@@ -0,0 +1,88 @@
+import pytest
+
+from polarion_py3 import PolarionAccess
+from polarion_py3.polarion import InvalidWorkItem
+from polarion_py3.web_services.capture import EnvelopeCapture
+from polarion_py3.web_services.tracker import MAX_QUERY_CLAUSES, project_id_from_uri, workitem_page_queries
+
+from conftest import PASSWORD, USERNAME
+
+
+def test_project_id_from_uri(fake_server):
+    assert project_id_from_uri(fake_server.data.workitem_uri("PRJ-1")) == "PRJ"
+    assert project_id_from_uri("PRJ-1") is None
+
+
+def test_iter_workitems_scopes_pages_by_project(fake_server, polarion_access):
+    tracker = polarion_access.tracker
+    uris = [fake_server.data.workitem_uri(fake_server.data.workitem_id(index)) for index in range(20)]
+
+    list(tracker.iter_workitems("type:testcase", page_size=7))
+
+    assert fake_server.calls["queryWorkItems"] == 3
+    assert "getWorkItemByUriWithFields" not in fake_server.calls
+    assert [workitem.uri for workitem in tracker.iter_workitems("type:testcase", page_size=7)] == uris
+
+
+def test_iter_workitems_fetches_missed_workitems_by_uri(fake_server, polarion_access, monkeypatch):
+    tracker = polarion_access.tracker
+    query_workitems = tracker.service.queryWorkItems
+
+    def query_other_project(query, sort, fields):
+        # Same IDs in another project: none of the page URIs is returned
+        workitems = query_workitems(query, sort, fields)
+        for workitem in workitems:
+            workitem.uri = workitem.uri.replace("/PRJ$", "/OTHER$")
+        return workitems
+
+    monkeypatch.setattr(tracker.service, "queryWorkItems", query_other_project)
+    workitems = list(tracker.iter_workitems("type:testcase", page_size=5))
+
+    assert [workitem.uri for workitem in workitems] == [
+        fake_server.data.workitem_uri(fake_server.data.workitem_id(index)) for index in range(20)]
+    assert fake_server.calls["getWorkItemByUriWithFields"] == 20
+
+
+def test_iter_workitems_splits_large_pages(fake_server, polarion_access):
+    fake_server.data.workitems = MAX_QUERY_CLAUSES + 10
+    workitems = list(polarion_access.tracker.iter_workitems("type:testcase", page_size=5000))
+
+    # One page, whose ID query is split to stay under the Lucene clause limit
+    assert len(workitems) == MAX_QUERY_CLAUSES + 10
+    assert fake_server.calls["queryWorkItems"] == 2
+    assert "getWorkItemByUriWithFields" not in fake_server.calls
+
+
+def test_workitem_page_queries_are_bounded():
+    uris = ["subterra:data-service:objects:/default/%s${WorkItem}%s-%d" % (project, project, index)
+            for project in ("PRJ", "OTHER") for index in range(MAX_QUERY_CLAUSES + 1)]
+    queries = workitem_page_queries(uris)
+
+    assert [query.split(" AND ")[0] for query in queries] == ["project.id:PRJ"] * 2 + ["project.id:OTHER"] * 2
+    assert max(query.count(" OR ") + 1 for query in queries) == MAX_QUERY_CLAUSES
+    assert queries[1] == "project.id:PRJ AND id:(PRJ-%d)" % MAX_QUERY_CLAUSES
+
+
+def test_set_status_uses_the_uri_of_the_server(fake_server, wsdl_cache, monkeypatch):
+    monkeypatch.setattr(fake_server.data, "workitem_uri",
+                        lambda workitem_id: "subterra:data-service:objects:/projects/PRJ${WorkItem}" + workitem_id)
+    capture = EnvelopeCapture()
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, envelope_capture=capture)
+    access.log_in(USERNAME, PASSWORD)
+    try:
+        access.tracker.set_status("PRJ", "PRJ-1", "done")
+        access.tracker.set_severity("PRJ", "PRJ-1", "major")
+    finally:
+        access.close()
+
+    assert fake_server.calls["getWorkItemByIdWithFields"] == 1
+    assert b"objects:/projects/PRJ${WorkItem}PRJ-1" in capture.last_sent.content
+
+
+def test_unknown_workitem_uri_is_not_cached(fake_server, polarion_access):
+    for unused in range(2):
+        with pytest.raises(InvalidWorkItem):
+            polarion_access.tracker.set_status("PRJ", "PRJ-999", "done")
+
+    assert fake_server.calls["getWorkItemByIdWithFields"] == 2
+    assert "updateWorkItem" not in fake_server.calls
@@ -0,0 +1,64 @@
+from polarion_py3 import PolarionAccess
+
+from conftest import PASSWORD, USERNAME
+
+
+def _access(fake_server, wsdl_cache, **transport_options):
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, **transport_options)
+    access.log_in(USERNAME, PASSWORD)
+    return access
+
+
+def _record_posts(transport, monkeypatch):
+    posts = []
+    post = transport.session.post
+
+    def recording_post(address, data=None, headers=None, timeout=None, stream=False):
+        posts.append((data, headers, timeout))
+        return post(address, data=data, headers=headers, timeout=timeout, stream=stream)
+
+    monkeypatch.setattr(transport.session, "post", recording_post)
+    return posts
+
+
+def test_connections_are_pooled_and_kept_alive(fake_server, wsdl_cache):
+    access = _access(fake_server, wsdl_cache, pool_maxsize=3, pool_block=True)
+    try:
+        for index in range(5):
+            access.tracker.get_workitem_by_id("PRJ", fake_server.data.workitem_id(index))
+        adapter = access.transport.session.get_adapter("http://" + fake_server.hostname)
+        pools = [adapter.poolmanager.pools[key] for key in list(adapter.poolmanager.pools.keys())]
+    finally:
+        access.close()
+
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 3
+    assert adapter.poolmanager.connection_pool_kw["block"] is True
+    # Every sequential call goes through the same keep-alive connection
+    assert [pool.num_connections for pool in pools] == [1]
+    assert access.transport.session.headers["Accept-Encoding"] == "gzip, deflate"
+
+
+def test_operation_timeouts(fake_server, wsdl_cache, monkeypatch):
+    access = _access(fake_server, wsdl_cache, operation_timeout=30, operation_timeouts={"queryWorkItems": 600})
+    posts = _record_posts(access.transport, monkeypatch)
+    try:
+        access.tracker.query_workitems("type:testcase")
+        access.tracker.get_workitem_by_id("PRJ", "PRJ-1")
+    finally:
+        access.close()
+
+    assert [timeout for data, headers, timeout in posts] == [600, 30]
+
+
+def test_compressed_requests(fake_server, wsdl_cache, monkeypatch):
+    access = _access(fake_server, wsdl_cache, compress_requests=True)
+    posts = _record_posts(access.transport, monkeypatch)
+    try:
+        workitem = access.tracker.get_workitem_by_id("PRJ", "PRJ-1")
+    finally:
+        access.close()
+
+    assert workitem.id == "PRJ-1"
+    data, headers, timeout = posts[0]
+    assert headers["Content-Encoding"] == "gzip"
+    assert data[:2] == b"\x1f\x8b"
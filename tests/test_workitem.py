@@ -0,0 +1,54 @@
+from polarion_py3.objects.workitem import PolarionWorkitem
+
+ENUM_CUSTOM_FIELDS = {"field0": "duplicate", "single": "a", "multi": ["a", "b"], "empty": []}
+
+
+class CaseWorkitem(PolarionWorkitem):
+    WORKITEM_TYPE = "testcase"
+
+
+def test_custom_field_enum(fake_server, polarion):
+    fake_server.data.enum_custom_fields = ENUM_CUSTOM_FIELDS
+    workitem = CaseWorkitem("1")
+
+    assert workitem.get_custom_field_enum("single") == "a"
+    assert workitem.get_custom_field_enum("multi") == ["a", "b"]
+    assert workitem.get_custom_field_enum("empty") == []
+    assert workitem.get_custom_field_enum("missing") is None
+
+
+def test_custom_field_duplicate_key_keeps_first_value(fake_server, polarion):
+    fake_server.data.enum_custom_fields = ENUM_CUSTOM_FIELDS
+    workitem = CaseWorkitem("1")
+
+    assert workitem.get_custom_field_value("field0") == "value 0"
+    assert workitem.get_custom_field_values("field0", "field1") == {"field0": "value 0", "field1": "value 1"}
+
+
+def test_projection_loads_other_fields_on_first_access(fake_server, polarion):
+    workitem = CaseWorkitem("1", fields=["title"])
+
+    assert workitem.title == "Work item 1"
+    assert fake_server.calls["getWorkItemByIdWithFields"] == 1
+    assert "getWorkItemById" not in fake_server.calls
+    assert "getWorkItemByUriWithFields" not in fake_server.calls
+
+    # Several fields are prefetched in one request, then read without any other request
+    workitem.load_fields("description", "customFields", "title")
+    assert workitem.description is not None
+    assert workitem.get_custom_field_value("field1") == "value 1"
+    assert fake_server.calls["getWorkItemByUriWithFields"] == 1
+
+    assert workitem.status == "open"
+    assert fake_server.calls["getWorkItemByUriWithFields"] == 2
+
+
+def test_comments_tree_is_built_on_first_access(fake_server, polarion):
+    workitem = CaseWorkitem("1")
+    assert workitem._comments is None
+
+    comments = workitem.comments
+    assert comments is workitem.comments
+    assert len(list(comments.walk())) == fake_server.data.comments
+    assert fake_server.calls["getWorkItemById"] == 1
+    assert "getWorkItemByUriWithFields" not in fake_server.calls
@@ -0,0 +1,53 @@
+import pytest
+
+from polarion_py3 import PolarionAccess
+from polarion_py3.web_services.workitem_cache import WorkItemCache
+
+from conftest import PASSWORD, USERNAME
+
+
+@pytest.fixture
+def cached_access(fake_server, wsdl_cache):
+    access = PolarionAccess(fake_server.hostname, wsdl_cache=wsdl_cache, workitem_cache=WorkItemCache())
+    access.log_in(USERNAME, PASSWORD)
+    yield access
+    access.close()
+
+
+def test_cached_workitems_are_copies(fake_server, cached_access):
+    tracker = cached_access.tracker
+    uri = fake_server.data.workitem_uri("PRJ-1")
+    workitem = tracker.get_workitem_by_uri(uri)
+    workitem.title = "changed by the caller"
+
+    cached = tracker.get_workitem_by_uri(uri)
+    assert cached.title != "changed by the caller"
+    cached.title = "changed again"
+    assert tracker.get_workitem_by_uri(uri).title != "changed again"
+    assert fake_server.calls["getWorkItemByUri"] == 1
+
+
+def test_read_older_than_invalidation_is_not_cached(fake_server, cached_access):
+    tracker = cached_access.tracker
+    uri = fake_server.data.workitem_uri("PRJ-1")
+    stale = tracker.service.getWorkItemByUri(uri)
+
+    version = tracker.cache.version
+    tracker.cache.invalidate(uri)
+    tracker.cache.put(stale, version=version)
+
+    assert tracker.cache.get_by_uri(uri) is None
+
+
+def test_update_patches_cache_out_of_transaction_only(fake_server, cached_access):
+    tracker = cached_access.tracker
+    uri = fake_server.data.workitem_uri("PRJ-1")
+    tracker.get_workitem_by_uri(uri)
+
+    tracker.update_workitem_fields(uri, status="done")
+    assert tracker.cache.get_by_uri(uri).status.id == "done"
+
+    cached_access.begin_transaction()
+    tracker.update_workitem_fields(uri, status="rejected")
+    assert tracker.cache.get_by_uri(uri) is None
+    cached_access.end_transaction(True)
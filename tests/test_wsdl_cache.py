@@ -0,0 +1,61 @@
+from polarion_py3 import PolarionAccess
+from polarion_py3.web_services.transport import PolarionTransport
+from polarion_py3.web_services.wsdl_cache import WsdlCache
+
+URL = "http://polarion.example.com/polarion/ws/services/TrackerWebService?wsdl"
+OTHER_URL = "http://other.example.com/polarion/ws/services/TrackerWebService?wsdl"
+
+
+def test_entries_are_kept_per_version(tmp_path):
+    path = str(tmp_path / "wsdl.sqlite")
+    cache = WsdlCache(path)
+    cache.add(URL, "<definitions/>")
+
+    assert cache.get(URL) == b"<definitions/>"
+    assert WsdlCache(path).get(URL) == b"<definitions/>"
+    assert WsdlCache(path, version="2").get(URL) is None
+
+    # Purging with another version removes the outdated entries
+    WsdlCache(path, version="2").purge()
+    assert cache.get(URL) is None
+
+
+def test_entries_expire_after_their_timeout(tmp_path):
+    path = str(tmp_path / "wsdl.sqlite")
+    WsdlCache(path).add(URL, b"<definitions/>")
+
+    assert WsdlCache(path, timeout=60).get(URL) == b"<definitions/>"
+    assert WsdlCache(path, timeout=-1).get(URL) is None
+
+
+def test_invalidate_removes_the_documents_of_a_server(tmp_path):
+    cache = WsdlCache(str(tmp_path / "wsdl.sqlite"))
+    cache.add(URL, b"<definitions/>")
+    cache.add(OTHER_URL, b"<definitions/>")
+
+    cache.invalidate("polarion.example.com")
+    assert cache.get(URL) is None
+    assert cache.get(OTHER_URL) == b"<definitions/>"
+
+    cache.invalidate()
+    assert cache.get(OTHER_URL) is None
+
+
+def test_warm_start_loads_no_wsdl_from_the_server(fake_server, tmp_path, monkeypatch):
+    loaded = []
+    load_remote_data = PolarionTransport._load_remote_data
+
+    def recording_load_remote_data(transport, url):
+        loaded.append(url)
+        return load_remote_data(transport, url)
+
+    monkeypatch.setattr(PolarionTransport, "_load_remote_data", recording_load_remote_data)
+    cache = WsdlCache(str(tmp_path / "wsdl.sqlite"))
+
+    PolarionAccess(fake_server.hostname, wsdl_cache=cache).close()
+    # One download per web service, the clients share the transport and its cache
+    assert len(loaded) == len(set(loaded)) == 4
+
+    loaded.clear()
+    PolarionAccess(fake_server.hostname, wsdl_cache=cache).close()
+    assert loaded == []
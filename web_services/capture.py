@@ -0,0 +1,146 @@
+import threading
+from collections import deque
+from time import time
+
+from lxml import etree
+from zeep import Plugin
+
+
+class CapturedEnvelope:
+    """
+    SOAP envelope recorded by EnvelopeCapture, kept as (possibly truncated) bytes instead of an XML tree
+    """
+    __slots__ = ('direction', 'operation', 'timestamp', 'content', 'truncated')
+
+    def __init__(self, direction: str, operation: str or None, timestamp: float, content: bytes, truncated: bool):
+        self.direction = direction
+        self.operation = operation
+        self.timestamp = timestamp
+        self.content = content
+        # True if the content has been cut to the size limit of the capture
+        self.truncated = truncated
+
+    def __repr__(self):
+        return "CapturedEnvelope(%s, %s, %d bytes%s)" % (self.direction, self.operation, len(self.content),
+                                                         ", truncated" if self.truncated else "")
+
+
+class _LimitReached(Exception):
+    """
+    Raised by _LimitedBuffer to stop the serialization of an envelope
+    """
+
+
+class _LimitedBuffer:
+    """
+    File-like object keeping the first bytes written to it, then stopping the writer
+    """
+
+    def __init__(self, max_bytes: int):
+        self.content = bytearray()
+        self.max_bytes = max_bytes
+
+    def write(self, data: bytes) -> None:
+        room = self.max_bytes - len(self.content)
+        self.content += data[:room]
+        if len(data) > room:
+            raise _LimitReached()
+
+
+class EnvelopeCapture(Plugin):
+    """
+    Class EnvelopeCapture
+    Opt-in zeep plugin recording the last SOAP envelopes sent and received, for debugging. Envelopes are serialized
+    when they are recorded and cut to max_bytes, and only the last max_entries ones are kept (ring buffer), so the
+    capture can stay enabled in long-running processes.
+    Envelopes of the raw calls (see RawService) are not recorded, and logIn requests (clear-text password) are
+    redacted.
+    """
+
+    SENT = 'sent'
+    RECEIVED = 'received'
+
+    # Operations whose envelopes hold credentials
+    REDACTED_OPERATIONS = frozenset(['logIn'])
+
+    def __init__(self, max_entries: int = 50, max_bytes: int = 64 * 1024):
+        """
+        Class init
+        :param max_entries: Maximum number of envelopes kept (the oldest ones are dropped first)
+        :param max_bytes: Maximum size of each recorded envelope, bigger envelopes are truncated
+        """
+        self.max_bytes = max_bytes
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def _record(self, direction: str, envelope, operation) -> None:
+        """
+        Protected method used to add an envelope to the buffer (serialized up to max_bytes only)
+        :param direction: SENT or RECEIVED
+        :param envelope: SOAP envelope (lxml element)
+        :param operation: zeep operation of the call
+        :return: None
+        """
+        operation_name = getattr(operation, 'name', None)
+        if operation_name in self.REDACTED_OPERATIONS:
+            content, truncated = b"<redacted/>", False
+        else:
+            buffer = _LimitedBuffer(self.max_bytes)
+            try:
+                etree.ElementTree(envelope).write(buffer)
+                truncated = False
+            except _LimitReached:
+                truncated = True
+            content = bytes(buffer.content)
+
+        entry = CapturedEnvelope(direction, operation_name, time(), content, truncated)
+        with self._lock:
+            self._entries.append(entry)
+
+    def egress(self, envelope, http_headers, operation, binding_options):
+        self._record(self.SENT, envelope, operation)
+        return envelope, http_headers
+
+    def ingress(self, envelope, http_headers, operation):
+        self._record(self.RECEIVED, envelope, operation)
+        return envelope, http_headers
+
+    @property
+    def entries(self) -> [CapturedEnvelope]:
+        """
+        Property used to get the recorded envelopes
+        :return: List of the recorded envelopes, oldest first
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def _last(self, direction: str) -> CapturedEnvelope or None:
+        with self._lock:
+            for entry in reversed(self._entries):
+                if entry.direction == direction:
+                    return entry
+        return None
+
+    @property
+    def last_sent(self) -> CapturedEnvelope or None:
+        """
+        Property used to get the last envelope sent
+        :return: Last envelope sent if any, else None
+        """
+        return self._last(self.SENT)
+
+    @property
+    def last_received(self) -> CapturedEnvelope or None:
+        """
+        Property used to get the last envelope received
+        :return: Last envelope received if any, else None
+        """
+        return self._last(self.RECEIVED)
+
+    def clear(self) -> None:
+        """
+        Method used to drop the recorded envelopes
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
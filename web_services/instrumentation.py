@@ -0,0 +1,242 @@
+import bisect
+import logging
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class CallRecord:
+    """
+    Measures of one web service call, as seen by the HTTP transport
+    """
+    __slots__ = ('operation', 'start', 'duration', 'request_bytes', 'response_bytes', 'status_code', 'error')
+
+    def __init__(self, operation: str or None, start: float, duration: float, request_bytes: int,
+                 response_bytes: int or None, status_code: int or None, error: str or None):
+        """
+        :param operation: Name of the operation (None for a request without SOAP operation)
+        :param start: Time (epoch, in seconds) the request was sent
+        :param duration: Time (in seconds) until the response headers were received and, unless streamed, its body
+        :param request_bytes: Size of the request envelope (before compression)
+        :param response_bytes: Size of the response body (None if streamed without Content-Length)
+        :param status_code: HTTP status of the response (None if no response)
+        :param error: Description of the failure (fault or connection error), None on success
+        """
+        self.operation = operation
+        self.start = start
+        self.duration = duration
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.status_code = status_code
+        self.error = error
+
+    def __repr__(self):
+        return "CallRecord(%s, %.3f s, %s)" % (self.operation, self.duration, self.error or self.status_code)
+
+
+class OperationStats:
+    """
+    Aggregated measures of the calls of one operation
+    """
+    __slots__ = ('calls', 'errors', 'total_time', 'max_time', 'request_bytes', 'response_bytes', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # Number of calls per latency bucket (upper bounds LATENCY_BUCKETS, then +inf)
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, record: CallRecord) -> None:
+        """
+        Method used to add the measures of a call
+        :param record: Measures of the call
+        :return: None
+        """
+        self.calls += 1
+        if record.error is not None:
+            self.errors += 1
+        self.total_time += record.duration
+        self.max_time = max(self.max_time, record.duration)
+        self.request_bytes += record.request_bytes
+        self.response_bytes += record.response_bytes or 0
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, record.duration)] += 1
+
+    @property
+    def mean_time(self) -> float:
+        """
+        Property used to get the mean latency of the calls
+        :return: Mean latency (in seconds)
+        """
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Method used to estimate a latency percentile from the histogram
+        :param fraction: Percentile as a fraction (i.e. 0.95)
+        :return: Upper bound (in seconds) of the bucket holding the percentile (max_time for the last bucket)
+        """
+        rank = fraction * self.calls
+        count = 0
+        for index, bucket_count in enumerate(self.histogram):
+            count += bucket_count
+            if count >= rank and bucket_count:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max_time
+        return self.max_time
+
+    def to_dict(self) -> dict:
+        """
+        Method used to export the measures
+        :return: Dictionary of the measures
+        """
+        return {'calls': self.calls, 'errors': self.errors, 'total_time': self.total_time,
+                'mean_time': self.mean_time, 'max_time': self.max_time, 'p95_time': self.percentile(0.95),
+                'request_bytes': self.request_bytes, 'response_bytes': self.response_bytes,
+                'histogram': dict(zip(LATENCY_BUCKETS + (float('inf'),), self.histogram))}
+
+
+class InMemoryStats:
+    """
+    Class InMemoryStats
+    Instrumentation sink aggregating the calls per operation
+    """
+
+    def __init__(self):
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record: CallRecord) -> None:
+        with self._lock:
+            stats = self._operations.get(record.operation)
+            if stats is None:
+                stats = self._operations[record.operation] = OperationStats()
+            stats.add(record)
+
+    def get(self, operation: str) -> OperationStats or None:
+        """
+        Method used to get the measures of an operation
+        :param operation: Name of the operation (i.e. 'getWorkItemById')
+        :return: Measures of the operation if called, else None
+        """
+        return self._operations.get(operation)
+
+    def to_dict(self) -> dict:
+        """
+        Method used to export the measures of all the operations
+        :return: Dictionary operation name -> measures (see OperationStats.to_dict)
+        """
+        with self._lock:
+            return {operation: stats.to_dict() for operation, stats in self._operations.items()}
+
+    def summary(self) -> str:
+        """
+        Method used to format the measures as a table, most time consuming operations first
+        :return: Table of the measures
+        """
+        lines = ["%-32s %8s %7s %10s %9s %9s %12s %12s" % ("operation", "calls", "errors", "total s", "mean ms",
+                                                             "p95 ms", "sent B", "received B")]
+        for operation, stats in sorted(self.to_dict().items(), key=lambda item: -item[1]['total_time']):
+            lines.append("%-32s %8d %7d %10.3f %9.1f %9.1f %12d %12d"
+                         % (operation, stats['calls'], stats['errors'], stats['total_time'],
+                            stats['mean_time'] * 1000, stats['p95_time'] * 1000, stats['request_bytes'],
+                            stats['response_bytes']))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Method used to drop the measures
+        :return: None
+        """
+        with self._lock:
+            self._operations.clear()
+
+
+class LoggingSink:
+    """
+    Class LoggingSink
+    Instrumentation sink logging one line per call (failed calls at WARNING level)
+    """
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG):
+        """
+        Class init
+        :param logger: Logger to use (default: logger of this module)
+        :param level: Level of the successful calls
+        """
+        self._logger = logger if logger is not None else logging.getLogger(__name__)
+        self._level = level
+
+    def __call__(self, record: CallRecord) -> None:
+        level = logging.WARNING if record.error is not None else self._level
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, "Polarion %s: %.1f ms, %d B sent, %s B received%s", record.operation,
+                             record.duration * 1000, record.request_bytes,
+                             "?" if record.response_bytes is None else record.response_bytes,
+                             "" if record.error is None else ", error: %s" % record.error)
+
+
+class SpanSink:
+    """
+    Class SpanSink
+    Instrumentation sink reporting each call as a span of an OpenTelemetry-style tracer, i.e.
+    opentelemetry.trace.get_tracer(__name__): tracer.start_span(name, start_time=..., attributes=...) then
+    span.end(end_time=...), times in nanoseconds. Spans are created after the call, so they are not parents of other
+    spans.
+    """
+
+    def __init__(self, tracer, prefix: str = "polarion."):
+        """
+        Class init
+        :param tracer: Tracer creating the spans
+        :param prefix: Prefix of the span names (followed by the operation name)
+        """
+        self._tracer = tracer
+        self._prefix = prefix
+
+    def __call__(self, record: CallRecord) -> None:
+        start = int(record.start * 1e9)
+        attributes = {'rpc.system': 'soap', 'rpc.method': record.operation or '',
+                      'polarion.request_bytes': record.request_bytes}
+        if record.response_bytes is not None:
+            attributes['polarion.response_bytes'] = record.response_bytes
+        if record.status_code is not None:
+            attributes['http.status_code'] = record.status_code
+        if record.error is not None:
+            attributes['error'] = True
+            attributes['polarion.error'] = record.error
+        span = self._tracer.start_span(self._prefix + (record.operation or 'request'), start_time=start,
+                                       attributes=attributes)
+        span.end(end_time=start + int(record.duration * 1e9))
+
+
+class Instrumentation:
+    """
+    Class Instrumentation
+    Measures the web service calls sent by a PolarionTransport (and so by all the clients of a PolarionAccess) and
+    forwards each CallRecord to its sinks, i.e.
+        stats = InMemoryStats()
+        PolarionAccess(hostname, instrumentation=Instrumentation(stats, LoggingSink()))
+    A sink is any callable taking a CallRecord. A failing sink is logged and does not fail the call.
+    """
+
+    def __init__(self, *sinks):
+        """
+        Class init
+        :param sinks: Sinks of the measures (InMemoryStats, LoggingSink, SpanSink or any callable)
+        """
+        self.sinks = list(sinks)
+
+    def record(self, record: CallRecord) -> None:
+        """
+        Method used to forward the measures of a call to the sinks
+        :param record: Measures of the call
+        :return: None
+        """
+        for sink in self.sinks:
+            try:
+                sink(record)
+            except Exception:
+                logging.getLogger(__name__).exception("Polarion instrumentation sink %r failed", sink)
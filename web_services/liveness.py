@@ -0,0 +1,117 @@
+import re
+import threading
+from time import monotonic
+
+from zeep import exceptions as zeep_exceptions
+
+# Fault messages returned by Polarion when the session header is missing, expired or unknown
+SESSION_FAULT_PATTERN = re.compile(r"not\s+authori[sz]ed|not\s+logged|authenticat|session\b.*\b(expired|invalid|not)",
+                                   re.IGNORECASE)
+
+
+def is_session_fault(exception: Exception) -> bool:
+    """
+    Function used to know if an exception has been raised because the Polarion session is not valid anymore
+    :param exception: Exception raised by a web service call
+    :return: True if the exception is a session fault, else False
+    """
+    if not isinstance(exception, zeep_exceptions.Fault):
+        return False
+    return bool(SESSION_FAULT_PATTERN.search(str(exception.message or "")))
+
+
+class SessionLiveness:
+    """
+    Class SessionLiveness
+    Keeps track of the last successful web service call, so that the session only has to be checked on the server
+    (hasSubject) after it stayed idle longer than the configured window.
+    """
+
+    def __init__(self, idle_window: float = 300.0):
+        """
+        Class init
+        :param idle_window: Time (in seconds) after which an idle session has to be checked again on the server
+        """
+        self._idle_window = idle_window
+        self._last_success = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def idle_window(self) -> float:
+        """
+        Property used to get the idle window
+        :return: Idle window in seconds
+        """
+        return self._idle_window
+
+    @property
+    def generation(self) -> int:
+        """
+        Property used to get the generation of the session, incremented each time a new session is opened
+        :return: Generation of the session
+        """
+        return self._generation
+
+    @property
+    def lock(self) -> threading.Lock:
+        """
+        Property used to get the lock to hold while opening a new session
+        :return: Session lock
+        """
+        return self._lock
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Property used to know if the session has to be checked on the server
+        :return: True if no call succeeded during the idle window, else False
+        """
+        return self._last_success is None or monotonic() - self._last_success > self._idle_window
+
+    def touch(self) -> None:
+        """
+        Method used to record a successful web service call
+        :return: None
+        """
+        self._last_success = monotonic()
+
+    def renew(self) -> None:
+        """
+        Method used to record that a new session has been opened
+        :return: None
+        """
+        self._generation += 1
+        self.touch()
+
+    def expire(self) -> None:
+        """
+        Method used to force a server check on the next liveness request
+        :return: None
+        """
+        self._last_success = None
+
+
+class GuardedService:
+    """
+    Class GuardedService
+    Proxy of a zeep service: every operation is called through PolarionAccess.call_service so that successful calls
+    keep the session alive and session faults trigger a new log in followed by a single retry.
+    """
+
+    def __init__(self, service, polarion_access):
+        """
+        Class init
+        :param service: zeep service proxy (client.service)
+        :param polarion_access: PolarionAccess instance owning the session
+        """
+        self._service = service
+        self._polarion_access = polarion_access
+
+    def __getattr__(self, operation_name):
+        operation = getattr(self._service, operation_name)
+
+        def call(*args, **kwargs):
+            return self._polarion_access.call_service(operation, *args, **kwargs)
+
+        return call
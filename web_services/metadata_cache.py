@@ -0,0 +1,69 @@
+import threading
+
+
+class MetadataCache:
+    """
+    Class MetadataCache
+    Cache of near-static Polarion data (projects, users, enum options, type factories, work item URIs). Each value is
+    loaded once per PolarionAccess and kept until it is explicitly refreshed.
+    """
+    PROJECT = 'project'
+    USER = 'user'
+    ENUM_CONTROL_KEY = 'enum_control_key'
+    TYPE_FACTORY = 'type_factory'
+    WORKITEM_URI = 'workitem_uri'
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, key, loader):
+        """
+        Method used to get a cached value, loading it on first access
+        :param kind: Kind of value (PROJECT, USER, ENUM_CONTROL_KEY, TYPE_FACTORY or WORKITEM_URI)
+        :param key: Key of the value within its kind
+        :param loader: Function called without argument to load the value when it is not cached
+        :return: Cached or loaded value
+        """
+        try:
+            return self._values[(kind, key)]
+        except KeyError:
+            pass
+
+        value = loader()
+        with self._lock:
+            return self._values.setdefault((kind, key), value)
+
+    async def get_async(self, kind: str, key, loader):
+        """
+        Method used to get a cached value, loading it on first access with a coroutine (see get)
+        :param kind: Kind of value (PROJECT, USER, ENUM_CONTROL_KEY, TYPE_FACTORY or WORKITEM_URI)
+        :param key: Key of the value within its kind
+        :param loader: Coroutine function called without argument to load the value when it is not cached
+        :return: Cached or loaded value
+        """
+        try:
+            return self._values[(kind, key)]
+        except KeyError:
+            pass
+
+        value = await loader()
+        with self._lock:
+            return self._values.setdefault((kind, key), value)
+
+    def refresh(self, kind: str = None, key=None) -> None:
+        """
+        Method used to drop cached values, so that they are loaded again on next access
+        :param kind: Kind of values to drop (all values if None)
+        :param key: Key of the value to drop within its kind (all values of the kind if None)
+        :return: None
+        """
+        with self._lock:
+            if kind is None:
+                self._values.clear()
+            elif key is not None:
+                self._values.pop((kind, key), None)
+            else:
+                for cached_kind, cached_key in list(self._values):
+                    if cached_kind == kind:
+                        del self._values[(cached_kind, cached_key)]
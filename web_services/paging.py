@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def iter_pages(fetch_page, prefetch: bool = False):
+    """
+    Function used to lazily iterate over the items of successive pages
+    :param fetch_page: Function called with the index of a page (0, 1, 2...) which returns a tuple
+                       (list of items of the page, True if there are more pages after this one)
+    :param prefetch: If True, the next page is fetched on a background thread while the current one is consumed
+    :return: Generator of items
+    """
+    if not prefetch:
+        index = 0
+        has_more = True
+        while has_more:
+            items, has_more = fetch_page(index)
+            index += 1
+            yield from items or []
+        return
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="polarion-prefetch") as executor:
+        future = executor.submit(fetch_page, 0)
+        index = 0
+        while future is not None:
+            items, has_more = future.result()
+            index += 1
+            future = executor.submit(fetch_page, index) if has_more else None
+            yield from items or []
@@ -1,5 +1,8 @@
 from zeep import Client
 
+from .liveness import GuardedService
+from .metadata_cache import MetadataCache
+
 
 class ProjectWebService:
     """
@@ -7,23 +10,25 @@ class ProjectWebService:
     This class gives access to ProjectWebService.wsdl description file
     """
 
-    def __init__(self, polarion_access, server_prefix, session_header_element):
+    def __init__(self, polarion_access, server_prefix, transport=None):
         self._polarion_access = polarion_access
-        self.client = Client(server_prefix + 'ProjectWebService?wsdl')
-        self.client.set_default_soapheaders([session_header_element])
+        self.client = Client(server_prefix + 'ProjectWebService?wsdl', transport=transport)
+        self.service = GuardedService(self.client.service, polarion_access)
 
     def get_project(self, project_id: str) -> object:
         """
         Method used to get project object using its ID
         :param project_id: the ID of the project to get
-        :return: Project as an object
+        :return: Project as an object (loaded once per session, see PolarionAccess.refresh_metadata)
         """
-        return self.client.service.getProject(project_id)
+        return self._polarion_access.metadata.get(MetadataCache.PROJECT, project_id,
+                                                  lambda: self.service.getProject(project_id))
 
     def get_user(self, user_id: str) -> object:
         """
         Method used to get user object using its ID
         :param user_id: the ID of the user to get
-        :return: User as an object
+        :return: User as an object (loaded once per session, see PolarionAccess.refresh_metadata)
         """
-        return self.client.service.getUser(user_id)
+        return self._polarion_access.metadata.get(MetadataCache.USER, user_id,
+                                                  lambda: self.service.getUser(user_id))
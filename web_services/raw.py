@@ -0,0 +1,127 @@
+from lxml import etree
+from zeep import exceptions as zeep_exceptions
+
+SOAP_FAULT_TAG = '{http://schemas.xmlsoap.org/soap/envelope/}Fault'
+XSI_NIL = '{http://www.w3.org/2001/XMLSchema-instance}nil'
+
+
+def local_name(element) -> str:
+    """
+    Function used to get the tag of an element without its namespace
+    :param element: lxml element
+    :return: Local name of the element
+    """
+    return element.tag.rsplit('}', 1)[-1]
+
+
+def element_to_dict(element):
+    """
+    Function used to convert a response element into plain Python values:
+        - leaf elements give their text (None if nil or empty),
+        - elements whose children are all named after a type (capitalized, i.e. <Comment>, <FieldDiff>) give lists,
+        - other elements give dictionaries of their attributes (i.e. uri) and children by local name.
+    :param element: lxml element
+    :return: Text, list or dictionary
+    """
+    children = list(element)
+    attributes = {name: value for name, value in element.attrib.items() if not name.startswith('{')}
+    if not children:
+        if element.get(XSI_NIL) == 'true':
+            return None
+        if attributes:
+            return dict(attributes, value=element.text)
+        return element.text
+
+    if not attributes and all(local_name(child)[:1].isupper() for child in children):
+        return [element_to_dict(child) for child in children]
+
+    for child in children:
+        attributes[local_name(child)] = element_to_dict(child)
+    return attributes
+
+
+def raise_fault(response) -> None:
+    """
+    Function used to raise the error of a failed raw call, as zeep would
+    :param response: HTTP response of the call (status other than 200)
+    :return: None
+    """
+    content = response.content
+    try:
+        fault = etree.fromstring(content).find('.//' + SOAP_FAULT_TAG)
+    except etree.XMLSyntaxError:
+        fault = None
+    if fault is None:
+        raise zeep_exceptions.TransportError(status_code=response.status_code, content=content)
+    raise zeep_exceptions.Fault(message=fault.findtext('faultstring'), code=fault.findtext('faultcode'),
+                                actor=fault.findtext('faultactor'), detail=fault.find('detail'))
+
+
+class RawService:
+    """
+    Class RawService
+    Calls the operations of a zeep client without zeep deserialization: the request is built by zeep as usual, the
+    response is parsed incrementally (lxml iterparse) and each returned item is converted as soon as it is complete,
+    then freed. Calls go through PolarionAccess.call_service, as the GuardedService ones.
+    """
+
+    def __init__(self, client, polarion_access):
+        """
+        Class init
+        :param client: zeep client of the web service
+        :param polarion_access: PolarionAccess instance owning the session
+        """
+        self._client = client
+        self._polarion_access = polarion_access
+
+    def _post(self, operation_name: str, *args):
+        """
+        Protected method used to send a request with the current session
+        :param operation_name: Name of the operation
+        :return: HTTP response, not read yet
+        """
+        binding = self._client.service._binding
+        session_header_element = self._polarion_access.session.session_header_element
+        envelope = self._client.create_message(self._client.service, operation_name, *args,
+                                               _soapheaders=[session_header_element])
+        headers = {'SOAPAction': '"%s"' % (binding.get(operation_name).soapaction or ''),
+                   'Content-Type': 'text/xml; charset=utf-8'}
+        response = self._client.transport.post_xml_stream(self._client.service._binding_options['address'], envelope,
+                                                          headers)
+        if response.status_code != 200:
+            try:
+                raise_fault(response)
+            finally:
+                response.close()
+        return response
+
+    def iter(self, operation_name: str, convert, *args):
+        """
+        Method used to call an operation and stream its returned items
+        :param operation_name: Name of the operation (i.e. 'queryWorkItems')
+        :param convert: Function called with each returned element (i.e. element_to_dict), the element is freed
+                        after the call
+        :return: generator of the converted items
+        """
+        response = self._polarion_access.call_service(self._post, operation_name, *args)
+        response.raw.decode_content = True
+        try:
+            for unused_event, element in etree.iterparse(response.raw, events=('end',),
+                                                         tag='{*}%sReturn' % operation_name):
+                item = convert(element)
+                # Free the parsed item and the previous ones
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+                yield item
+        finally:
+            response.close()
+
+    def call(self, operation_name: str, convert, *args) -> list:
+        """
+        Method used to call an operation and get all its returned items
+        :param operation_name: Name of the operation (i.e. 'queryWorkItems')
+        :param convert: Function called with each returned element (i.e. element_to_dict)
+        :return: List of the converted items
+        """
+        return list(self.iter(operation_name, convert, *args))
@@ -1,5 +1,36 @@
+from lxml import etree
 from zeep import Client
-from zeep.plugins import HistoryPlugin
+from zeep import exceptions as zeep_exceptions
+
+from .raw import raise_fault
+
+SESSION_ID_TAG = '{http://ws.polarion.com/session}sessionID'
+
+
+def make_session_header(session_id: str, attributes: dict = None):
+    """
+    Function used to build a sessionID SOAP header element, detached from any envelope
+    :param session_id: ID of the session
+    :param attributes: Attributes of the header element (i.e. soapenv:mustUnderstand)
+    :return: Header element (lxml element)
+    """
+    element = etree.Element(SESSION_ID_TAG, attrib=attributes)
+    element.text = session_id
+    return element
+
+
+def read_session_header(response):
+    """
+    Function used to get the session header of a raw logIn response (the response envelope is not kept)
+    :param response: HTTP response of logIn (requests or httpx)
+    :return: Header element (lxml element)
+    """
+    if response.status_code != 200:
+        raise_fault(response)
+    element = etree.fromstring(response.content).find('.//' + SESSION_ID_TAG)
+    if element is None or not element.text:
+        raise zeep_exceptions.Fault("No session ID in the logIn response")
+    return make_session_header(element.text.strip(), dict(element.attrib))
 
 
 class SessionWebService:
@@ -8,10 +39,9 @@ class SessionWebService:
     This class gives access to SessionWebService.wsdl description file
     """
 
-    def __init__(self, polarion_access, server_prefix):
-        self._history = HistoryPlugin()
+    def __init__(self, polarion_access, server_prefix, transport=None):
         self._polarion_access = polarion_access
-        self.client = Client(wsdl=server_prefix + 'SessionWebService?wsdl', plugins=[self._history])
+        self.client = Client(wsdl=server_prefix + 'SessionWebService?wsdl', transport=transport)
         self._session_header_element = None
 
     def log_in(self, username: str, password: str) -> None:
@@ -21,12 +51,31 @@ class SessionWebService:
         :param password: Password used to log in
         :return: None
         """
-        self.client.service.logIn(username, password)
+        # The session ID is sent in the response header, which zeep does not return
+        with self.client.settings(raw_response=True):
+            response = self.client.service.logIn(username, password)
 
-        root_tree = self._history.last_received['envelope'].getroottree()
+        self._session_header_element = read_session_header(response)
+        self.client.set_default_soapheaders([self._session_header_element])
 
-        self._session_header_element = root_tree.find('.//{http://ws.polarion.com/session}sessionID')
+    def use_session(self, session_id: str) -> bool:
+        """
+        Method used to resume an existing session (i.e. shared by another process) instead of logging in
+        :param session_id: ID of the session
+        :return: True if the session is logged-in, else False (the current session is then kept)
+        """
+        previous_header_element = self._session_header_element
+        self._session_header_element = make_session_header(session_id)
         self.client.set_default_soapheaders([self._session_header_element])
+        try:
+            if self.client.service.hasSubject():
+                return True
+        except zeep_exceptions.Fault:
+            pass
+
+        self._session_header_element = previous_header_element
+        self.client.set_default_soapheaders([previous_header_element] if previous_header_element is not None else [])
+        return False
 
     @property
     def session_header_element(self):
@@ -36,6 +85,16 @@ class SessionWebService:
         """
         return self._session_header_element
 
+    @property
+    def session_id(self) -> str or None:
+        """
+        Property used to get the ID of the current session
+        :return: Session ID if logged in, else None
+        """
+        if self._session_header_element is None:
+            return None
+        return self._session_header_element.text
+
     def end_session(self) -> None:
         """
         Method used to terminates the current session
@@ -0,0 +1,356 @@
+import abc
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from contextlib import contextmanager
+from time import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class SessionStore(abc.ABC):
+    """
+    Class SessionStore
+    Base class of the stores sharing Polarion session IDs between processes of one host. PolarionAccess holds the
+    lock of its key while it checks the stored session and logs in, so that concurrent processes wait for the first
+    log in and then reuse its session instead of all logging in at once.
+    Keys identify the server and the user (i.e. 'user@polarion.example.com'), passwords are never stored.
+    A shared session is shared with its state: ending it ends it for all the processes (they log in again on their
+    next call), and an explicit transaction would include the calls of all the processes, so PolarionAccess opens a
+    private session for its transactions.
+    """
+
+    @abc.abstractmethod
+    def lock(self, key: str):
+        """
+        Method used to hold the lock of a key across processes
+        :param key: Key of the session
+        :return: Context manager holding the lock
+        """
+
+    @abc.abstractmethod
+    def load(self, key: str) -> str or None:
+        """
+        Method used to get the stored session ID of a key
+        :param key: Key of the session
+        :return: Session ID if any, else None
+        """
+
+    @abc.abstractmethod
+    def save(self, key: str, session_id: str) -> None:
+        """
+        Method used to store the session ID of a key
+        :param key: Key of the session
+        :param session_id: ID of the session
+        :return: None
+        """
+
+    @abc.abstractmethod
+    def discard(self, key: str, session_id: str = None) -> None:
+        """
+        Method used to remove the session ID of a key (i.e. after the session has been ended)
+        :param key: Key of the session
+        :param session_id: Session ID to remove, nothing is removed if another session has been stored since
+                           (None to remove any session)
+        :return: None
+        """
+
+
+class FileSessionStore(SessionStore):
+    """
+    Class FileSessionStore
+    Session store kept in a JSON file readable by its owner only, locked with flock (no inter-process lock on
+    platforms without fcntl).
+    """
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "polarion", "sessions.json")
+
+    def __init__(self, path: str = None, max_age: float or None = None):
+        """
+        Class init
+        :param path: Path of the store file (default: ~/.cache/polarion/sessions.json)
+        :param max_age: Time (in seconds) after which a stored session is not reused anymore, None for no limit (the
+                        session is checked on the server before being reused anyway)
+        """
+        self._path = path or os.environ.get("POLARION_SESSION_STORE", self.DEFAULT_PATH)
+        self._max_age = max_age
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        """
+        Property used to get the path of the store file
+        :return: Path of the store file
+        """
+        return self._path
+
+    @contextmanager
+    def lock(self, key: str):
+        # One file lock for all the keys, re-entrant within the thread holding it (flock is not)
+        with self._lock:
+            if fcntl is None or self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            descriptor = os.open(self._path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+            finally:
+                os.close(descriptor)
+
+    def _read(self) -> dict:
+        """
+        Protected method used to read the store file
+        :return: Dictionary key -> {'session_id', 'saved'}
+        """
+        try:
+            with open(self._path, encoding="utf-8") as store_file:
+                sessions = json.load(store_file)
+        except (OSError, ValueError):
+            return {}
+        return sessions if isinstance(sessions, dict) else {}
+
+    def _write(self, sessions: dict) -> None:
+        """
+        Protected method used to replace the store file (atomically, readable by its owner only)
+        :param sessions: Dictionary key -> {'session_id', 'saved'}
+        :return: None
+        """
+        descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(self._path) or None, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as store_file:
+                json.dump(sessions, store_file)
+            os.replace(temp_path, self._path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def load(self, key: str) -> str or None:
+        entry = self._read().get(key)
+        if not isinstance(entry, dict):
+            return None
+        if self._max_age is not None and time() - entry.get("saved", 0) > self._max_age:
+            return None
+        return entry.get("session_id")
+
+    def save(self, key: str, session_id: str) -> None:
+        with self.lock(key):
+            sessions = self._read()
+            sessions[key] = {"session_id": session_id, "saved": time()}
+            self._write(sessions)
+
+    def discard(self, key: str, session_id: str = None) -> None:
+        with self.lock(key):
+            sessions = self._read()
+            entry = sessions.get(key)
+            if entry is None or (session_id is not None and entry.get("session_id") != session_id):
+                return
+            del sessions[key]
+            self._write(sessions)
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    """
+    Connection of a BrokerSessionStore: one JSON request per line, one JSON response per line. The locks taken by
+    a connection are released when it is closed.
+    """
+
+    def handle(self):
+        broker = self.server.broker
+        held = []
+        try:
+            for line in self.rfile:
+                request = json.loads(line)
+                key = request["key"]
+                response = {"ok": True}
+                if request["op"] == "lock":
+                    broker.key_lock(key).acquire()
+                    held.append(key)
+                elif request["op"] == "unlock":
+                    if key in held:
+                        held.remove(key)
+                        broker.key_lock(key).release()
+                elif request["op"] == "load":
+                    response["session_id"] = broker.sessions.get(key)
+                elif request["op"] == "save":
+                    broker.sessions[key] = request["session_id"]
+                elif request["op"] == "discard":
+                    if request.get("session_id") in (None, broker.sessions.get(key)):
+                        broker.sessions.pop(key, None)
+                else:
+                    response = {"ok": False, "error": "Unknown operation %s" % request["op"]}
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        finally:
+            for key in held:
+                broker.key_lock(key).release()
+
+
+class SessionBroker:
+    """
+    Class SessionBroker
+    Process sharing Polarion session IDs in memory with the BrokerSessionStore clients of the host, through a unix
+    socket (i.e. started once at the beginning of a CI pipeline):
+        python -m polarion_py3.web_services.session_store /tmp/polarion-sessions.sock
+    """
+
+    def __init__(self, socket_path: str):
+        """
+        Class init
+        :param socket_path: Path of the unix socket to listen on
+        """
+        self.socket_path = socket_path
+        self.sessions = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._server = None
+
+    def key_lock(self, key: str) -> threading.Lock:
+        """
+        Method used to get the lock of a key
+        :param key: Key of the session
+        :return: Lock of the key
+        """
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _bind(self) -> socketserver.ThreadingUnixStreamServer:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = socketserver.ThreadingUnixStreamServer(self.socket_path, _BrokerHandler)
+        server.daemon_threads = True
+        server.broker = self
+        os.chmod(self.socket_path, 0o600)
+        self._server = server
+        return server
+
+    def serve_forever(self) -> None:
+        """
+        Method used to run the broker in the current thread
+        :return: None
+        """
+        self._bind().serve_forever()
+
+    def start(self):
+        """
+        Method used to run the broker in a background thread
+        :return: The broker
+        """
+        server = self._bind()
+        threading.Thread(target=server.serve_forever, name="polarion-session-broker", daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        """
+        Method used to stop the broker and remove its socket
+        :return: None
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class BrokerSessionStore(SessionStore):
+    """
+    Class BrokerSessionStore
+    Session store client of a SessionBroker. The lock of a key is held by a dedicated connection, so it is released
+    by the broker if the process dies while logging in.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        """
+        Class init
+        :param socket_path: Path of the unix socket of the broker
+        :param timeout: Timeout (in seconds) of the broker requests, including the wait for a lock
+        """
+        self._socket_path = socket_path
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self._timeout)
+        connection.connect(self._socket_path)
+        return connection, connection.makefile("rb")
+
+    @staticmethod
+    def _request(channel, **request) -> dict:
+        """
+        Protected method used to send a request to the broker
+        :param channel: Tuple (socket, reader) of the connection
+        :return: Response of the broker
+        """
+        connection, reader = channel
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Polarion session broker closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ConnectionError(response.get("error", "Polarion session broker error"))
+        return response
+
+    def _call(self, **request) -> dict:
+        """
+        Protected method used to send a request on the locked connection of the thread, or on a new connection
+        :return: Response of the broker
+        """
+        channel = getattr(self._local, "channel", None)
+        if channel is not None:
+            return self._request(channel, **request)
+        channel = self._connect()
+        try:
+            return self._request(channel, **request)
+        finally:
+            channel[1].close()
+            channel[0].close()
+
+    @contextmanager
+    def lock(self, key: str):
+        channel = self._connect()
+        try:
+            self._request(channel, op="lock", key=key)
+            self._local.channel = channel
+            try:
+                yield
+            finally:
+                self._local.channel = None
+                self._request(channel, op="unlock", key=key)
+        finally:
+            channel[1].close()
+            channel[0].close()
+
+    def load(self, key: str) -> str or None:
+        return self._call(op="load", key=key).get("session_id")
+
+    def save(self, key: str, session_id: str) -> None:
+        self._call(op="save", key=key, session_id=session_id)
+
+    def discard(self, key: str, session_id: str = None) -> None:
+        self._call(op="discard", key=key, session_id=session_id)
+
+
+if __name__ == "__main__":
+    import sys
+
+    SessionBroker(sys.argv[1] if len(sys.argv) > 1 else "polarion-sessions.sock").serve_forever()
@@ -0,0 +1,71 @@
+import copy
+import threading
+
+
+class _Call:
+    """
+    In-flight call shared by the callers of the same key
+    """
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Class SingleFlight
+    Coalesces concurrent identical calls: while a call is in flight for a key, the other callers of the same key wait
+    for it and receive its result (or its exception) instead of sending their own request.
+    The waiting callers receive a copy of the result, so a caller modifying its result does not change the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Property used to get the counters of the coalesced calls
+        :return: Dictionary with calls (total), coalesced (calls which did not send a request) and in_flight
+        """
+        return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Method used to call a function, unless a call with the same key is already in flight
+        :param key: Key identifying identical calls (hashable, i.e. tuple of the operation name and arguments)
+        :param function: Function to call
+        :return: Result of the function
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as exception:
+            call.error = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -1,6 +1,59 @@
 
+from concurrent.futures import ThreadPoolExecutor
+
 from zeep import Client, xsd
 
+from .liveness import GuardedService
+from .metadata_cache import MetadataCache
+
+
+TEST_MANAGEMENT_TYPES_NAMESPACE = 'http://ws.polarion.com/TestManagementWebService-types'
+TRACKER_TYPES_NAMESPACE = 'http://ws.polarion.com/TrackerWebService-types'
+TYPES_NAMESPACE = 'http://ws.polarion.com/types'
+
+
+class TestStepsTable:
+    """
+    Class TestStepsTable
+    Compact copy of the test steps of a test case: one tuple of cell contents per step, in column order
+    """
+    __slots__ = ('columns', 'rows')
+
+    def __init__(self, columns: tuple, rows: tuple):
+        """
+        Class init
+        :param columns: IDs of the columns (may be empty if the server does not return them)
+        :param rows: Tuple of steps, each step being a tuple of cell contents
+        """
+        self.columns = columns
+        self.rows = rows
+
+    @classmethod
+    def from_test_steps(cls, test_steps) -> "TestStepsTable":
+        """
+        Method used to build a table from the result of getTestSteps
+        :param test_steps: TestSteps object
+        :return: Test steps table
+        """
+        keys = test_steps.keys.EnumOptionId if test_steps is not None and test_steps.keys else []
+        steps = test_steps.steps.TestStep if test_steps is not None and test_steps.steps else []
+        return cls(tuple(key.id for key in keys),
+                   tuple(tuple(text.content for text in step.values.Text) if step.values else () for step in steps))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def cell(self, index: int, column) -> str:
+        """
+        Method used to get the content of a cell
+        :param index: Index of the step
+        :param column: Index or ID of the column
+        :return: Content of the cell
+        """
+        if isinstance(column, str):
+            column = self.columns.index(column)
+        return self.rows[index][column]
+
 
 class TestManagementWebService:
     """
@@ -8,10 +61,10 @@ class TestManagementWebService:
     This class gives access to TestManagementWebService.wsdl description file
     """
 
-    def __init__(self, web_service_factory, server_prefix, session_header_element):
+    def __init__(self, web_service_factory, server_prefix, transport=None):
         self.web_service_factory = web_service_factory
-        self.client = Client(server_prefix + 'TestManagementWebService?wsdl')
-        self.client.set_default_soapheaders([session_header_element])
+        self.client = Client(server_prefix + 'TestManagementWebService?wsdl', transport=transport)
+        self.service = GuardedService(self.client.service, web_service_factory)
 
     def factory_create(self, class_reference):
         """
@@ -19,7 +72,43 @@ class TestManagementWebService:
         :param class_reference: class reference (can be found in wsdl)
         :return: corresponding class
         """
-        return self.client.type_factory(class_reference)
+        return self.web_service_factory.metadata.get(MetadataCache.TYPE_FACTORY, ('test_management', class_reference),
+                                                     lambda: self.client.type_factory(class_reference))
+
+    def get_type(self, qualified_name: str):
+        """
+        Get a type of the WSDL using its qualified name
+        :param qualified_name: name of the type with its namespace ({namespace}name)
+        :return: corresponding type
+        """
+        return self.web_service_factory.metadata.get(MetadataCache.TYPE_FACTORY, ('test_management', qualified_name),
+                                                     lambda: self.client.get_type(qualified_name))
+
+    def create_test_record(self, test_case_uri, test_result_id: str, test_comment: str or None, executed_by_uri,
+                           executed, duration: float, defect_uri=None):
+        """
+        Create a Test Record object, to be sent with execute_test
+        :param test_case_uri: the URI of the test case
+        :param test_result_id: the ID of the result (i.e. passed, failed, blocked)
+        :param test_comment: the comment of the record (HTML), or None
+        :param executed_by_uri: the URI of the user who executed the test
+        :param executed: the date time of the execution
+        :param duration: the duration of the execution (in seconds)
+        :param defect_uri: the URI of the defect linked to the record, or None
+        :return: Test Record object
+        """
+        test_record_type = self.get_type('{%s}TestRecord' % TEST_MANAGEMENT_TYPES_NAMESPACE)
+        enum_option_type = self.get_type('{%s}EnumOptionId' % TRACKER_TYPES_NAMESPACE)
+        text_type = self.get_type('{%s}Text' % TYPES_NAMESPACE)
+
+        return test_record_type(
+            comment=text_type(type='text/html', content=test_comment, contentLossy=False) if test_comment else None,
+            defectURI=defect_uri,
+            duration=duration,
+            executed=executed,
+            executedByURI=executed_by_uri,
+            result=enum_option_type(id=test_result_id),
+            testCaseURI=test_case_uri)
 
     def get_test_steps(self, workitem_uri):
         """
@@ -27,7 +116,27 @@ class TestManagementWebService:
         :param workitem_uri: the URI of the work item to get
         :return: the test steps of WI with given URI
         """
-        return self.client.service.getTestSteps(workitem_uri)
+        return self.service.getTestSteps(workitem_uri)
+
+    def get_test_steps_tables(self, workitem_uris: [str], max_workers: int = 8) -> (dict, dict):
+        """
+        Gets the TestSteps of many WIs at once, using a bounded pool of threads
+        :param workitem_uris: the URIs of the work items
+        :param max_workers: maximum number of concurrent requests
+        :return: Tuple (dictionary URI -> TestStepsTable in input order, dictionary URI -> exception for each failure,
+                 whatever its type)
+        """
+        tables = {}
+        errors = {}
+        unique_uris = list(dict.fromkeys(workitem_uris))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polarion-steps") as executor:
+            futures = {workitem_uri: executor.submit(self.get_test_steps, workitem_uri) for workitem_uri in unique_uris}
+            for workitem_uri, future in futures.items():
+                try:
+                    tables[workitem_uri] = TestStepsTable.from_test_steps(future.result())
+                except Exception as exception:
+                    errors[workitem_uri] = exception
+        return tables, errors
 
     def set_test_steps(self, workitem_uri, test_steps):
         """
@@ -38,7 +147,7 @@ class TestManagementWebService:
         :param test_steps: an array containing an entry for each step
         :return: None
         """
-        self.client.service.setTestSteps(workitem_uri, test_steps)
+        self.service.setTestSteps(workitem_uri, test_steps)
 
     def create_test_run_with_title(self, project, test_run_id, title, template):
         """
@@ -49,7 +158,7 @@ class TestManagementWebService:
         :param template: The template used to create the Test Run
         :return: None
         """
-        self.client.service.createTestRunWithTitle(project, test_run_id, title, template)
+        self.service.createTestRunWithTitle(project, test_run_id, title, template)
 
     def get_test_run(self, project, test_run_id):
         """
@@ -58,7 +167,8 @@ class TestManagementWebService:
         :param test_run_id: The Id of the Test Run to find
         :return: The URI of the created Test Run
         """
-        return self.client.service.getTestRunById(project, test_run_id)
+        return self.web_service_factory.coalesce(('getTestRunById', project, test_run_id),
+                                                 self.service.getTestRunById, project, test_run_id)
 
     def get_test_case_records(self, test_run_uri, test_case_uri):
         """
@@ -67,7 +177,7 @@ class TestManagementWebService:
         :param test_case_uri:
         :return: The URI of the created Test Run
         """
-        return self.client.service.getTestCaseRecords(test_run_uri, test_case_uri)
+        return self.service.getTestCaseRecords(test_run_uri, test_case_uri)
 
     def add_test_record(self,
                         test_run_uri,
@@ -91,14 +201,14 @@ class TestManagementWebService:
         :return: None
         """
 
-        self.client.service.addTestRecord(test_run_uri,
-                                          test_case_uri,
-                                          test_result_id,
-                                          test_comment,
-                                          executed_by_uri,
-                                          executed,
-                                          duration,
-                                          defect_uri)
+        self.service.addTestRecord(test_run_uri,
+                                   test_case_uri,
+                                   test_result_id,
+                                   test_comment,
+                                   executed_by_uri,
+                                   executed,
+                                   duration,
+                                   defect_uri)
 
     def update_test_record(self,
                            test_case_uri,
@@ -122,14 +232,14 @@ class TestManagementWebService:
         :return:
         """
 
-        self.client.service.updateTestRecord(test_case_uri,
-                                             index,
-                                             test_result_id,
-                                             test_comment,
-                                             executed_by_uri,
-                                             executed,
-                                             duration,
-                                             defect_uri)
+        self.service.updateTestRecord(test_case_uri,
+                                      index,
+                                      test_result_id,
+                                      test_comment,
+                                      executed_by_uri,
+                                      executed,
+                                      duration,
+                                      defect_uri)
 
     def execute_test(self, test_run_uri, records):
         """
@@ -138,4 +248,4 @@ class TestManagementWebService:
         :param records:
         :return:
         """
-        self.client.service.executeTest(test_run_uri, records)
+        self.service.executeTest(test_run_uri, records)
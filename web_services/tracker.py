@@ -1,5 +1,109 @@
 from zeep import Client
 
+from .liveness import GuardedService
+from .metadata_cache import MetadataCache
+from .paging import iter_pages
+from .raw import RawService, element_to_dict
+from .workitem_cache import WorkItemCache
+
+# Maximum number of work items queried at once by ID (Lucene rejects queries of more than 1024 clauses)
+MAX_QUERY_CLAUSES = 1000
+
+# Fields filled by default when streaming workitems (see iter_workitems)
+STREAM_FIELDS = ['type', 'id', 'status', 'description', 'linkedWorkItems']
+
+# Fields filled when the whole workitem is needed (i.e. to build PolarionWorkitem objects)
+WORKITEM_FIELDS = ['id', 'type', 'title', 'status', 'severity', 'author', 'project', 'description', 'comments',
+                   'customFields', 'linkedWorkItems', 'created', 'updated']
+
+
+def workitem_id_from_uri(workitem_uri: str) -> str:
+    """
+    Function used to get the ID of a work item from its URI
+    :param workitem_uri: URI of the work item (i.e. subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1)
+    :return: ID of the work item
+    """
+    return workitem_uri.rsplit('}', 1)[-1]
+
+
+def project_id_from_uri(workitem_uri: str) -> str or None:
+    """
+    Function used to get the ID of the project of a work item from its URI
+    :param workitem_uri: URI of the work item (i.e. subterra:data-service:objects:/default/PRJ${WorkItem}PRJ-1)
+    :return: ID of the project, or None if the URI has another format
+    """
+    location, separator, unused_id = workitem_uri.rpartition('${WorkItem}')
+    if not separator:
+        return None
+    return location.rsplit('/', 1)[-1] or None
+
+
+def workitem_page_queries(page_uris: [str]) -> [str]:
+    """
+    Function used to build the queries fetching a page of workitems by ID: IDs are only unique within a project, so
+    there is one query per project of the page, split so that no query has more than MAX_QUERY_CLAUSES IDs
+    :param page_uris: URIs of the workitems of the page
+    :return: List of queries (i.e. project.id:PRJ AND id:(PRJ-1 OR PRJ-2))
+    """
+    projects = {}
+    for uri in page_uris:
+        projects.setdefault(project_id_from_uri(uri), []).append(workitem_id_from_uri(uri))
+
+    queries = []
+    for project_id, workitem_ids in projects.items():
+        for start in range(0, len(workitem_ids), MAX_QUERY_CLAUSES):
+            query = "id:(%s)" % " OR ".join(workitem_ids[start:start + MAX_QUERY_CLAUSES])
+            queries.append(query if project_id is None else "project.id:%s AND %s" % (project_id, query))
+    return queries
+
+
+def is_resolved(workitem) -> bool:
+    """
+    Function used to know if a returned workitem exists
+    :param workitem: Workitem returned by the server (or None)
+    :return: False if the workitem is None or unresolvable, else True
+    """
+    return workitem is not None and not getattr(workitem, 'unresolvable', False)
+
+
+def resolved_workitem_uri(workitem, project_id: str, workitem_id: str) -> str:
+    """
+    Function used to get the URI of a workitem read by ID
+    :param workitem: Workitem returned by the server (or None)
+    :param project_id: ID of the project of the workitem
+    :param workitem_id: ID of the workitem
+    :return: URI of the workitem (InvalidWorkItem raised if the workitem does not exist)
+    """
+    if not is_resolved(workitem):
+        # Imported here: the polarion module imports the web services
+        from ..polarion import InvalidWorkItem
+        raise InvalidWorkItem("Workitem %s not found in project %s" % (workitem_id, project_id))
+    return workitem.uri
+
+
+def workitem_changes(factory, status: str = None, severity: str = None, title: str = None,
+                     custom_fields: dict = None) -> dict:
+    """
+    Function used to build the fields of a partial workitem update
+    :param factory: Type factory of the tracker types (ns2)
+    :param status: Status value (Polarion id of the status), not changed if None
+    :param severity: Severity value (Polarion id of the severity), not changed if None
+    :param title: Title of the workitem, not changed if None
+    :param custom_fields: Values of custom fields by key, not changed if None
+    :return: Changed fields by name (empty if nothing changes)
+    """
+    changes = {}
+    if status is not None:
+        changes['status'] = factory.EnumOptionId(id=status)
+    if severity is not None:
+        changes['severity'] = factory.EnumOptionId(id=severity)
+    if title is not None:
+        changes['title'] = title
+    if custom_fields:
+        changes['customFields'] = factory.ArrayOfCustom(Custom=[factory.Custom(key=key, value=value)
+                                                                for key, value in custom_fields.items()])
+    return changes
+
 
 class TrackerWebService:
     """
@@ -7,12 +111,39 @@ class TrackerWebService:
     This class gives access to TrackerWebService.wsdl description file
     """
 
-    def __init__(self, polarion_access, server_prefix, session_header_element):
+    def __init__(self, polarion_access, server_prefix, transport=None, workitem_cache: WorkItemCache = None):
         self._polarion_access = polarion_access
-        self.client = Client(server_prefix + 'TrackerWebService?wsdl')
-        self.client.settings.strict = False
-        self.client.set_default_soapheaders([session_header_element])
+        self.client = Client(server_prefix + 'TrackerWebService?wsdl', transport=transport)
         self.client.settings.strict = False
+        self.service = GuardedService(self.client.service, polarion_access)
+        self.raw_service = RawService(self.client, polarion_access)
+        self._cache = workitem_cache
+
+    @property
+    def cache(self) -> WorkItemCache or None:
+        """
+        Property used to get the work item cache (opt-in)
+        :return: Work item cache if enabled, else None
+        """
+        return self._cache
+
+    def factory_create(self, class_reference):
+        """
+        Get the type factory of a namespace (created once per session)
+        :param class_reference: namespace prefix of the types (i.e. 'ns2')
+        :return: corresponding type factory
+        """
+        return self._polarion_access.metadata.get(MetadataCache.TYPE_FACTORY, ('tracker', class_reference),
+                                                  lambda: self.client.type_factory(class_reference))
+
+    def _invalidate(self, *workitem_uris: str) -> None:
+        """
+        Protected method used to remove modified work items from the cache
+        :param workitem_uris: URIs of the modified work items
+        :return: None
+        """
+        if self._cache is not None:
+            self._cache.invalidate(*workitem_uris)
 
     def create_workitem(self, project_id: str, type_id: str, title: str, description_content: str = ""):
         """
@@ -23,31 +154,121 @@ class TrackerWebService:
         :param description_content: workitem description (string)
         :return: URI of created work item
         """
-        project = self._polarion_access.project.client.service.getProject(project_id)
-        wi_type = self.client.type_factory('ns2').EnumOptionId(id=type_id)
-        description = self.client.type_factory('ns1').Text(type='text/html',
-                                                           content=description_content.replace("\n", "<br>"),
-                                                           contentLossy=False)
+        project = self._polarion_access.project.get_project(project_id)
+        wi_type = self.factory_create('ns2').EnumOptionId(id=type_id)
+        description = self.factory_create('ns1').Text(type='text/html',
+                                                      content=description_content.replace("\n", "<br>"),
+                                                      contentLossy=False)
 
-        workitem = self.client.type_factory('ns2').WorkItem(project=project,
-                                                            type=wi_type,
-                                                            title=title,
-                                                            description=description)
+        workitem = self.factory_create('ns2').WorkItem(project=project,
+                                                       type=wi_type,
+                                                       title=title,
+                                                       description=description)
 
         # Create the work item
-        return self.client.service.createWorkItem(workitem)
+        return self.service.createWorkItem(workitem)
 
-    def query_workitems(self, query: str, sort: str = 'id', fields: [str] = None) -> []:
+    def query_workitems(self, query: str, sort: str = 'id', fields: [str] = None, raw: bool = False) -> []:
         """
         Function used to get a list of workitems using Polarion query (can be found using filter option in Polarion)
         :param query:  (string) the lucene query to be used
         :param sort: (string) the field to be used for sorting
         :param fields: (string[]) the keys of the fields that should be filled
+        :param raw: (bool) parse the response incrementally into WorkitemSnapshot records instead of zeep objects
+                    (much less CPU and memory on large results)
         :return: the list of workitems
         """
         if fields is None:
-            fields = ['type', 'id', 'status', 'description', 'linkedWorkItems']
-        return self.client.service.queryWorkItems(query, sort, fields)
+            fields = STREAM_FIELDS
+        if raw:
+            from ..objects.snapshot import WorkitemSnapshot
+            return self.raw_service.call('queryWorkItems', WorkitemSnapshot.from_xml, query, sort, fields)
+        return self.service.queryWorkItems(query, sort, fields)
+
+    def query_workitem_uris(self, query: str, sort: str = 'id') -> [str]:
+        """
+        Function used to get the URIs of the workitems matching a Polarion query
+        :param query: (string) the lucene query to be used
+        :param sort: (string) the field to be used for sorting
+        :return: the list of workitem URIs
+        """
+        return self.service.queryWorkItemUris(query, sort) or []
+
+    def iter_workitems(self, query: str, sort: str = 'id', fields: [str] = None, page_size: int = 500,
+                       prefetch: bool = False):
+        """
+        Method used to stream the workitems matching a Polarion query page by page, instead of materialising the
+        whole result list in one response. The workitems are fetched by pages of page_size items (one id:(...) query
+        per project of the page and per MAX_QUERY_CLAUSES IDs, workitems the page query missed are fetched by URI).
+        The URIs of all matching workitems are queried at once beforehand, so the memory used for them is O(n) in the
+        number of matches; only the workitems themselves are bounded by the page size.
+        :param query: (string) the lucene query to be used
+        :param sort: (string) the field to be used for sorting
+        :param fields: (string[]) the keys of the fields that should be filled
+        :param page_size: (int) number of workitems fetched per page
+        :param prefetch: (bool) fetch the next page on a background thread while the current one is consumed
+        :return: generator of workitems, in the query order
+        """
+        if fields is None:
+            fields = STREAM_FIELDS
+        page_size = max(1, page_size)
+
+        uris = self.query_workitem_uris(query, sort)
+
+        def fetch_page(index):
+            page_uris = uris[index * page_size:(index + 1) * page_size]
+
+            # Keep the workitems of the page URIs only
+            found = {}
+            for page_query in workitem_page_queries(page_uris):
+                for workitem in self.service.queryWorkItems(page_query, sort, fields) or []:
+                    found[workitem.uri] = workitem
+            for uri in page_uris:
+                if uri not in found:
+                    workitem = self.service.getWorkItemByUriWithFields(uri, fields)
+                    if is_resolved(workitem):
+                        found[uri] = workitem
+
+            # Keep the order of the URIs query
+            return [found[uri] for uri in page_uris if uri in found], (index + 1) * page_size < len(uris)
+
+        if not uris:
+            return iter(())
+        return iter_pages(fetch_page, prefetch)
+
+    def iter_workitems_by_sql(self, sql_query: str, fields: [str] = None, page_size: int = 500,
+                              prefetch: bool = False):
+        """
+        Method used to stream the workitems returned by a SQL query page by page (queryWorkItemsBySQL), using
+        LIMIT/OFFSET clauses. The query has to be ordered (ORDER BY) to get consistent pages.
+        :param sql_query: (string) the SQL query to be used, without LIMIT/OFFSET clause
+        :param fields: (string[]) the keys of the fields that should be filled
+        :param page_size: (int) number of workitems fetched per request
+        :param prefetch: (bool) fetch the next page on a background thread while the current one is consumed
+        :return: generator of workitems, in the query order
+        """
+        if fields is None:
+            fields = STREAM_FIELDS
+
+        def fetch_page(index):
+            page_query = "%s LIMIT %d OFFSET %d" % (sql_query, page_size, index * page_size)
+            workitems = self.service.queryWorkItemsBySQL(page_query, fields) or []
+            return workitems, len(workitems) == page_size
+
+        return iter_pages(fetch_page, prefetch)
+
+    def query_workitems_by_ids(self, project_id: str, workitem_ids: [str], fields: [str] = None) -> []:
+        """
+        Function used to get several workitems of a project in a single query (id:(A OR B OR ...))
+        :param project_id: the id of the project that contains the workitems to get
+        :param workitem_ids: the ids of the workitems to get
+        :param fields: (string[]) the keys of the fields that should be filled (default: WORKITEM_FIELDS)
+        :return: the list of workitems found (workitems which do not exist are missing)
+        """
+        if not workitem_ids:
+            return []
+        query = "project.id:%s AND id:(%s)" % (project_id, " OR ".join(workitem_ids))
+        return self.service.queryWorkItems(query, 'id', fields or WORKITEM_FIELDS) or []
 
     def get_workitem_by_id(self, project_id: str, workitem_id: str):
         """
@@ -56,7 +277,16 @@ class TrackerWebService:
         :param workitem_id: the id of the work item to get
         :return: Workitem requested
         """
-        return self.client.service.getWorkItemById(project_id, workitem_id)
+        key = ('getWorkItemById', project_id, workitem_id)
+        if self._cache is None:
+            return self._polarion_access.coalesce(key, self.service.getWorkItemById, project_id, workitem_id)
+
+        version = self._cache.version
+        workitem = self._cache.get_by_id(project_id, workitem_id)
+        if workitem is None:
+            workitem = self._polarion_access.coalesce(key, self.service.getWorkItemById, project_id, workitem_id)
+            self._cache.put(workitem, project_id, version)
+        return workitem
 
     def get_workitem_by_uri(self, workitem_uri: str):
         """
@@ -64,7 +294,35 @@ class TrackerWebService:
         :param workitem_uri: the uri of the work item to get
         :return: Workitem requested
         """
-        return self.client.service.getWorkItemByUri(workitem_uri)
+        key = ('getWorkItemByUri', workitem_uri)
+        if self._cache is None:
+            return self._polarion_access.coalesce(key, self.service.getWorkItemByUri, workitem_uri)
+
+        version = self._cache.version
+        workitem = self._cache.get_by_uri(workitem_uri)
+        if workitem is None:
+            workitem = self._polarion_access.coalesce(key, self.service.getWorkItemByUri, workitem_uri)
+            self._cache.put(workitem, version=version)
+        return workitem
+
+    def get_workitem_by_id_with_fields(self, project_id: str, workitem_id: str, fields: [str]):
+        """
+        Function used to get a workitem using project and workitem IDs, with only some of its fields filled
+        :param project_id: the id of the project that contains the workitem to get
+        :param workitem_id: the id of the work item to get
+        :param fields: (string[]) the keys of the fields that should be filled
+        :return: Workitem requested
+        """
+        return self.service.getWorkItemByIdWithFields(project_id, workitem_id, fields)
+
+    def get_workitem_by_uri_with_fields(self, workitem_uri: str, fields: [str]):
+        """
+        Function used to get a workitem using its uri, with only some of its fields filled
+        :param workitem_uri: the uri of the work item to get
+        :param fields: (string[]) the keys of the fields that should be filled
+        :return: Workitem requested
+        """
+        return self.service.getWorkItemByUriWithFields(workitem_uri, fields)
 
     def get_custom_field(self, workitem_uri, custom_field_key):
         """
@@ -73,10 +331,28 @@ class TrackerWebService:
         :param custom_field_key: the key of the custom field
         :return: Custom field as an object
         """
-        return self.client.service.getCustomField(workitem_uri, custom_field_key)
+        return self._polarion_access.coalesce(('getCustomField', workitem_uri, custom_field_key),
+                                              self.service.getCustomField, workitem_uri, custom_field_key)
+
+    def get_workitem_uri(self, project_id: str, workitem_id: str) -> str:
+        """
+        Method used to get the URI of a workitem from its project and workitem IDs, read once (with the id field only)
+        unless the workitem is cached
+        :param project_id: the id of the project that contains the workitem
+        :param workitem_id: the id of the work item
+        :return: URI of the workitem (InvalidWorkItem raised, and nothing cached, if the workitem does not exist)
+        """
+        def load():
+            workitem = self._cache.get_by_id(project_id, workitem_id) if self._cache is not None else None
+            if workitem is None:
+                workitem = self.service.getWorkItemByIdWithFields(project_id, workitem_id, ['id'])
+            return resolved_workitem_uri(workitem, project_id, workitem_id)
+
+        return self._polarion_access.metadata.get(MetadataCache.WORKITEM_URI, (project_id, workitem_id), load)
 
     def get_enum_control_key(self, project_id, enum_id):
-        return self.client.service.getEnumControlKeyForId(project_id, enum_id)
+        return self._polarion_access.metadata.get(MetadataCache.ENUM_CONTROL_KEY, (project_id, enum_id),
+                                                  lambda: self.service.getEnumControlKeyForId(project_id, enum_id))
 
     def add_comment(self, workitem_uri: str, title: str, comment: str) -> None:
         """
@@ -87,11 +363,63 @@ class TrackerWebService:
         :return: None
         """
         # convert comment to Text type
-        comment_text = self.client.type_factory('ns1').Text(type='text/html',
-                                                            content=comment,
-                                                            contentLossy=False)
+        comment_text = self.factory_create('ns1').Text(type='text/html',
+                                                       content=comment,
+                                                       contentLossy=False)
+
+        self.service.addComment(workitem_uri, title, comment_text)
+        self._invalidate(workitem_uri)
+
+    def update_workitem_fields(self,
+                               workitem_uri: str,
+                               status: str = None,
+                               severity: str = None,
+                               title: str = None,
+                               custom_fields: dict = None) -> None:
+        """
+        Method used to update some fields of a workitem in a single small request: the sent workitem only contains the
+        URI and the changed fields, so the workitem does not have to be read first and other fields are left as is.
+        :param workitem_uri: URI of the workitem
+        :param status: Status value (Polarion id of the status), not changed if None
+        :param severity: Severity value (Polarion id of the severity), not changed if None
+        :param title: Title of the workitem, not changed if None
+        :param custom_fields: Values of custom fields by key (enum values have to be EnumOptionId objects,
+                              see factory_create('ns2')), not changed if None
+        :return: None
+        """
+        factory = self.factory_create('ns2')
+        changes = workitem_changes(factory, status, severity, title, custom_fields)
+        if not changes:
+            return
+
+        try:
+            self.service.updateWorkItem(factory.WorkItem(uri=workitem_uri, **changes))
+        except Exception:
+            self._invalidate(workitem_uri)
+            raise
+        self._patch_cached(workitem_uri, changes)
+
+    def _patch_cached(self, workitem_uri: str, changes: dict) -> None:
+        """
+        Protected method used to apply updated fields to a copy of the cached workitem, then to store it back. The
+        workitem is dropped instead for custom fields changes and inside a transaction (the changes are not committed
+        yet).
+        :param workitem_uri: URI of the updated workitem
+        :param changes: Updated fields by name
+        :return: None
+        """
+        if self._cache is None:
+            return
+        if 'customFields' in changes or self._polarion_access.in_transaction:
+            self._cache.invalidate(workitem_uri)
+            return
 
-        self.client.service.addComment(workitem_uri, title, comment_text)
+        version = self._cache.version
+        workitem = self._cache.get_by_uri(workitem_uri)
+        if workitem is not None:
+            for field, value in changes.items():
+                setattr(workitem, field, value)
+            self._cache.put(workitem, version=version)
 
     def set_status(self, project_id: str, workitem_id: str, value: str) -> None:
         """
@@ -101,10 +429,7 @@ class TrackerWebService:
         :param value: Status value (Polarion id of the status)
         :return:
         """
-        workitem = self.get_workitem_by_id(project_id, workitem_id)
-        workitem.status.id = value
-
-        self.client.service.updateWorkItem(workitem)
+        self.update_workitem_fields(self.get_workitem_uri(project_id, workitem_id), status=value)
 
     def set_severity(self, project_id: str, workitem_id: str, value: str) -> None:
         """
@@ -114,12 +439,7 @@ class TrackerWebService:
         :param value: Value to set
         :return: None
         """
-        enum_option = self.client.type_factory('ns2').EnumOptionId(id=value)
-
-        workitem = self.get_workitem_by_id(project_id, workitem_id)
-        workitem.severity = enum_option
-
-        self.client.service.updateWorkItem(workitem)
+        self.update_workitem_fields(self.get_workitem_uri(project_id, workitem_id), severity=value)
 
     def set_custom_field(self, workitem_uri, custom_field_key, value):
         """
@@ -129,11 +449,13 @@ class TrackerWebService:
         :param value: Value to set
         :return:
         """
-        enum_option = self.client.type_factory('ns2').EnumOptionId(id=value)
-        custom_field = self.client.type_factory('ns2').CustomField(key=custom_field_key,
-                                                                   parentItemURI=workitem_uri,
-                                                                   value=enum_option)
-        return self.client.service.setCustomField(custom_field)
+        enum_option = self.factory_create('ns2').EnumOptionId(id=value)
+        custom_field = self.factory_create('ns2').CustomField(key=custom_field_key,
+                                                              parentItemURI=workitem_uri,
+                                                              value=enum_option)
+        result = self.service.setCustomField(custom_field)
+        self._invalidate(workitem_uri)
+        return result
 
     def add_linked_item_by_id(self, project_id, workitem_id, linked_project_id, linked_workitem_id, role):
         """
@@ -145,16 +467,12 @@ class TrackerWebService:
         :param role: the role of the link to add
         :return: True if link has been added, else False
         """
-        # Translate string into polarion type
-        new_role = self.client.type_factory('ns2').EnumOptionId(id=role)
-
         # Get the two concerned items
         workitem = self.get_workitem_by_id(project_id, workitem_id)
         linked_workitem = self.get_workitem_by_id(linked_project_id, linked_workitem_id)
 
         # Set the link
-        # noinspection PyProtectedMember
-        return self.client.service.addLinkedItem(workitem._uri, linked_workitem._uri, new_role)
+        return self.add_linked_item(workitem.uri, linked_workitem.uri, role)
 
     def add_linked_item(self, workitem_uri: str, linked_workitem_uri: str, role: str) -> bool:
         """
@@ -165,10 +483,12 @@ class TrackerWebService:
         :return: True if link has been added, else False
         """
         # Translate string into polarion type
-        new_role = self.client.type_factory('ns2').EnumOptionId(id=role)
+        new_role = self.factory_create('ns2').EnumOptionId(id=role)
 
-        # Set the link
-        return self.client.service.addLinkedItem(workitem_uri, linked_workitem_uri, new_role)
+        # Set the link (both work items list the link)
+        result = self.service.addLinkedItem(workitem_uri, linked_workitem_uri, new_role)
+        self._invalidate(workitem_uri, linked_workitem_uri)
+        return result
 
     def remove_linked_item(self, workitem_uri, linked_item_uri, role) -> bool:
         """
@@ -179,8 +499,10 @@ class TrackerWebService:
         :return: True if link has been removed, else False
         """
         # Translate string into polarion type
-        new_role = self.client.type_factory('ns2').EnumOptionId(id=role)
-        return self.client.service.removeLinkedItem(workitem_uri, linked_item_uri, new_role)
+        new_role = self.factory_create('ns2').EnumOptionId(id=role)
+        result = self.service.removeLinkedItem(workitem_uri, linked_item_uri, new_role)
+        self._invalidate(workitem_uri, linked_item_uri)
+        return result
 
     def get_document(self, project_id: str, location: str):
         """
@@ -189,18 +511,23 @@ class TrackerWebService:
         :param location: Location of the document in the project. Format : SPACE/DOCUMENT_ID (i.e : 2x_Control/20_Zone)
         :return: The requested document
         """
-        return self.client.service.getModuleByLocation(project_id, location)
+        return self._polarion_access.coalesce(('getModuleByLocation', project_id, location),
+                                              self.service.getModuleByLocation, project_id, location)
 
-    def get_documents(self, project_id: str, location: str) -> object or [object] or None:
+    def get_documents(self, project_id: str, location: str, raw: bool = False) -> object or [object] or None:
         """
         Method used to get all documents on the given location relative to the "modules" folder of the given project.
         :param project_id: Project ID of the documents
         :param location: The serialized location relative to the "modules" folder
+        :param raw: If True, the response is parsed incrementally into plain dictionaries (see element_to_dict)
         :return: One document (if only one document in the folder)
                  Array of document (if more than one document in the folder)
                  None (if no document in the folder)
+                 List of dictionaries (raw mode)
         """
-        return self.client.service.getModules(project_id, location)
+        if raw:
+            return self.raw_service.call('getModules', element_to_dict, project_id, location)
+        return self.service.getModules(project_id, location)
 
     def get_document_by_uri(self, document_uri):
         """
@@ -208,7 +535,7 @@ class TrackerWebService:
         :param document_uri: URI of the document
         :return: The requested document
         """
-        return self.client.service.getModuleByUri(document_uri)
+        return self.service.getModuleByUri(document_uri)
 
     def get_documents_sub_folder(self, project_id: str, location: str) -> [str] or None:
         """
@@ -218,7 +545,7 @@ class TrackerWebService:
         :return: Array of serialized locations (if exist)
                  None (if no location)
         """
-        return self.client.service.getModulesSubFolders(project_id, location)
+        return self.service.getModulesSubFolders(project_id, location)
 
     def set_document_custom_field(self,
                                   document_uri: str,
@@ -233,34 +560,38 @@ class TrackerWebService:
         :param custom_field_value: Custom field value to apply
         :return: None
         """
-        custom_field = self.client.type_factory('ns2').Custom(key=custom_field_key, value=custom_field_value)
+        custom_field = self.factory_create('ns2').Custom(key=custom_field_key, value=custom_field_value)
 
         document = self.get_document_by_uri(document_uri)
         document.customFields.Custom.append(custom_field)
 
-        self.client.service.updateModule(document)
+        self.service.updateModule(document)
 
     def generate_workitem_history_by_id(self, project_id: str, workitem_id: str, ignored_fields: [str] = "",
-                                        field_order: [str] = ""):
+                                        field_order: [str] = "", raw: bool = False):
         """
         Method used to generate a specific history for a workitem using its id
         :param project_id: Project ID of the workitem
         :param workitem_id: Workitem ID
         :param ignored_fields: Fields to ignore
         :param field_order: Field used to sort the history
+        :param raw: If True, the history is parsed incrementally into plain dictionaries (see element_to_dict)
         :return: Change history
         """
         workitem = self.get_workitem_by_id(project_id, workitem_id)
-        changes = self.client.service.generateHistory(workitem.uri, ignored_fields, field_order)
-        return changes
+        return self.generate_workitem_history_by_uri(workitem.uri, ignored_fields, field_order, raw)
 
-    def generate_workitem_history_by_uri(self, workitem_uri: str, ignored_fields: [str] = "", field_order: [str] = ""):
+    def generate_workitem_history_by_uri(self, workitem_uri: str, ignored_fields: [str] = "", field_order: [str] = "",
+                                         raw: bool = False):
         """
         Method used to generate a specific history for a workitem using its uri
         :param workitem_uri: Workitem URI
         :param ignored_fields: Fields to ignore
         :param field_order: Field used to sort the history
+        :param raw: If True, the history is parsed incrementally into plain dictionaries (see element_to_dict)
         :return: Change history
         """
-        changes = self.client.service.generateHistory(workitem_uri, ignored_fields, field_order)
+        if raw:
+            return self.raw_service.call('generateHistory', element_to_dict, workitem_uri, ignored_fields, field_order)
+        changes = self.service.generateHistory(workitem_uri, ignored_fields, field_order)
         return changes
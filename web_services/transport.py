@@ -0,0 +1,186 @@
+import gzip
+import re
+from time import perf_counter, time
+
+import requests
+from requests.adapters import HTTPAdapter
+from zeep import Transport
+from zeep.wsdl.utils import etree_to_string
+
+from .instrumentation import CallRecord, Instrumentation
+
+FAULT_STRING_PATTERN = re.compile(rb'<faultstring>(.*?)</faultstring>', re.DOTALL)
+SOAP_BODY_TAG = '{http://schemas.xmlsoap.org/soap/envelope/}Body'
+
+
+def get_operation_name(envelope) -> str or None:
+    """
+    Function used to get the name of the operation called by a SOAP envelope (document/literal wrapped style)
+    :param envelope: SOAP envelope (lxml element)
+    :return: Name of the operation if found, else None
+    """
+    body = envelope.find(SOAP_BODY_TAG)
+    if body is None or not len(body):
+        return None
+    return body[0].tag.rsplit('}', 1)[-1]
+
+
+class PolarionTransport(Transport):
+    """
+    Class PolarionTransport
+    zeep transport shared by all the web service clients of a PolarionAccess. It holds a single requests session with
+    a sized connection pool and keep-alive connections, applies per-operation timeouts and can compress requests and
+    responses with gzip.
+    """
+
+    def __init__(self,
+                 cache=None,
+                 timeout: float = 300,
+                 operation_timeout: float or None = None,
+                 operation_timeouts: dict = None,
+                 pool_connections: int = 4,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 max_retries: int = 0,
+                 compress_requests: bool = False,
+                 compress_responses: bool = True,
+                 session: requests.Session = None,
+                 instrumentation: Instrumentation = None):
+        """
+        Class init
+        :param cache: Cache used to store the WSDL and XSD documents
+        :param timeout: Timeout (in seconds) used to load WSDL and XSD documents
+        :param operation_timeout: Default timeout (in seconds) of the web service operations (None for no timeout)
+        :param operation_timeouts: Timeouts (in seconds) of specific operations, by operation name
+                                   (i.e. {'queryWorkItems': 600})
+        :param pool_connections: Number of connection pools to cache (one per host)
+        :param pool_maxsize: Maximum number of connections kept alive in each pool
+        :param pool_block: If True, wait for a free connection when the pool is full instead of opening a new one
+        :param max_retries: Number of retries on connection failures
+        :param compress_requests: If True, request bodies are sent gzip compressed (server has to support it)
+        :param compress_responses: If True, gzip compressed responses are requested
+        :param session: requests session to use (a new one is created if None)
+        :param instrumentation: Recorder of the measures of each web service call (disabled if None)
+        """
+        if session is None:
+            session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block,
+                              max_retries=max_retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        session.headers['Accept-Encoding'] = 'gzip, deflate' if compress_responses else 'identity'
+
+        super().__init__(cache=cache, timeout=timeout, operation_timeout=operation_timeout, session=session)
+
+        self.operation_timeouts = dict(operation_timeouts or {})
+        self.compress_requests = compress_requests
+        self.instrumentation = instrumentation
+
+    def post_xml(self, address, envelope, headers):
+        """
+        Post the envelope xml element to the given address with the headers, using the timeout of its operation
+        :param address: The URL for the request
+        :param envelope: SOAP envelope (lxml element)
+        :param headers: a dictionary with the HTTP headers
+        :return: HTTP response
+        """
+        message = etree_to_string(envelope)
+        operation_name = get_operation_name(envelope)
+        timeout = self.operation_timeouts.get(operation_name, self.operation_timeout)
+        if self.instrumentation is None:
+            return self._post(address, message, headers, timeout)
+        return self._measured_post(operation_name, address, message, headers, timeout)
+
+    def post_xml_stream(self, address, envelope, headers):
+        """
+        Post the envelope xml element as post_xml, without reading the response body: the body is read from
+        response.raw by the caller (i.e. to parse it incrementally), which has to close the response
+        :param address: The URL for the request
+        :param envelope: SOAP envelope (lxml element)
+        :param headers: a dictionary with the HTTP headers
+        :return: HTTP response
+        """
+        message = etree_to_string(envelope)
+        operation_name = get_operation_name(envelope)
+        timeout = self.operation_timeouts.get(operation_name, self.operation_timeout)
+        if self.instrumentation is None:
+            return self._post(address, message, headers, timeout, stream=True)
+        return self._measured_post(operation_name, address, message, headers, timeout, stream=True)
+
+    def post(self, address, message, headers):
+        """
+        Post a message to the given address with the headers, using the default operation timeout
+        :param address: The URL for the request
+        :param message: The content for the body
+        :param headers: a dictionary with the HTTP headers
+        :return: HTTP response
+        """
+        return self._post(address, message, headers, self.operation_timeout)
+
+    def _measured_post(self, operation_name, address, message, headers, timeout, stream=False):
+        """
+        Protected method used to send a message and report its measures to the instrumentation
+        :param operation_name: Name of the operation of the message
+        :param address: The URL for the request
+        :param message: The content for the body
+        :param headers: a dictionary with the HTTP headers
+        :param timeout: Timeout (in seconds) of the request
+        :param stream: If True, the response body is not read (its size is taken from Content-Length)
+        :return: HTTP response
+        """
+        start = time()
+        counter = perf_counter()
+        try:
+            response = self._post(address, message, headers, timeout, stream)
+        except requests.RequestException as exception:
+            self.instrumentation.record(CallRecord(operation_name, start, perf_counter() - counter, len(message),
+                                                   None, None, "%s: %s" % (type(exception).__name__, exception)))
+            raise
+
+        duration = perf_counter() - counter
+        if stream:
+            content_length = response.headers.get('Content-Length')
+            response_bytes = int(content_length) if content_length else None
+        else:
+            response_bytes = len(response.content)
+
+        error = None
+        if response.status_code != 200:
+            match = None if stream else FAULT_STRING_PATTERN.search(response.content)
+            error = "HTTP %d%s" % (response.status_code,
+                                   ": " + match.group(1).decode('utf-8', 'replace') if match else "")
+        self.instrumentation.record(CallRecord(operation_name, start, duration, len(message), response_bytes,
+                                               response.status_code, error))
+        return response
+
+    def _post(self, address, message, headers, timeout, stream=False):
+        """
+        Protected method used to send a message, gzip compressed if requested
+        :param address: The URL for the request
+        :param message: The content for the body
+        :param headers: a dictionary with the HTTP headers
+        :param timeout: Timeout (in seconds) of the request
+        :param stream: If True, the response body is not read
+        :return: HTTP response
+        """
+        if self.compress_requests:
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+            message = gzip.compress(message, compresslevel=5)
+            headers = dict(headers, **{'Content-Encoding': 'gzip'})
+
+        self.logger.debug("HTTP Post to %s", address)
+        response = self.session.post(address, data=message, headers=headers, timeout=timeout, stream=stream)
+        self.logger.debug("HTTP Response from %s (status: %d)", address, response.status_code)
+        return response
+
+    def close(self) -> None:
+        """
+        Method used to close the pooled connections
+        :return: None
+        """
+        self.session.close()
@@ -0,0 +1,158 @@
+import copy
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class WorkItemCache:
+    """
+    Class WorkItemCache
+    Memory bounded cache of work items, keyed by URI and by (project ID, work item ID). Entries expire after a time to
+    live and the least recently used entry is evicted when the cache is full.
+    Work items are copied when they are stored and when they are returned, so callers can modify them.
+    The version of the cache changes on every invalidation: a work item read before an invalidation is not stored
+    (see put), so a stale read cannot put back a work item which has just been modified.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        """
+        Class init
+        :param max_size: Maximum number of work items kept in the cache
+        :param ttl: Time to live (in seconds) of a cached work item
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._uris_by_id = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Property used to get the counters of the cache
+        :return: Dictionary with hits, misses, evictions and size
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries)}
+
+    @property
+    def version(self) -> int:
+        """
+        Property used to get the version of the cache, to be read before fetching a work item to store (see put)
+        :return: Number of invalidations so far
+        """
+        return self._version
+
+    def get_by_uri(self, workitem_uri: str) -> object or None:
+        """
+        Method used to get a cached work item using its URI
+        :param workitem_uri: URI of the work item
+        :return: Copy of the work item if cached and not expired, else None
+        """
+        with self._lock:
+            entry = self._entries.get(workitem_uri)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expiry, workitem, workitem_key = entry
+            if expiry < monotonic():
+                self._remove(workitem_uri)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(workitem_uri)
+            self.hits += 1
+        return copy.deepcopy(workitem)
+
+    def get_by_id(self, project_id: str, workitem_id: str) -> object or None:
+        """
+        Method used to get a cached work item using project and work item IDs
+        :param project_id: ID of the project of the work item
+        :param workitem_id: ID of the work item
+        :return: Copy of the work item if cached and not expired, else None
+        """
+        workitem_uri = self._uris_by_id.get((project_id, workitem_id))
+        if workitem_uri is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return self.get_by_uri(workitem_uri)
+
+    def put(self, workitem, project_id: str = None, version: int = None) -> None:
+        """
+        Method used to store a copy of a work item in the cache (unresolvable work items are not cached)
+        :param workitem: Work item to store
+        :param project_id: ID of the project of the work item (read from the work item if None)
+        :param version: Version of the cache read before fetching the work item: the work item is not stored if the
+                        cache has been invalidated since (None to store it anyway)
+        :return: None
+        """
+        if workitem is None or not workitem.uri or getattr(workitem, 'unresolvable', False):
+            return
+
+        if project_id is None and getattr(workitem, 'project', None) is not None:
+            project_id = workitem.project.id
+        workitem_key = (project_id, workitem.id) if project_id and workitem.id else None
+        workitem = copy.deepcopy(workitem)
+
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._remove(workitem.uri)
+            self._entries[workitem.uri] = (monotonic() + self._ttl, workitem, workitem_key)
+            if workitem_key:
+                self._uris_by_id[workitem_key] = workitem.uri
+
+            while len(self._entries) > self._max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *workitem_uris: str) -> None:
+        """
+        Method used to remove work items from the cache
+        :param workitem_uris: URIs of the work items to remove
+        :return: None
+        """
+        with self._lock:
+            self._version += 1
+            for workitem_uri in workitem_uris:
+                self._remove(workitem_uri)
+
+    def invalidate_id(self, project_id: str, workitem_id: str) -> None:
+        """
+        Method used to remove a work item from the cache using project and work item IDs
+        :param project_id: ID of the project of the work item
+        :param workitem_id: ID of the work item
+        :return: None
+        """
+        workitem_uri = self._uris_by_id.get((project_id, workitem_id))
+        if workitem_uri is not None:
+            self.invalidate(workitem_uri)
+
+    def clear(self) -> None:
+        """
+        Method used to remove all the work items from the cache
+        :return: None
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._uris_by_id.clear()
+
+    def _remove(self, workitem_uri: str) -> None:
+        """
+        Protected method used to remove an entry (lock has to be held)
+        :param workitem_uri: URI of the work item to remove
+        :return: None
+        """
+        entry = self._entries.pop(workitem_uri, None)
+        if entry is not None and entry[2] is not None:
+            self._uris_by_id.pop(entry[2], None)
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from time import time
+
+from zeep.cache import Base
+
+
+class WsdlCache(Base):
+    """
+    Class WsdlCache
+    Persistent cache of the WSDL and XSD documents downloaded by the web service clients.
+    Documents are stored in a SQLite file and keyed by their URL (which identifies both the server and the service).
+    Each entry is tagged with a cache version: entries stored with another version are ignored, so that bumping the
+    version invalidates the whole cache (i.e. after a Polarion server upgrade).
+    """
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "polarion", "wsdl.sqlite")
+    DEFAULT_VERSION = "1"
+
+    def __init__(self, path: str = None, version: str = DEFAULT_VERSION, timeout: float or None = None):
+        """
+        Class init
+        :param path: Path of the SQLite cache file (default: ~/.cache/polarion/wsdl.sqlite)
+        :param version: Version of the cache entries, entries stored with another version are invalid
+        :param timeout: Time to live (in seconds) of an entry, None to keep entries until the version changes
+        """
+        self._path = path or os.environ.get("POLARION_WSDL_CACHE", self.DEFAULT_PATH)
+        self._version = str(version)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._execute("CREATE TABLE IF NOT EXISTS documents "
+                      "(url TEXT PRIMARY KEY, version TEXT NOT NULL, created REAL NOT NULL, content BLOB)")
+
+    def _execute(self, statement: str, parameters: tuple = ()) -> tuple or None:
+        """
+        Protected method used to execute a statement on the cache file in its own connection
+        :param statement: SQL statement to execute
+        :param parameters: Parameters of the statement
+        :return: First row returned by the statement if any, else None
+        """
+        with self._lock, closing(sqlite3.connect(self._path, timeout=30)) as connection:
+            with connection:
+                return connection.execute(statement, parameters).fetchone()
+
+    @property
+    def path(self) -> str:
+        """
+        Property used to get the path of the cache file
+        :return: Path of the cache file
+        """
+        return self._path
+
+    @property
+    def version(self) -> str:
+        """
+        Property used to get the version of the cache entries
+        :return: Version of the cache entries
+        """
+        return self._version
+
+    def add(self, url: str, content: bytes) -> None:
+        """
+        Method used to store a document in the cache (called by the zeep transport)
+        :param url: URL of the document
+        :param content: Content of the document
+        :return: None
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        self._execute("INSERT OR REPLACE INTO documents (url, version, created, content) VALUES (?, ?, ?, ?)",
+                      (url, self._version, time(), sqlite3.Binary(content)))
+
+    def get(self, url: str) -> bytes or None:
+        """
+        Method used to get a document from the cache (called by the zeep transport)
+        :param url: URL of the document
+        :return: Content of the document if cached and valid, else None
+        """
+        row = self._execute("SELECT version, created, content FROM documents WHERE url = ?", (url,))
+
+        if row is None:
+            return None
+
+        version, created, content = row
+        if version != self._version:
+            return None
+        if self._timeout is not None and time() - created > self._timeout:
+            return None
+        return bytes(content)
+
+    def invalidate(self, server: str = None) -> None:
+        """
+        Method used to remove cached documents
+        :param server: Hostname of the server whose documents have to be removed (all documents if None)
+        :return: None
+        """
+        if server is None:
+            self._execute("DELETE FROM documents")
+        else:
+            self._execute("DELETE FROM documents WHERE url LIKE ?", ('%://' + server + '/%',))
+
+    def purge(self) -> None:
+        """
+        Method used to remove the documents stored with an outdated version
+        :return: None
+        """
+        self._execute("DELETE FROM documents WHERE version != ?", (self._version,))